@@ -0,0 +1,22 @@
+"""
+Grammar/sense checks for the scenario + response card decks.
+
+Importing the package loads no deck and compiles no patterns; rule tables are
+compiled on first use, so the analyzers can be called in-process many times
+for the cost of one startup:
+
+    from grammar_check import DeepAnalyzer, Report, run_deep
+    run_deep(DeepAnalyzer(mode='aggregate'), Report('json'))
+
+The command line (python -m grammar_check) lives in cli.py.
+"""
+from .cache import ClassificationCache
+from .deck import DECK_PATH, iter_deck, load_deck, normalize_scenario
+from .deep import COMPAT, DeepAnalyzer, run_category_detail, run_deep
+from .output import Report
+from .quick import QuickChecker, run_quick
+
+__all__ = [
+    'COMPAT', 'ClassificationCache', 'DECK_PATH', 'DeepAnalyzer', 'QuickChecker', 'Report',
+    'iter_deck', 'load_deck', 'normalize_scenario', 'run_category_detail', 'run_deep', 'run_quick',
+]
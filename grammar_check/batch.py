@@ -0,0 +1,247 @@
+"""
+Batch check of a directory of decks (community packs, old snapshots such as
+backup_2026-02-22/data/cards.json), ranked into leaderboards of OK rate per
+pack and per pack category.
+
+Files are read concurrently with asyncio and each deck is analyzed in a
+pool of worker processes with the aggregate engine, which gives the same
+totals as the full check. Results are reported as decks finish, in
+whatever order that is. A file that can't be read, isn't JSON or isn't
+shaped like cards.json is reported as failed; a deck still being analyzed
+after the timeout is given up on, and its worker is left out of the
+rotation until it finishes (or is killed, when every worker is stuck and
+the pool is restarted). Neither holds up the other decks.
+
+Generated files next to decks (the web dealer's *.index.json, the
+per-category bundles under a directory with a manifest.json) are skipped.
+"""
+import asyncio
+import fnmatch
+import json
+import multiprocessing
+import os
+import time
+
+from . import deep
+
+PATTERNS = ('*.json',)
+TIMEOUT = 60.0
+
+
+def find_decks(directory, patterns=PATTERNS):
+    """Deck files under directory matching any of the patterns, in path order."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        if 'manifest.json' in files:
+            dirs[:] = []
+            continue
+        for name in sorted(files):
+            if name.endswith('.index.json'):
+                continue
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def check_deck(deck):
+    """Raise ValueError unless deck is shaped like cards.json."""
+    if not isinstance(deck, dict):
+        raise ValueError('not a deck: expected an object of categories')
+    for cat_key, cat_data in deck.items():
+        if not isinstance(cat_data, dict):
+            raise ValueError(f'category {cat_key!r} is not an object')
+        for kind in ('scenarios', 'responses'):
+            cards = cat_data.get(kind)
+            if not isinstance(cards, list) or not all(isinstance(card, str) for card in cards):
+                raise ValueError(f"category {cat_key!r} has no list of {kind}")
+
+
+def _read(path):
+    if not os.path.isfile(path):
+        raise OSError(f'not a regular file: {path}')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _analyze_deck(text):
+    """Worker side: [(cat_key, name, total, bad)] for a deck's text, with the worker's new classifications."""
+    start = time.perf_counter()
+    deck = json.loads(text)
+    check_deck(deck)
+    analyzer = deep._worker         # built by deep._init_worker in this process
+    rows = []
+    for cat_key, cat_data in deck.items():
+        total, bad, *_ = analyzer.analyze_category(cat_data['scenarios'], cat_data['responses'])
+        rows.append((cat_key, cat_data.get('name', cat_key), total, bad))
+    new = analyzer.cache.take_new() if analyzer.cache is not None else None
+    return rows, new, time.perf_counter() - start
+
+
+class _Workers:
+    """The process pool and how many of its workers are stuck on decks that timed out."""
+
+    def __init__(self, jobs, cache_path):
+        self.jobs = jobs
+        self.cache_path = cache_path
+        self.stuck = 0
+        self.restarts = 0
+        self.pool = self._start()
+
+    def _start(self):
+        # multiprocessing.Pool rather than concurrent.futures: workers stuck
+        # on a deck can be terminated.
+        return multiprocessing.Pool(self.jobs, initializer=deep._init_worker,
+                                    initargs=({'mode': 'aggregate'}, self.cache_path))
+
+    def restart(self):
+        """Kill every worker (all stuck) and start fresh ones."""
+        self.pool.terminate()
+        self.pool = self._start()
+        self.stuck = 0
+        self.restarts += 1
+
+    def close(self):
+        if self.stuck:
+            self.pool.terminate()
+        else:
+            self.pool.close()
+        self.pool.join()
+
+
+async def _analyze_all(paths, workers, timeout, done):
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(workers.jobs)
+
+    def finished_late(restarts):
+        # A deck that timed out is done after all: its worker is free again.
+        if restarts == workers.restarts:
+            workers.stuck -= 1
+            slots.release()
+
+    def settle(future, method, value, restarts):
+        if future.cancelled():
+            finished_late(restarts)
+        elif not future.done():
+            getattr(future, method)(value)
+
+    async def one(path):
+        await slots.acquire()
+        release = True
+        try:
+            text = await asyncio.to_thread(_read, path)
+            future = loop.create_future()
+            restarts = workers.restarts
+            workers.pool.apply_async(
+                _analyze_deck, (text,),
+                callback=lambda result: loop.call_soon_threadsafe(settle, future, 'set_result', result, restarts),
+                error_callback=lambda e: loop.call_soon_threadsafe(settle, future, 'set_exception', e, restarts))
+            del text
+            try:
+                rows, new, seconds = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                # The worker is still busy with it, so its slot stays taken
+                # until it finishes; once every worker is stuck, start over.
+                release = False
+                workers.stuck += 1
+                if workers.stuck == workers.jobs:
+                    workers.restart()
+                    for _ in range(workers.jobs):
+                        slots.release()
+                raise TimeoutError(f'still being analyzed after {timeout:g}s, given up') from None
+            done(path, rows, new, seconds, None)
+        except Exception as e:
+            # Whatever a deck does wrong, it only fails that deck.
+            done(path, None, None, None, f'{type(e).__name__}: {e}')
+        finally:
+            if release:
+                slots.release()
+
+    await asyncio.gather(*(one(path) for path in paths))
+
+
+def analyze_decks(paths, done, jobs=None, timeout=TIMEOUT, cache=None):
+    """Analyze every deck in paths, calling done(path, rows, new, seconds, error) as each finishes.
+
+    rows is [(cat_key, name, total, bad)], None with an error message for a
+    deck that failed; new holds the classifications its worker made, for
+    the cache.
+    """
+    if not paths:
+        return
+    workers = _Workers(min(jobs or os.cpu_count() or 1, len(paths)), cache.path if cache is not None else None)
+    try:
+        asyncio.run(_analyze_all(paths, workers, timeout, done))
+    finally:
+        workers.close()
+
+
+def _rate(ok, total):
+    return ok / total * 100 if total else 0.0
+
+
+def run_batch(report, directory, patterns=PATTERNS, jobs=None, timeout=TIMEOUT, cache=None):
+    """Write the per-deck progress, the pack and category leaderboards and the failures; return failures."""
+    paths = find_decks(directory, patterns)
+    report.line("=" * 100)
+    report.line(f"BATCH CHECK — {len(paths)} deck file{'' if len(paths) == 1 else 's'} under {directory}")
+    report.line("=" * 100)
+    packs = []
+    categories = []
+    failed = []
+
+    def done(path, rows, new, seconds, error):
+        pack = os.path.relpath(path, directory)
+        if error is not None:
+            failed.append((pack, error))
+            report.line(f"  FAILED  {pack}: {error}")
+            report.record('batch_failure', pack=pack, error=error)
+            return
+        if new and cache is not None:
+            cache.add_new(new)
+        total = sum(r[2] for r in rows)
+        bad = sum(r[3] for r in rows)
+        packs.append((pack, len(rows), total, bad))
+        categories.extend((pack, *row) for row in rows)
+        report.line(f"  ok      {pack}: {len(rows)} categories, {_rate(total - bad, total):.1f}% OK "
+                    f"({seconds:.2f}s)")
+        report.record('batch_deck', pack=pack, categories=len(rows), total=total, ok=total - bad, bad=bad,
+                      seconds=seconds)
+
+    analyze_decks(paths, done, jobs, timeout, cache)
+
+    # Best first; ties by size, then name, so the order doesn't depend on finishing order.
+    packs.sort(key=lambda p: (-_rate(p[2] - p[3], p[2]), -p[2], p[0]))
+    report.line(f"\n{'─' * 100}")
+    report.line(f"  PACK LEADERBOARD ({len(packs)} packs)")
+    report.line(f"  {'#':>4}  {'OK %':>6}  {'combos':>10}  {'cats':>4}  pack")
+    for rank, (pack, n, total, bad) in enumerate(report.cap(packs), 1):
+        report.line(f"  {rank:>4}  {_rate(total - bad, total):>6.1f}  {total:>10}  {n:>4}  {pack}")
+        report.record('pack_rank', rank=rank, pack=pack, categories=n, total=total, ok=total - bad, bad=bad,
+                      ok_rate=_rate(total - bad, total))
+
+    if report.detail:
+        categories.sort(key=lambda c: (-_rate(c[3] - c[4], c[3]), -c[3], c[0], c[1]))
+        report.line(f"\n{'─' * 100}")
+        report.line(f"  CATEGORY LEADERBOARD ({len(categories)} categories)")
+        report.line(f"  {'#':>4}  {'OK %':>6}  {'combos':>10}  category (pack)")
+        for rank, (pack, cat_key, name, total, bad) in enumerate(report.cap(categories), 1):
+            report.line(f"  {rank:>4}  {_rate(total - bad, total):>6.1f}  {total:>10}  {name} ({pack})")
+            report.record('category_rank', rank=rank, pack=pack, category=cat_key, name=name, total=total,
+                          ok=total - bad, bad=bad, ok_rate=_rate(total - bad, total))
+
+    grand_total = sum(p[2] for p in packs)
+    grand_bad = sum(p[3] for p in packs)
+    if failed:
+        report.line(f"\n{'─' * 100}")
+        report.line(f"  FAILED ({len(failed)})")
+        for pack, error in report.cap(sorted(failed)):
+            report.line(f"    {pack}: {error}")
+
+    report.line(f"\n{'=' * 100}")
+    report.line(f"OVERALL: {len(packs)} packs checked, {len(failed)} failed | {grand_total} combos | "
+                f"{_rate(grand_total - grand_bad, grand_total):.1f}% OK")
+    report.line(f"{'=' * 100}")
+    report.record('batch_overall', packs=len(packs), failed=len(failed), total=grand_total,
+                  ok=grand_total - grand_bad, bad=grand_bad)
+    return failed
@@ -0,0 +1,122 @@
+"""
+Benchmarks for the grammar checks on synthetic decks (see synth.py).
+
+Each benchmark is timed separately at every deck size, best of `repeat` rounds:
+
+  normalize               normalize_scenario over every scenario
+  classify_scenario_slot  the deep scenario classifier over every scenario
+  classify_response       the deep response classifier over every response
+  report_aggregate        the full deep report (aggregate mode), from the file
+  report_exhaustive       the full deep report (exhaustive mode), only up to
+                          EXHAUSTIVE_MAX_CARDS since it is O(S×R)
+
+Caches are off, so every run does the full work. Timings are compared against
+stored baselines, and a benchmark fails when it is more than `tolerance` times
+slower than its baseline. Baselines are machine-specific: record them with
+update=True (bench --update) on the machine that checks them.
+"""
+import io
+import json
+import os
+import platform
+import tempfile
+import timeit
+
+from . import synth
+from .deck import normalize_scenario
+from .deep import DeepAnalyzer, classify_response, classify_scenario_slot, run_deep
+from .output import Report
+
+SIZES = (10**3, 10**4, 10**5, 10**6)
+EXHAUSTIVE_MAX_CARDS = 10**4
+BASELINES_PATH = 'bench_baselines.json'
+TOLERANCE = 2.0
+
+
+def best_time(fn, repeat):
+    """Best per-call time of fn over `repeat` rounds, each long enough (≥0.2s) to time reliably."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def benchmarks(deck, path, cards):
+    """Return [(name, fn)] for one synthetic deck, already written to path."""
+    scenarios = [s for cat in deck.values() for s in cat['scenarios']]
+    responses = [r for cat in deck.values() for r in cat['responses']]
+
+    def report(mode):
+        return lambda: run_deep(DeepAnalyzer(mode), Report(out=io.StringIO()), path)
+
+    cases = [
+        ('normalize', lambda: [normalize_scenario(s) for s in scenarios]),
+        ('classify_scenario_slot', lambda: [classify_scenario_slot(s) for s in scenarios]),
+        ('classify_response', lambda: [classify_response(r) for r in responses]),
+        ('report_aggregate', report('aggregate')),
+    ]
+    if cards <= EXHAUSTIVE_MAX_CARDS:
+        cases.append(('report_exhaustive', report('exhaustive')))
+    return cases
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('timings', {})
+
+
+def save_baselines(path, timings):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'timings': timings},
+                  f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def run_bench(sizes=SIZES, repeat=3, baselines_path=BASELINES_PATH, tolerance=TOLERANCE, update=False,
+              seed=0, out=None):
+    """Run every benchmark at every size and print a comparison table.
+
+    Returns the number of regressions (always 0 with update=True, which
+    stores the new timings as baselines instead).
+    """
+    out = out or io.StringIO()
+    baselines = load_baselines(baselines_path)
+    timings = {}
+    regressions = 0
+    # Compile the rule tables up front so the first benchmark doesn't pay for it.
+    classify_scenario_slot('warm _____ up')
+    classify_response('warm up')
+
+    print(f"{'benchmark':<24} {'cards':>9} {'seconds':>10} {'baseline':>10} {'ratio':>7}", file=out)
+    with tempfile.TemporaryDirectory() as tmp:
+        for cards in sizes:
+            deck = synth.generate_deck(cards, seed=seed)
+            path = os.path.join(tmp, f'deck_{cards}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(deck, f, ensure_ascii=False)
+            for name, fn in benchmarks(deck, path, cards):
+                elapsed = best_time(fn, repeat)
+                timings.setdefault(name, {})[str(cards)] = round(elapsed, 6)
+                baseline = baselines.get(name, {}).get(str(cards))
+                if baseline is None:
+                    status, ratio = 'new', ''
+                else:
+                    r = elapsed / baseline if baseline else float('inf')
+                    ratio = f'{r:.2f}x'
+                    status = 'ok'
+                    if r > tolerance and not update:
+                        status = 'REGRESSED'
+                        regressions += 1
+                baseline_text = '' if baseline is None else f'{baseline:.4f}'
+                print(f"{name:<24} {cards:>9} {elapsed:>10.4f} {baseline_text:>10} {ratio:>7}  {status}",
+                      file=out, flush=True)
+
+    if update:
+        for name, by_size in timings.items():
+            baselines.setdefault(name, {}).update(by_size)
+        save_baselines(baselines_path, baselines)
+        print(f'\nBaselines written to {baselines_path}', file=out)
+    elif regressions:
+        print(f'\n{regressions} benchmark(s) more than {tolerance}x slower than baseline', file=out)
+    return regressions
@@ -0,0 +1,283 @@
+"""
+Compiled decks: cards.json turned into one binary file that is opened with
+mmap instead of parsed.
+
+Layout (integers little-endian, arrays in the machine's byte order, which
+the file records):
+
+  header    MAGIC, then the offset and size of every section below
+  blob      every card's UTF-8 text back to back: per category, its
+            scenarios then its responses
+  offsets   n_cards + 1 u64, card i is blob[offsets[i]:offsets[i + 1]]
+  codes     n_cards i8, the card's type as an index into the vocabularies
+            in meta: a scenario's slot type (of its normalized text; -1 when
+            it is never dealt), a response's response type
+  ranges    per category 4 u64: first scenario, scenarios, first response,
+            responses
+  meta      JSON: the vocabularies, the classifier versions the codes were
+            computed with, and each category's key and other fields
+
+Opening a compiled deck reads the header and meta and maps the rest. The
+card lists are CardArrays: sequences of str backed by the mapping, which
+decode a card when it is read and slice without copying. Codes are read in
+place by the NumPy engine (deep --numpy), which then doesn't classify
+anything; they are ignored when the classifiers have changed since the deck
+was compiled. A CardArray sent to a pool worker travels as (path, range),
+and the worker maps the same file, so every process shares the page cache
+instead of holding its own copy of the deck.
+"""
+import array
+import collections.abc
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .deep import COMPAT, classifier_versions
+
+MAGIC = b'GCDECK01'
+HEADER = struct.Struct('<8s9Q')     # magic, blob offset and size, offsets, cards, codes, ranges,
+                                    # categories, meta offset and size
+FORMAT_VERSION = 1
+NOT_DEALT = -1
+
+
+def versions():
+    """The classifier versions that type codes are valid for."""
+    return classifier_versions()
+
+
+def compiled_path(deck_path):
+    return os.path.splitext(deck_path)[0] + '.bin'
+
+
+def is_compiled(path):
+    """Whether path is a compiled deck (False for anything unreadable)."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _pad(f):
+    f.write(b'\0' * (-f.tell() % 8))
+    return f.tell()
+
+
+def compile_deck(analyzer, categories, out_path):
+    """Write (cat_key, cat_data) pairs as a compiled deck; return (categories, cards).
+
+    Card text is streamed to the file as it is read, so only the offsets and
+    codes of the whole deck are held in memory.
+    """
+    slot_types = list(COMPAT)
+    resp_types = list(COMPAT['OPEN'])
+    slot_code = {t: i for i, t in enumerate(slot_types)}
+    resp_code = {t: i for i, t in enumerate(resp_types)}
+    offsets = array.array('Q', [0])
+    codes = array.array('b')
+    ranges = array.array('Q')
+    meta = {'format': FORMAT_VERSION, 'byteorder': sys.byteorder, 'slotTypes': slot_types,
+            'respTypes': resp_types, 'versions': versions(), 'categories': []}
+
+    tmp = f'{out_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(b'\0' * HEADER.size)
+            blob_start = _pad(f)
+            size = 0
+            for cat_key, cat_data in categories:
+                ranges.append(len(codes))
+                ranges.append(len(cat_data['scenarios']))
+                for s_raw in cat_data['scenarios']:
+                    data = s_raw.encode('utf-8')
+                    f.write(data)
+                    size += len(data)
+                    offsets.append(size)
+                    s = analyzer.normalize_scenario(s_raw)
+                    slot_type = analyzer.classify_scenario_slot(s)[0] if s is not None else 'SKIP'
+                    codes.append(slot_code.get(slot_type, NOT_DEALT))
+                ranges.append(len(codes))
+                ranges.append(len(cat_data['responses']))
+                for r in cat_data['responses']:
+                    data = r.encode('utf-8')
+                    f.write(data)
+                    size += len(data)
+                    offsets.append(size)
+                    codes.append(resp_code[analyzer.classify_response(r)])
+                fields = {k: v for k, v in cat_data.items() if k not in ('scenarios', 'responses')}
+                meta['categories'].append([cat_key, fields])
+            offsets_start = _pad(f)
+            offsets.tofile(f)
+            codes_start = _pad(f)
+            codes.tofile(f)
+            ranges_start = _pad(f)
+            ranges.tofile(f)
+            meta_start = f.tell()
+            meta_data = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+            f.write(meta_data)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, blob_start, size, offsets_start, len(codes), codes_start, ranges_start,
+                                len(meta['categories']), meta_start, len(meta_data)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return len(meta['categories']), len(codes)
+
+
+class CompiledDeck:
+    """A compiled deck file, mapped read-only."""
+
+    def __init__(self, path):
+        self.path = os.path.realpath(path)
+        with open(self.path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            self.stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+            if st.st_size < HEADER.size:
+                raise ValueError(f'{path}: not a compiled deck')
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        (magic, blob_start, blob_size, offsets_start, n_cards, codes_start, ranges_start, n_categories,
+         meta_start, meta_size) = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f'{path}: not a compiled deck')
+        self.meta = json.loads(bytes(view[meta_start:meta_start + meta_size]))
+        if self.meta['byteorder'] != sys.byteorder:
+            raise ValueError(f'{path}: compiled on a {self.meta["byteorder"]}-endian machine, compile it again')
+        self.blob = view[blob_start:blob_start + blob_size]
+        self.offsets = view[offsets_start:offsets_start + 8 * (n_cards + 1)].cast('Q')
+        self.codes = view[codes_start:codes_start + n_cards].cast('b')
+        self.ranges = view[ranges_start:ranges_start + 32 * n_categories].cast('Q')
+        # Codes computed by other classifiers (or vocabularies) are not used.
+        self.typed = (self.meta['slotTypes'] == list(COMPAT) and self.meta['respTypes'] == list(COMPAT['OPEN'])
+                      and self.meta['versions'] == versions())
+
+    def categories(self):
+        """The deck as load_deck returns it, with CardArrays for the card lists."""
+        deck = {}
+        for i, (cat_key, fields) in enumerate(self.meta['categories']):
+            scen_start, scen_count, resp_start, resp_count = self.ranges[4 * i:4 * i + 4]
+            deck[cat_key] = {**fields,
+                             'scenarios': CardArray(self, scen_start, scen_start + scen_count),
+                             'responses': CardArray(self, resp_start, resp_start + resp_count)}
+        return deck
+
+
+# One mapping per file per process, so unpickled CardArrays share it.
+_open = {}
+
+
+def open_deck(path):
+    """The CompiledDeck for path, mapped once per process and again when the file changes."""
+    key = os.path.realpath(path)
+    st = os.stat(key)
+    deck = _open.get(key)
+    if deck is None or deck.stamp != (st.st_mtime_ns, st.st_size, st.st_ino):
+        deck = _open[key] = CompiledDeck(key)
+    return deck
+
+
+def _card_array(path, stamp, start, stop):
+    deck = open_deck(path)
+    if deck.stamp != stamp:
+        raise ValueError(f'{path} changed while it was being analyzed')
+    return CardArray(deck, start, stop)
+
+
+class CardArray(collections.abc.Sequence):
+    """Cards start..stop of a compiled deck, as a read-only sequence of str."""
+
+    __slots__ = ('deck', 'start', 'stop')
+
+    def __init__(self, deck, start, stop):
+        self.deck = deck
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            first, last, step = i.indices(len(self))
+            if step == 1:
+                return CardArray(self.deck, self.start + first, self.start + max(first, last))
+            return [self[j] for j in range(first, last, step)]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('card index out of range')
+        offsets = self.deck.offsets
+        return str(self.deck.blob[offsets[self.start + i]:offsets[self.start + i + 1]], 'utf-8')
+
+    def __iter__(self):
+        blob = self.deck.blob
+        bounds = self.deck.offsets[self.start:self.stop + 1].tolist()
+        for a, b in zip(bounds, bounds[1:]):
+            yield str(blob[a:b], 'utf-8')
+
+    def __eq__(self, other):
+        if isinstance(other, (CardArray, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'<CardArray {self.deck.path} [{self.start}:{self.stop}]>'
+
+    def __reduce__(self):
+        return _card_array, (self.deck.path, self.deck.stamp, self.start, self.stop)
+
+    @property
+    def codes(self):
+        """The cards' type codes, in place; None when the deck's codes are out of date."""
+        if not self.deck.typed:
+            return None
+        return self.deck.codes[self.start:self.stop]
+
+    def digest(self):
+        """Digest of the cards, from their raw bytes and where they sit in the file."""
+        offsets = self.deck.offsets
+        h = hashlib.sha256()
+        h.update(offsets[self.start:self.stop + 1])
+        h.update(self.deck.blob[offsets[self.start]:offsets[self.stop]])
+        return h.hexdigest()
+
+
+def type_codes(cards):
+    """In-place type codes of a compiled deck's cards, or None for anything else."""
+    return cards.codes if isinstance(cards, CardArray) else None
+
+
+def response_types(analyzer, responses):
+    """Every response's type, read from the codes of a compiled deck when they are current."""
+    codes = type_codes(responses)
+    if codes is None:
+        return [analyzer.classify_response(r) for r in responses]
+    names = list(COMPAT['OPEN'])
+    return [names[c] for c in codes.tolist()]
+
+
+def dealt_scenarios(analyzer, scenarios):
+    """[(raw scenario, slot type)] of the scenarios that are dealt, read from codes the same way."""
+    codes = type_codes(scenarios)
+    if codes is None:
+        dealt = []
+        for s_raw in scenarios:
+            s = analyzer.normalize_scenario(s_raw)
+            if s is None:
+                continue
+            slot_type, _ = analyzer.classify_scenario_slot(s)
+            if slot_type != 'SKIP':
+                dealt.append((s_raw, slot_type))
+        return dealt
+    names = list(COMPAT)
+    return [(s_raw, names[c]) for s_raw, c in zip(scenarios, codes.tolist()) if c != NOT_DEALT]
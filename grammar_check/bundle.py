@@ -0,0 +1,127 @@
+"""
+Per-category deck bundles for the web game (data/cards.json →
+data/categories/<key>.json), so the browser fetches a category when it is
+played, already normalized and typed, and does no work of its own on it.
+
+Each bundle is minified JSON:
+
+  {
+    "name": ..., "description": ...,
+    "scenarios": [...],        normalized, single-blank scenarios only
+    "responses": [...],
+    "slotMasks": [...],        compatible response-type bits per scenario
+    "responseTypes": [...],    response-type bit per response
+    "typeCount": 7
+  }
+
+where the masks and types are the compatibility index (see index.py) lined up
+with the bundled cards. Next to every bundle go precompressed .gz and, when
+the brotli package is installed, .br variants for servers that serve those
+directly (nginx gzip_static/brotli_static, most static hosts). manifest.json
+lists the categories and their sizes, the sha256 of the deck file the
+bundles were built from and the classifier versions. js/app.js only uses the
+bundles while that sha256 matches cards.json and the versions match the
+compatibility index's; otherwise it loads cards.json.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from .binary import versions
+from .deck import DECK_PATH, load_deck, normalize_scenario
+from .index import build_index
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 2
+
+
+def bundle_dir_for(deck_path):
+    return os.path.join(os.path.dirname(deck_path), 'categories')
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_bundle(cat_data, codes, index):
+    scenarios = []
+    slot_masks = []
+    for s, code in zip(cat_data['scenarios'], codes['scenarios']):
+        s = normalize_scenario(s)
+        if s is None:
+            continue
+        scenarios.append(s)
+        slot_masks.append(index['compat'][code] if code >= 0 else None)
+    return {
+        'name': cat_data['name'],
+        'description': cat_data['description'],
+        'scenarios': scenarios,
+        'responses': list(cat_data['responses']),
+        'slotMasks': slot_masks,
+        'responseTypes': codes['responses'],
+        'typeCount': len(index['respTypes']),
+    }
+
+
+def _write(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_compressed(path, data):
+    """Write data to path plus its .gz (and .br) variants; return {variant: size}."""
+    sizes = {'raw': len(data)}
+    _write(path, data)
+    gz = gzip.compress(data, 9, mtime=0)
+    _write(path + '.gz', gz)
+    sizes['gzip'] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        _write(path + '.br', br)
+        sizes['brotli'] = len(br)
+    return sizes
+
+
+def write_bundles(analyzer, deck_path=DECK_PATH, out_dir=None):
+    """Write one bundle per category and the manifest; return the manifest."""
+    out_dir = out_dir or bundle_dir_for(deck_path)
+    os.makedirs(out_dir, exist_ok=True)
+    deck_sha256 = file_sha256(deck_path)
+    deck = load_deck(deck_path)
+    index = build_index(analyzer, deck)
+    categories = {}
+    for cat_key, cat_data in deck.items():
+        bundle = build_bundle(cat_data, index['categories'][cat_key], index)
+        data = json.dumps(bundle, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        sizes = write_compressed(os.path.join(out_dir, f'{cat_key}.json'), data)
+        categories[cat_key] = {'name': cat_data['name'], 'file': f'{cat_key}.json',
+                               'scenarios': len(bundle['scenarios']), 'responses': len(bundle['responses']),
+                               'bytes': sizes}
+    manifest = {'version': MANIFEST_VERSION, 'deck': {'sha256': deck_sha256}, 'versions': versions(),
+                'categories': categories}
+    data = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    _write(os.path.join(out_dir, MANIFEST), data)
+    return manifest
+
+
+def bundles_are_current(deck_path=DECK_PATH, out_dir=None):
+    """Whether the manifest in out_dir was written for this deck file and the current classifiers."""
+    try:
+        with open(os.path.join(out_dir or bundle_dir_for(deck_path), MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (manifest.get('version') == MANIFEST_VERSION and manifest.get('versions') == versions()
+            and manifest.get('deck', {}).get('sha256') == file_sha256(deck_path))
@@ -0,0 +1,191 @@
+"""
+Persistent classification cache for the grammar checks.
+
+Classifying a card is pure: the result depends only on the card text and the
+classifier (its rule table plus the Python code around it). So results are
+stored in SQLite keyed by a hash of the card text and a version string built
+from both. A re-run after editing a few cards only classifies the new or
+changed cards; everything else is a dict lookup. When the rules or the
+classifier code change, the version changes and the old rows are dropped.
+
+The deep check also stores whole per-category results keyed by a digest of
+the category's cards, so unchanged categories are not re-analyzed at all.
+"""
+import hashlib
+import inspect
+import json
+import marshal
+import sqlite3
+
+DEFAULT_PATH = '.grammar_cache.sqlite'
+
+
+def card_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def classifier_version(*parts):
+    """Version string for a classifier built from RuleSets and the functions wrapping them.
+
+    Pass every function between the card text and the rules, including the
+    helpers that prepare the text, or editing one leaves stale results cached.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if hasattr(part, 'version'):
+            h.update(part.version.encode('utf-8'))
+            continue
+        try:
+            h.update(inspect.getsource(part).encode('utf-8'))
+        except OSError:
+            # No source on disk (e.g. defined interactively): fall back to the bytecode.
+            h.update(marshal.dumps(part.__code__))
+    return h.hexdigest()[:16]
+
+
+def _digest_default(obj):
+    # Compiled card arrays (binary.CardArray) digest their raw bytes.
+    if hasattr(obj, 'digest'):
+        return {'digest': obj.digest()}
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
+
+
+def digest(obj):
+    """Stable digest of a JSON-serializable value."""
+    return hashlib.sha256(json.dumps(obj, ensure_ascii=False, default=_digest_default).encode('utf-8')).hexdigest()
+
+
+class CachedClassifier:
+    """Wraps a classify function with an in-memory memo backed by the SQLite cache."""
+
+    def __init__(self, cache, name, fn, version):
+        self.cache = cache
+        self.name = name
+        self.fn = fn
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._memo = {}
+        self._new = {}
+        conn = cache.conn
+        if not cache.readonly:
+            conn.execute('DELETE FROM classifications WHERE classifier = ? AND version != ?', (name, version))
+        rows = conn.execute('SELECT hash, result FROM classifications WHERE classifier = ? AND version = ?',
+                            (name, version))
+        self._stored = {h: result for h, result in rows}
+
+    def __call__(self, text):
+        result = self._memo.get(text)
+        if result is not None:
+            return result
+        key = card_hash(text)
+        stored = self._stored.get(key)
+        if stored is not None:
+            self.hits += 1
+            result = json.loads(stored)
+            if isinstance(result, list):
+                result = tuple(result)
+        else:
+            self.misses += 1
+            result = self.fn(text)
+            self._new[key] = json.dumps(result, ensure_ascii=False)
+        self._memo[text] = result
+        return result
+
+    def take_new(self):
+        """Hand over results classified since the last call (used by pool workers)."""
+        new = self._new
+        self._stored.update(new)
+        self._new = {}
+        return new
+
+    def add_new(self, entries):
+        """Adopt results a pool worker classified, so they get written on flush."""
+        for key, result in entries.items():
+            if key not in self._stored:
+                self._stored[key] = result
+                self._new[key] = result
+
+    def flush(self):
+        if self._new and not self.cache.readonly:
+            self.cache.conn.executemany(
+                'INSERT OR REPLACE INTO classifications (classifier, version, hash, result) VALUES (?, ?, ?, ?)',
+                [(self.name, self.version, key, result) for key, result in self._new.items()])
+            self._stored.update(self._new)
+            self._new = {}
+
+
+class ClassificationCache:
+    """SQLite-backed store for card classifications and per-category results.
+
+    A readonly cache (used by pool workers) only reads what is stored; new
+    classifications are handed to the writer via take_new()/add_new().
+    """
+
+    def __init__(self, path=DEFAULT_PATH, readonly=False, check_same_thread=True):
+        self.path = path
+        self.readonly = readonly
+        # check_same_thread=False lets a caller that serializes its own access
+        # (serve's reloads) use the cache from several threads.
+        self.conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS classifications (
+                classifier TEXT NOT NULL,
+                version TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (classifier, version, hash)
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                scope TEXT NOT NULL,
+                version TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (scope, key)
+            );
+        ''')
+        self.classifiers = []
+        self._results_touched = set()
+
+    def classifier(self, name, fn, version):
+        cached = CachedClassifier(self, name, fn, version)
+        self.classifiers.append(cached)
+        return cached
+
+    def take_new(self):
+        return {cached.name: cached.take_new() for cached in self.classifiers}
+
+    def add_new(self, new):
+        for cached in self.classifiers:
+            cached.add_new(new.get(cached.name, {}))
+
+    def get_result(self, scope, version, key):
+        self._results_touched.add((scope, version))
+        row = self.conn.execute('SELECT value FROM results WHERE scope = ? AND version = ? AND key = ?',
+                                (scope, version, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_result(self, scope, version, key, value):
+        if self.readonly:
+            return
+        self.conn.execute('INSERT OR REPLACE INTO results (scope, version, key, value) VALUES (?, ?, ?, ?)',
+                          (scope, version, key, json.dumps(value, ensure_ascii=False)))
+
+    def flush(self):
+        """Write the classifications made since the last flush, without closing."""
+        if self.readonly:
+            return
+        for cached in self.classifiers:
+            cached.flush()
+        self.conn.commit()
+
+    def close(self):
+        if self.readonly:
+            self.conn.close()
+            return
+        for cached in self.classifiers:
+            cached.flush()
+        for scope, version in self._results_touched:
+            self.conn.execute('DELETE FROM results WHERE scope = ? AND version != ?', (scope, version))
+        self.conn.commit()
+        self.conn.close()
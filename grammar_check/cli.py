@@ -0,0 +1,423 @@
+"""
+Command line for the grammar checks:
+
+  python -m grammar_check quick        coarse check with root-cause patterns
+  python -m grammar_check deep         every scenario × every response (--watch: re-check on every save)
+  python -m grammar_check genz-detail  per-scenario verdicts for one category
+  python -m grammar_check index        write the web dealer's compatibility index (--check: is it current)
+  python -m grammar_check bundle       write per-category bundles for the web game (--check: are they current)
+  python -m grammar_check compile      write a compiled deck, opened with mmap by every other command
+  python -m grammar_check dedupe       near-duplicate cards across every deck source
+  python -m grammar_check import       merge numbered card lists into a deck category
+  python -m grammar_check batch        leaderboards of OK rate for every deck in a directory
+  python -m grammar_check diff         OK/BAD delta between two versions of a deck
+  python -m grammar_check mixed        categories pooled into one deck, as a category × category heatmap
+  python -m grammar_check optimize     fewest response changes to reach a target OK rate
+  python -m grammar_check simulate     how often the web game deals a hand with no fitting card
+  python -m grammar_check serve        local HTTP daemon answering combo, compatible-response and hand queries
+  python -m grammar_check synth        write a synthetic deck
+  python -m grammar_check bench        benchmarks against stored baselines
+"""
+import argparse
+
+from . import output
+from .cache import DEFAULT_PATH, ClassificationCache
+from .deck import DECK_PATH
+
+
+def common_arguments():
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--deck', default=DECK_PATH, metavar='PATH',
+                        help=f'deck file to check (default: {DECK_PATH})')
+    parser.add_argument('--cache', default=DEFAULT_PATH, metavar='PATH',
+                        help=f'classification cache file (default: {DEFAULT_PATH})')
+    parser.add_argument('--no-cache', action='store_true', help='classify every card from scratch')
+    parser.add_argument('--stream', action='store_true',
+                        help='stream the deck one category at a time instead of loading it all up front')
+    output.add_arguments(parser)
+    return parser
+
+
+def add_deep_arguments(parser):
+    parser.add_argument('--aggregate', action='store_true',
+                        help='compute totals from slot-type × response-type counts (O(S+R)) instead of the S×R loop')
+    parser.add_argument('--numpy', action='store_true',
+                        help='use the vectorized NumPy engine (requires numpy)')
+    parser.add_argument('--worst', type=int, default=0, metavar='N',
+                        help='with --numpy, list the N scenarios and responses with the most bad combos per category')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='analyze categories in N worker processes (default: 1, serial)')
+    parser.add_argument('--shard-size', type=int, default=2000, metavar='N',
+                        help='with --jobs, split categories with more than N scenarios into shards (default: 2000)')
+    parser.add_argument('--examples', type=int, default=1, metavar='K',
+                        help='bad combos to keep per issue key and per scenario (default: 1); counts stay exact')
+    parser.add_argument('--reservoir', action='store_true',
+                        help='keep a uniform random sample of K bad combos instead of the first K (exhaustive mode only)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for --reservoir (default: 0)')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='grammar_check', description='Grammar/sense checks for the card decks.')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+    common = common_arguments()
+
+    commands.add_parser('quick', parents=[common], help='quick grammar/sense test of scenario + response combos',
+                        description='Quick grammar/sense test of scenario + response combos.')
+
+    deep = commands.add_parser('deep', parents=[common], help='deep analysis of every scenario × response combo',
+                               description='Deep grammar analysis of every scenario × response combo.')
+    add_deep_arguments(deep)
+    deep.add_argument('--profile', action='store_true',
+                      help='append wall time per phase and per-rule hit counts and regex cost to the report')
+    deep.add_argument('--sample', action='store_true',
+                      help='estimate the OK rate from stratified samples with 95%% intervals instead of a full run')
+    deep.add_argument('--precision', type=float, default=0.005, metavar='P',
+                      help='with --sample, stop once every interval is within ±P (default: 0.005)')
+    deep.add_argument('--budget', type=float, default=5.0, metavar='SECONDS',
+                      help='with --sample, stop after this many seconds at most (default: 5)')
+    deep.add_argument('--watch', action='store_true',
+                      help='after the report, re-check the deck on every save and print what changed')
+    deep.add_argument('--interval', type=float, default=0.05, metavar='SECONDS',
+                      help='with --watch, how often to look at the deck file (default: 0.05)')
+    deep.add_argument('--detail-category', default='genz', metavar='KEY',
+                      help='category to list scenario by scenario at the end of the report (default: genz)')
+
+    detail = commands.add_parser('genz-detail', parents=[common], help='per-scenario verdicts for one category',
+                                 description='Per-scenario OK/BAD counts and first bad responses for one category.')
+    detail.add_argument('--category', default='genz', metavar='KEY', help='category key (default: genz)')
+
+    index = commands.add_parser('index', parents=[common], help="write the web dealer's compatibility index",
+                                description='Write the per-card compatibility index js/app.js deals from.')
+    index.add_argument('-o', '--output', default=None, metavar='PATH',
+                       help='index file to write (default: the deck path with .index.json)')
+    index.add_argument('--check', action='store_true',
+                       help="don't write anything; exit 1 when the index is out of date for the deck or the classifiers")
+
+    bundle = commands.add_parser('bundle', parents=[common], help='write per-category bundles for the web game',
+                                 description='Write normalized, minified, precompressed per-category bundles.')
+    bundle.add_argument('-o', '--output', default=None, metavar='DIR',
+                        help='bundle directory (default: categories/ next to the deck)')
+    bundle.add_argument('--check', action='store_true',
+                        help="don't write anything; exit 1 when the bundles are out of date for the deck or the "
+                             "classifiers")
+
+    comp = commands.add_parser('compile', parents=[common], help='write a compiled, memory-mapped deck',
+                               description='Compile the deck into a binary file with every card classified; '
+                                           'give it to any command with --deck.')
+    comp.add_argument('-o', '--output', default=None, metavar='PATH',
+                      help='compiled deck to write (default: the deck path with .bin)')
+
+    dedupe = commands.add_parser('dedupe', help='find duplicate and near-duplicate cards across deck sources',
+                                 description='Find duplicate and near-duplicate cards with MinHash/LSH.')
+    dedupe.add_argument('sources', nargs='*', metavar='PATH',
+                        help='deck files (.json) and numbered card lists (.txt) (default: the decks, backups and lists)')
+    dedupe.add_argument('--threshold', type=float, default=0.7, metavar='J',
+                        help='minimum Jaccard similarity of character shingles (default: 0.7)')
+    dedupe.add_argument('--shingle', type=int, default=4, metavar='K', help='shingle length in characters (default: 4)')
+    dedupe.add_argument('--bands', type=int, default=32, metavar='B', help='LSH bands (default: 32)')
+    dedupe.add_argument('--rows', type=int, default=4, metavar='R', help='MinHash rows per band (default: 4)')
+    dedupe.add_argument('--near-only', action='store_true', help='skip clusters that are only identical copies')
+    output.add_arguments(dedupe)
+
+    imp = commands.add_parser('import', parents=[common], help='merge numbered card lists into a deck category',
+                              description='Merge numbered card lists (like response_cards.txt) into a deck category.')
+    imp.add_argument('lists', nargs='+', metavar='LIST', help='numbered card list files')
+    imp.add_argument('--category', required=True, metavar='KEY', help='category to merge into')
+    imp.add_argument('--kind', choices=('scenarios', 'responses'), default=None,
+                     help="card kind, if the lists' headers and file names don't say")
+    imp.add_argument('--name', default=None, help='display name, to create a new category')
+    imp.add_argument('--description', default=None, help='description for a new category')
+    imp.add_argument('--dry-run', action='store_true', help='report what would be imported without writing the deck')
+
+    batch = commands.add_parser('batch', help='leaderboards of OK rate for every deck in a directory',
+                                description='Check every deck file under a directory in a worker pool and rank '
+                                            'the packs and their categories by OK rate. Exits 1 when a deck '
+                                            'could not be checked.')
+    batch.add_argument('directory', metavar='DIR', help='directory to search for deck files')
+    batch.add_argument('--glob', action='append', default=None, metavar='PATTERN',
+                       help="file name pattern of decks, repeatable (default: '*.json')")
+    batch.add_argument('--jobs', type=int, default=None, metavar='N',
+                       help='worker processes (default: one per CPU)')
+    batch.add_argument('--timeout', type=float, default=60.0, metavar='SECONDS',
+                       help='give up on a deck still being analyzed after this long (default: 60)')
+    batch.add_argument('--cache', default=DEFAULT_PATH, metavar='PATH',
+                       help=f'classification cache file (default: {DEFAULT_PATH})')
+    batch.add_argument('--no-cache', action='store_true', help='classify every card from scratch')
+    output.add_arguments(batch)
+
+    diff = commands.add_parser('diff', parents=[common], help='OK/BAD delta between two versions of a deck',
+                               description='Check only the combos that changed between an older deck and --deck.')
+    diff.add_argument('base', metavar='OLD', help='older version of the deck, e.g. data/cards.json.bak')
+
+    mixed = commands.add_parser('mixed', parents=[common], help='categories pooled into one deck',
+                                description='Check several categories pooled into one deck and show BAD % for '
+                                            'every scenario category × response category pair.')
+    mixed.add_argument('categories', nargs='*', metavar='KEY', help='categories to pool (default: all)')
+    mixed.add_argument('--block', type=int, default=64, metavar='N',
+                       help='scenario categories per block of the matrix (default: 64)')
+
+    opt = commands.add_parser('optimize', parents=[common], help='fewest response changes to reach a target OK rate',
+                              description='Work out the fewest responses to rewrite or drop per category to reach '
+                                          'a target OK rate, and rank the costliest verb-slot scenarios.')
+    opt.add_argument('--target', type=float, default=0.99, metavar='RATE',
+                     help='OK rate to reach, between 0 and 1 (default: 0.99)')
+
+    sim = commands.add_parser('simulate', parents=[common],
+                              help='how often the web game deals a hand with no fitting card',
+                              description="Monte Carlo simulation of js/app.js's dealing (requires numpy).")
+    sim.add_argument('--games', type=int, default=10000, metavar='N',
+                     help='games per category and player count (default: 10000)')
+    sim.add_argument('--players', type=int, nargs='+', default=None, metavar='N',
+                     help='player counts (default: 3 to 12)')
+    sim.add_argument('--categories', nargs='+', default=None, metavar='KEY',
+                     help='categories to simulate (default: all)')
+    sim.add_argument('--blind', action='store_true', help='deal without the compatibility index (no ensureCompatible)')
+    sim.add_argument('--rounds', type=int, default=None, metavar='N',
+                     help='rounds per game (default: until the scenarios run out)')
+    sim.add_argument('--shuffle-when-stuck', action='store_true', help='stuck players use shuffleHand once')
+    sim.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+
+    serve = commands.add_parser('serve', help='local HTTP daemon answering combo and hand queries',
+                                description='Serve the classifiers over HTTP for the dev build of the web game '
+                                            'and the card editor, reloading the deck when it changes.')
+    serve.add_argument('--deck', default=DECK_PATH, metavar='PATH', help=f'deck file to serve (default: {DECK_PATH})')
+    serve.add_argument('--cache', default=DEFAULT_PATH, metavar='PATH',
+                       help=f'classification cache file (default: {DEFAULT_PATH})')
+    serve.add_argument('--no-cache', action='store_true', help='classify every card from scratch')
+    serve.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=8765, help='port to listen on (default: 8765)')
+    serve.add_argument('--interval', type=float, default=1.0, metavar='SECONDS',
+                       help='how often to look for changes to the deck file (default: 1)')
+    serve.add_argument('--verbose', action='store_true', help='log every request to stderr')
+
+    synth = commands.add_parser('synth', help='write a synthetic deck shaped like the real ones',
+                                description='Write a synthetic deck shaped like data/cards.json.')
+    synth.add_argument('cards', type=int, help='number of cards')
+    synth.add_argument('-o', '--output', required=True, metavar='PATH', help='deck file to write')
+    synth.add_argument('--categories', type=int, default=9, metavar='N', help='number of categories (default: 9)')
+    synth.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+
+    bench = commands.add_parser('bench', help='time the checks on synthetic decks against stored baselines',
+                                description='Time the checks on synthetic decks; exit 1 when one regressed.')
+    bench.add_argument('--sizes', type=int, nargs='+', default=None, metavar='N',
+                       help='deck sizes in cards (default: 1000 10000 100000 1000000)')
+    bench.add_argument('--repeat', type=int, default=3, metavar='N', help='runs per benchmark, best counts (default: 3)')
+    bench.add_argument('--baselines', default=None, metavar='PATH',
+                       help='baseline file (default: bench_baselines.json)')
+    bench.add_argument('--tolerance', type=float, default=None, metavar='X',
+                       help='fail when a benchmark is more than X times its baseline (default: 2.0)')
+    bench.add_argument('--update', action='store_true', help='store this run as the new baselines')
+    return parser
+
+
+def deep_analyzer(parser, args, cache):
+    from .deep import DeepAnalyzer
+
+    if args.reservoir and (args.aggregate or args.numpy):
+        parser.error('--reservoir needs the exhaustive mode (no --aggregate/--numpy)')
+    if args.examples < 0:
+        parser.error('--examples must not be negative')
+    if args.worst and not args.numpy:
+        parser.error('--worst requires --numpy')
+    if args.jobs < 1 or args.shard_size < 1:
+        parser.error('--jobs and --shard-size must be at least 1')
+    if args.sample and (args.profile or args.jobs > 1):
+        parser.error('--sample runs on its own; drop --profile and --jobs')
+    if args.sample and (args.precision <= 0 or args.budget <= 0):
+        parser.error('--precision and --budget must be positive')
+    if args.watch and (args.sample or args.profile or args.stream):
+        parser.error('--watch keeps the deck in memory; drop --sample, --profile and --stream')
+    if args.watch:
+        from .binary import is_compiled
+        if is_compiled(args.deck):
+            parser.error('--watch re-reads the JSON deck as it is edited; give it cards.json, not a compiled deck')
+    if args.watch and args.interval <= 0:
+        parser.error('--interval must be positive')
+    if args.profile and args.jobs > 1:
+        parser.error('--profile times the work in this process; run it without --jobs')
+    if args.numpy:
+        try:
+            import numpy
+        except ImportError:
+            parser.error('--numpy requires numpy (pip install numpy)')
+    mode = 'numpy' if args.numpy else 'aggregate' if args.aggregate else 'exhaustive'
+    return DeepAnalyzer(mode, examples=args.examples, reservoir=args.reservoir, seed=args.seed,
+                        worst=args.worst, jobs=args.jobs, shard_size=args.shard_size, cache=cache)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'synth':
+        from .synth import write_deck
+        write_deck(args.output, args.cards, args.categories, args.seed)
+        return 0
+    if args.command == 'bench':
+        import sys
+        from . import bench
+        regressions = bench.run_bench(
+            args.sizes or bench.SIZES, args.repeat, args.baselines or bench.BASELINES_PATH,
+            args.tolerance or bench.TOLERANCE, args.update, out=sys.stdout)
+        return 1 if regressions else 0
+    if args.command == 'dedupe':
+        from .dedupe import SOURCES, find_clusters, report_clusters
+        report = output.Report.from_args(args)
+        clusters, cards, texts = find_clusters(args.sources or SOURCES, args.threshold, args.shingle,
+                                               args.bands, args.rows)
+        report_clusters(report, clusters, cards, texts, args.near_only)
+        report.close()
+        return 0
+    if args.command == 'serve':
+        if args.interval <= 0:
+            parser.error('--interval must be positive')
+        from .deep import DeepAnalyzer
+        from .serve import Daemon, serve
+        # Reloads (and their cache writes) happen on the polling thread.
+        cache = None if args.no_cache else ClassificationCache(args.cache, check_same_thread=False)
+        try:
+            daemon = Daemon(DeepAnalyzer(cache=cache), args.deck, args.interval)
+            ready = lambda server: print(f'Serving {args.deck} ({len(daemon.snapshot.names)} categories) on '
+                                         f'http://{args.host}:{server.server_address[1]}/ — Ctrl-C to stop',
+                                         flush=True)
+            serve(daemon, args.host, args.port, args.verbose, ready)
+        finally:
+            if cache is not None:
+                cache.close()
+        return 0
+    cache = None if args.no_cache else ClassificationCache(args.cache)
+    report = output.Report.from_args(args)
+    status = 0
+    try:
+        if args.command == 'quick':
+            from .quick import EXAMPLES, QuickChecker, run_quick
+            examples = EXAMPLES if args.limit is None else max(args.limit, 0)
+            run_quick(QuickChecker(cache, examples), report, args.deck, args.stream)
+        elif args.command == 'deep':
+            from .deep import run_deep
+            analyzer = deep_analyzer(parser, args, cache)
+            if args.sample:
+                from .deck import iter_deck
+                from .sample import estimate, report_sample
+                result = estimate(analyzer, iter_deck(args.deck, args.stream), args.precision, args.budget, args.seed)
+                report_sample(report, result, args.precision)
+            elif args.profile:
+                from .profiling import Profiler, report_profile
+                profiler = Profiler()
+                profiler.instrument(analyzer)
+                profiler.timed('report', run_deep)(analyzer, report, args.deck, args.stream, args.detail_category,
+                                                   profiler)
+                report_profile(profiler, report)
+            else:
+                run_deep(analyzer, report, args.deck, args.stream, args.detail_category)
+            if args.watch:
+                from .watch import DeckWatcher, run_watch
+                run_watch(DeckWatcher(analyzer, args.deck), report, args.interval)
+        elif args.command == 'index' and args.check:
+            from .index import index_path_for, stale_categories
+            path = args.output or index_path_for(args.deck)
+            stale = stale_categories(args.deck, path)
+            report.line(f'{path} is out of date for: {", ".join(stale)}' if stale else f'{path} is up to date')
+            report.record('index', path=path, stale=stale)
+            status = 1 if stale else 0
+        elif args.command == 'index':
+            from .deep import DeepAnalyzer
+            from .index import write_index
+            path = write_index(DeepAnalyzer(cache=cache), args.deck, args.output)
+            report.line(f'Wrote {path}')
+            report.record('index', path=path)
+        elif args.command == 'import':
+            from .deep import DeepAnalyzer
+            from .importer import import_lists, report_import
+            try:
+                result = import_lists(DeepAnalyzer(cache=cache), args.lists, args.category, args.deck, args.kind,
+                                      args.name, args.description, args.dry_run)
+            except ValueError as e:
+                parser.error(str(e))
+            report_import(report, result, args.category, args.deck, args.dry_run)
+            if not args.dry_run and any(result.added.values()):
+                report.line("\n  Rebuild the web game's index and bundles: python -m grammar_check index / bundle")
+        elif args.command == 'batch':
+            if (args.jobs is not None and args.jobs < 1) or args.timeout <= 0:
+                parser.error('--jobs must be at least 1 and --timeout positive')
+            import os
+            if not os.path.isdir(args.directory):
+                parser.error(f'not a directory: {args.directory}')
+            from .batch import PATTERNS, run_batch
+            failed = run_batch(report, args.directory, args.glob or PATTERNS, args.jobs, args.timeout, cache)
+            status = 1 if failed else 0
+        elif args.command == 'diff':
+            from .deep import DeepAnalyzer
+            from .diff import diff_decks, report_diff
+            report_diff(report, diff_decks(DeepAnalyzer(cache=cache), args.base, args.deck), args.base, args.deck)
+        elif args.command == 'mixed':
+            if args.block < 1:
+                parser.error('--block must be at least 1')
+            from .deck import iter_deck
+            from .deep import DeepAnalyzer
+            from .mixed import CategoryVectors, report_mixed
+            vectors = CategoryVectors(DeepAnalyzer(cache=cache), iter_deck(args.deck, args.stream), args.categories)
+            missing = set(args.categories) - set(vectors.keys)
+            if missing:
+                parser.error(f"not in {args.deck}: {', '.join(sorted(missing))}")
+            report_mixed(report, vectors, args.block)
+        elif args.command == 'optimize':
+            if not 0 < args.target <= 1:
+                parser.error('--target must be between 0 and 1')
+            from .deck import iter_deck
+            from .deep import DeepAnalyzer
+            from .optimize import report_plans
+            report_plans(DeepAnalyzer(cache=cache), iter_deck(args.deck, args.stream), report, args.target)
+        elif args.command == 'simulate':
+            if args.games < 1 or any(n < 3 or n > 12 for n in args.players or ()):
+                parser.error('--games must be at least 1 and --players between 3 and 12')
+            try:
+                from .simulate import PLAYERS, report_simulation, simulate
+            except ImportError:
+                parser.error('simulate requires numpy (pip install numpy)')
+            from .deep import DeepAnalyzer
+            dealer = 'blind' if args.blind else 'index'
+            results = simulate(DeepAnalyzer(cache=cache), args.deck, args.games, args.players or PLAYERS,
+                               args.categories, dealer, args.rounds, args.shuffle_when_stuck, args.seed)
+            report_simulation(report, results, dealer, args.shuffle_when_stuck)
+        elif args.command == 'bundle' and args.check:
+            from .bundle import bundle_dir_for, bundles_are_current
+            out_dir = args.output or bundle_dir_for(args.deck)
+            current = bundles_are_current(args.deck, out_dir)
+            report.line(f'The bundles in {out_dir} are ' + ('up to date' if current else 'out of date'))
+            report.record('bundle', path=out_dir, current=current)
+            status = 0 if current else 1
+        elif args.command == 'bundle':
+            from .bundle import bundle_dir_for, brotli, write_bundles
+            from .deep import DeepAnalyzer
+            out_dir = args.output or bundle_dir_for(args.deck)
+            manifest = write_bundles(DeepAnalyzer(cache=cache), args.deck, out_dir)
+            for cat_key, info in manifest['categories'].items():
+                sizes = ', '.join(f'{variant} {n}' for variant, n in info['bytes'].items())
+                report.line(f"  {info['file']:<24} {sizes}")
+                report.record('bundle', category=cat_key, **info)
+            report.line(f'Wrote {len(manifest["categories"])} bundles to {out_dir}'
+                        + ('' if brotli is not None else ' (no .br variants: brotli is not installed)'))
+        elif args.command == 'compile':
+            import time
+            from .binary import compile_deck, compiled_path
+            from .deck import iter_deck
+            from .deep import DeepAnalyzer
+            path = args.output or compiled_path(args.deck)
+            if path == args.deck:
+                parser.error('the compiled deck would replace the deck; give another path with -o')
+            start = time.perf_counter()
+            n_categories, n_cards = compile_deck(DeepAnalyzer(cache=cache), iter_deck(args.deck, args.stream), path)
+            report.line(f'Wrote {path}: {n_categories} categories, {n_cards} cards '
+                        f'({time.perf_counter() - start:.2f}s)')
+            report.record('compile', path=path, categories=n_categories, cards=n_cards)
+        else:
+            from .deep import DeepAnalyzer, run_category_detail
+            try:
+                run_category_detail(DeepAnalyzer(cache=cache), report, args.deck, args.stream, args.category)
+            except KeyError:
+                parser.error(f'no category {args.category!r} in {args.deck}')
+        report.close()
+    finally:
+        if cache is not None:
+            cache.close()
+    return status
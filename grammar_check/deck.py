@@ -0,0 +1,93 @@
+"""
+Loading decks and normalizing scenarios the way the web game does, and
+reading the numbered card lists (scenario_cards.txt, response_cards.txt).
+"""
+import json
+import os
+import re
+
+from . import stream
+
+DECK_PATH = 'data/cards.json'
+
+# '12. "Sharma Ji ka beta."' or '3. The rishta photo looks nothing like you...'
+_LIST_ITEM = re.compile(r'\s*\d+\.\s+(.*?)\s*$')
+
+
+def normalize_scenario(s):
+    """Merge multi-blank scenarios into a single blank, same as the JS loadCategory.
+
+    Returns None if the scenario doesn't end up with exactly one blank.
+    """
+    blanks = s.count('_____')
+    if blanks > 1:
+        first = s.index('_____')
+        last = s.rindex('_____')
+        head = s[:first + 5]
+        tail = s[last + 5:]
+        s = re.sub(r'\s+', ' ', head + tail).strip()
+        if s.count('_____') != 1:
+            return None
+    if '_____' not in s:
+        return None
+    return s
+
+
+def load_deck(path=DECK_PATH):
+    """The deck as a dict; a compiled deck (see binary.py) is mapped rather than read."""
+    from . import binary
+    if binary.is_compiled(path):
+        return binary.open_deck(path).categories()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_deck(path=DECK_PATH, streaming=False, data=None):
+    """Yield (key, category) pairs from a deck file, or from an already loaded deck.
+
+    With streaming=True only one category is in memory at a time; its card
+    arrays are still lists, since the analysis makes several passes over them.
+    A compiled deck is never all in memory, so it isn't streamed.
+    """
+    from . import binary
+    if data is not None:
+        yield from data.items()
+        return
+    if not streaming or binary.is_compiled(path):
+        yield from load_deck(path).items()
+        return
+    for cat_key, cat_data in stream.iter_categories(path):
+        cat_data['scenarios'] = list(cat_data['scenarios'])
+        cat_data['responses'] = list(cat_data['responses'])
+        yield cat_key, cat_data
+
+
+def card_list_kind(path, header=None):
+    """'scenarios' or 'responses' for a numbered card list, from its header or file name."""
+    for text in (header or '', os.path.basename(path)):
+        text = text.lower()
+        if 'scenario' in text:
+            return 'scenarios'
+        if 'response' in text:
+            return 'responses'
+    return None
+
+
+def iter_card_list(path):
+    """Yield (kind, text) for each card of a numbered card list, one line at a time.
+
+    The header line ("Response Cards (60)") picks the kind; quotes around a
+    card are dropped.
+    """
+    kind = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            m = _LIST_ITEM.match(line)
+            if m is None:
+                if kind is None and line.strip():
+                    kind = card_list_kind(path, line)
+                continue
+            text = m.group(1)
+            if len(text) >= 2 and text[0] == text[-1] == '"':
+                text = text[1:-1]
+            yield kind or card_list_kind(path), text
@@ -0,0 +1,173 @@
+"""
+Near-duplicate card detection across every deck source, with MinHash/LSH.
+
+Each distinct card text (identical copies across sources are merged first and
+keep all their provenances) is reduced to a set of character shingles and a
+MinHash signature. Signatures are cut into bands; texts that agree on a whole
+band land in the same bucket and become candidate pairs, so only texts that
+are likely similar are ever compared. Candidates are then checked with the
+exact Jaccard similarity of their shingle sets, and pairs at or above the
+threshold are merged into clusters. The work is linear in the number of cards
+plus the number of candidate pairs, instead of all pairs.
+
+With `bands` bands of `rows` rows, a pair with Jaccard similarity s becomes a
+candidate with probability 1 - (1 - s**rows)**bands; the defaults (32 × 4)
+catch pairs above 0.6 almost surely.
+"""
+import random
+import re
+import zlib
+
+from .deck import iter_card_list, load_deck
+
+SOURCES = [
+    'data/cards.json',
+    'data/cards.json.bak',
+    'backup_2026-02-22/data/cards.json',
+    'scenario_cards.txt',
+    'response_cards.txt',
+]
+THRESHOLD = 0.7
+SHINGLE = 4
+BANDS = 32
+ROWS = 4
+
+_PRIME = (1 << 61) - 1
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def iter_source_cards(path):
+    """Yield (text, provenance) for every card in a deck file or numbered card list."""
+    if path.endswith('.txt'):
+        for kind, text in iter_card_list(path):
+            yield text, {'source': path, 'category': None, 'kind': kind}
+        return
+    for cat_key, cat_data in load_deck(path).items():
+        for kind in ('scenarios', 'responses'):
+            for text in cat_data[kind]:
+                yield text, {'source': path, 'category': cat_key, 'kind': kind}
+
+
+def normalize_text(text):
+    """Lowercase, blanks as one token, punctuation and extra spaces dropped."""
+    text = text.lower().replace('_____', ' _ ')
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def shingles(text, k=SHINGLE):
+    """Character k-grams of a normalized text, as 32-bit hashes."""
+    if len(text) <= k:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {zlib.crc32(text[i:i + k].encode('utf-8')) for i in range(len(text) - k + 1)}
+
+
+class MinHasher:
+    """num_perm universal hash functions h(x) = (a*x + b) mod p, fixed by seed."""
+
+    def __init__(self, num_perm, seed=0):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set):
+        return [min((a * x + b) % _PRIME for x in shingle_set) for a, b in self.params]
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def candidate_pairs(signatures, bands, rows):
+    """Pairs of indices that share at least one LSH band bucket."""
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        lo = band * rows
+        for i, sig in enumerate(signatures):
+            buckets.setdefault(tuple(sig[lo:lo + rows]), []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pairs.add((members[x], members[y]))
+    return pairs
+
+
+def find_clusters(sources=SOURCES, threshold=THRESHOLD, k=SHINGLE, bands=BANDS, rows=ROWS, seed=0):
+    """Return (clusters, cards, texts).
+
+    Each cluster is a dict with 'members' ([{'text', 'provenance': [...]}]),
+    'copies' (total cards) and 'similarity' (the lowest Jaccard similarity of
+    the pairs that joined it, 1.0 for identical copies), largest first.
+    Clusters of a single text with several copies are exact duplicates.
+    """
+    by_text = {}
+    cards = 0
+    for path in sources:
+        for text, prov in iter_source_cards(path):
+            cards += 1
+            by_text.setdefault(normalize_text(text), []).append((text, prov))
+    keys = list(by_text)
+    shingle_sets = [shingles(key, k) for key in keys]
+    hasher = MinHasher(bands * rows, seed)
+    signatures = [hasher.signature(s) for s in shingle_sets]
+
+    parent = list(range(len(keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    min_sim = {}
+    for i, j in candidate_pairs(signatures, bands, rows):
+        sim = jaccard(shingle_sets[i], shingle_sets[j])
+        if sim >= threshold:
+            ri, rj = find(i), find(j)
+            low = min(sim, min_sim.get(ri, 1.0), min_sim.get(rj, 1.0))
+            if ri != rj:
+                parent[rj] = ri
+            min_sim[ri] = low
+
+    groups = {}
+    for i in range(len(keys)):
+        groups.setdefault(find(i), []).append(i)
+    clusters = []
+    for root, members in groups.items():
+        copies = sum(len(by_text[keys[i]]) for i in members)
+        if copies < 2:
+            continue
+        clusters.append({
+            'members': [{'text': by_text[keys[i]][0][0], 'provenance': [p for _, p in by_text[keys[i]]]}
+                        for i in members],
+            'copies': copies,
+            'similarity': round(min_sim.get(root, 1.0), 3),
+        })
+    clusters.sort(key=lambda c: (-len(c['members']), -c['copies']))
+    return clusters, cards, len(keys)
+
+
+def provenance_label(prov):
+    if prov['category'] is None:
+        return prov['source']
+    return f"{prov['source']}:{prov['category']}/{prov['kind']}"
+
+
+def report_clusters(report, clusters, cards, texts, near_only=False):
+    if near_only:
+        clusters = [c for c in clusters if len(c['members']) > 1]
+    report.line("=" * 100)
+    report.line("DUPLICATE AND NEAR-DUPLICATE CARDS")
+    report.line("=" * 100)
+    report.line(f"  {cards} cards, {texts} distinct texts, {len(clusters)} clusters")
+    report.record('summary', cards=cards, texts=texts, clusters=len(clusters))
+    if not report.detail:
+        return
+    for n, cluster in enumerate(report.cap(clusters), 1):
+        kind = 'near' if len(cluster['members']) > 1 else 'exact'
+        report.line(f"\n  Cluster {n}: {cluster['copies']} copies of {len(cluster['members'])} text(s) "
+                    f"({kind}, Jaccard ≥ {cluster['similarity']:.2f})")
+        for member in cluster['members']:
+            report.line(f"    \"{member['text'][:80]}\"")
+            for label in sorted({provenance_label(p) for p in member['provenance']}):
+                report.line(f"        {label}")
+        report.record('cluster', match=kind, **cluster)
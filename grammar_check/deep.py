@@ -0,0 +1,883 @@
+"""
+Deep check: for every category, substitute EVERY response into EVERY
+scenario and check if the result makes grammatical sense.
+
+Key insight: Scenarios have different "slot types" based on what comes before _____:
+  - "The tea is: _____" → expects a NOUN/ADJECTIVE (something that IS something)
+  - "I'm literally: _____" → expects IDENTITY (adjective/noun/gerund)
+  - "Caught myself simping over: _____" → expects OBJECT (noun/gerund)
+  - "The cope is real when I: _____" → expects VERB PHRASE (I do something)
+  - "It's giving _____ energy" → expects ADJECTIVE/NOUN modifier
+
+We classify each scenario blank into what grammatical form it needs,
+and each response into its grammatical form, then check compatibility.
+
+DeepAnalyzer runs the check in one of three modes, all producing the same
+result:
+
+  exhaustive  walks every scenario × response pair
+  aggregate   multiplies slot-type and response-type counts against COMPAT,
+              O(S+R) per category
+  numpy       the same with code arrays and a boolean COMPAT matrix (see
+              numpy_engine.py); can also rank worst offenders
+
+Counts are always exact, but only `examples` bad combos are kept per issue
+key and per scenario (the first K, or a uniform sample with reservoir=True),
+so memory does not grow with the number of bad combos.
+
+With jobs > 1 categories are analyzed in a pool of worker processes, and
+categories with more than shard_size scenarios are split into shards. Shard
+results are merged back in deck order, so the report is identical to a
+serial run.
+"""
+import collections
+import concurrent.futures
+import functools
+import random
+import re
+
+from .cache import ClassificationCache, classifier_version, digest
+from .deck import DECK_PATH, iter_deck, load_deck, normalize_scenario
+from .rules import DEEP_RESPONSE_RULES, DEEP_SCENARIO_RULES, SEP
+
+MODES = ('exhaustive', 'aggregate', 'numpy')
+
+# ── Scenario slot classification ──
+# The rules themselves live in rules.py as one compiled table.
+def scenario_slot_text(s):
+    """Return (text the scenario rules match, normalized scenario); the text is None without a single blank."""
+    sl = s.lower().strip()
+
+    # First, normalize multi-blank → single blank (same as JS)
+    blanks = sl.count('_____')
+    if blanks > 1:
+        first = sl.index('_____')
+        last = sl.rindex('_____')
+        head = sl[:first + 5]
+        tail = sl[last + 5:]
+        sl = re.sub(r'\s+', ' ', head + tail).strip()
+        if sl.count('_____') != 1:
+            return None, sl
+    if '_____' not in sl:
+        return None, sl
+
+    # What's before and after the blank?
+    before = sl[:sl.index('_____')].strip()
+    after = sl[sl.index('_____') + 5:].strip()
+    return before + SEP + after, sl
+
+def classify_scenario_slot_rule(s):
+    """What grammatical form does the blank expect? Returns (slot_type, rule, normalized)."""
+    text, sl = scenario_slot_text(s)
+    if text is None:
+        return 'SKIP', 'skip', sl
+    slot_type, rule = DEEP_SCENARIO_RULES.classify(text)
+    return slot_type, rule, sl
+
+def classify_scenario_slot(s):
+    slot_type, _, sl = classify_scenario_slot_rule(s)
+    return slot_type, sl
+
+# ── Response classification ──
+def response_text(r):
+    """The text the response rules match."""
+    return r.lower().strip().rstrip('.')
+
+def classify_response_rule(r):
+    """Returns (resp_type, rule)."""
+    return DEEP_RESPONSE_RULES.classify(response_text(r))
+
+def classify_response(r):
+    return classify_response_rule(r)[0]
+
+def classifier_versions():
+    """[scenario, response] classifier versions, shared by the cache and compiled decks' type codes (binary.py).
+
+    Each covers the rule table and every function from the card text to it;
+    the scenario one also normalize_scenario, since compiled decks store the
+    types of normalized scenarios.
+    """
+    return [classifier_version(DEEP_SCENARIO_RULES, classify_scenario_slot_rule, scenario_slot_text,
+                               normalize_scenario),
+            classifier_version(DEEP_RESPONSE_RULES, classify_response_rule, response_text)]
+
+# ── Compatibility matrix ──
+# For each scenario slot type, which response types are grammatically OK?
+COMPAT = {
+    'IS_PREDICATE': {
+        # "The tea is: [X]" — what CAN follow "is"?
+        'GERUND': True,        # "The tea is: getting drunk" ✓
+        'NOUN_PHRASE': True,   # "The tea is: a complete mess" ✓
+        'ADJECTIVE': True,     # "The tea is: chronically online" ✓
+        'SHORT_LABEL': True,   # "The tea is: sober" ✓ 
+        'PREP_PHRASE': True,   # "The tea is: at the gym" ✓
+        'SENTENCE_FRAG': False,# "The tea is: can't even adult" ✗
+        'TRUMP': True,
+    },
+    'IDENTITY': {
+        # "I'm literally: [X]" — same as IS_PREDICATE
+        'GERUND': True, 'NOUN_PHRASE': True, 'ADJECTIVE': True,
+        'SHORT_LABEL': True, 'PREP_PHRASE': True,
+        'SENTENCE_FRAG': False, 'TRUMP': True,
+    },
+    'GERUND_OBJECT': {
+        # "Caught myself simping over: [X]"
+        'GERUND': False,       # "Caught simping over: getting drunk" — questionable
+        'NOUN_PHRASE': True,   # "Caught simping over: a dead meme" ✓
+        'ADJECTIVE': False,    # "Caught simping over: chronically online" ✗
+        'SHORT_LABEL': True,   # "Caught simping over: sober" — OK ish
+        'PREP_PHRASE': False,  # "Caught simping over: at the gym" ✗
+        'SENTENCE_FRAG': False, 'TRUMP': True,
+    },
+    'ADJECTIVE_MODIFIER': {
+        # "It's giving _____ energy" — needs adjective/noun modifier
+        'GERUND': False,       # "It's giving getting drunk energy" ✗
+        'NOUN_PHRASE': False,  # "It's giving a complete mess energy" ✗  
+        'ADJECTIVE': True,     # "It's giving chronically online energy" ✓
+        'SHORT_LABEL': True,   # "It's giving sober energy" ✓
+        'PREP_PHRASE': False,  # "It's giving at the gym energy" ✗
+        'SENTENCE_FRAG': False, 'TRUMP': True,
+    },
+    'I_VERB': {
+        # "The cope is real when I: [X]"
+        'GERUND': False,       # "when I: getting drunk" ✗
+        'NOUN_PHRASE': False,  # "when I: a complete mess" ✗
+        'ADJECTIVE': False,    # "when I: chronically online" ✗
+        'SHORT_LABEL': False,  # most don't work
+        'PREP_PHRASE': False,
+        'SENTENCE_FRAG': True, # "when I: can't even adult" ✓ (needs verb)
+        'TRUMP': True,
+    },
+    'VERB_INF': {
+        # "Twitter saw me do: [X]" → needs noun/gerund
+        'GERUND': False, 'NOUN_PHRASE': True, 'ADJECTIVE': False,
+        'SHORT_LABEL': True, 'PREP_PHRASE': False,
+        'SENTENCE_FRAG': False, 'TRUMP': True,
+    },
+    'WHO_CLAUSE': {
+        # "I respect people who: [X]" → needs "who [verb]" compatible
+        'GERUND': False, 'NOUN_PHRASE': False, 'ADJECTIVE': False,
+        'SHORT_LABEL': False, 'PREP_PHRASE': False,
+        'SENTENCE_FRAG': True, 'TRUMP': True,
+    },
+    'SOMEONE_VERB': {
+        # "if someone: [X]" → needs verb phrase
+        'GERUND': False, 'NOUN_PHRASE': False, 'ADJECTIVE': False,
+        'SHORT_LABEL': False, 'PREP_PHRASE': False,
+        'SENTENCE_FRAG': True, 'TRUMP': True,
+    },
+    'FROM_GERUND': {
+        # "stopping me from: [X]" → needs gerund
+        'GERUND': True, 'NOUN_PHRASE': True, 'ADJECTIVE': False,
+        'SHORT_LABEL': True, 'PREP_PHRASE': False,
+        'SENTENCE_FRAG': False, 'TRUMP': True,
+    },
+    'OBJECT': {
+        # "addicted to: [X]", "full of: [X]", "judge me for: [X]"
+        'GERUND': True, 'NOUN_PHRASE': True, 'ADJECTIVE': False,
+        'SHORT_LABEL': True, 'PREP_PHRASE': False,
+        'SENTENCE_FRAG': False, 'TRUMP': True,
+    },
+    'NOUN_LABEL': {
+        # "My guilty pleasure: [X]" — very flexible
+        'GERUND': True, 'NOUN_PHRASE': True, 'ADJECTIVE': True,
+        'SHORT_LABEL': True, 'PREP_PHRASE': True,
+        'SENTENCE_FRAG': False, 'TRUMP': True,
+    },
+    'ANSWER': {
+        # Question format — almost anything works
+        'GERUND': True, 'NOUN_PHRASE': True, 'ADJECTIVE': True,
+        'SHORT_LABEL': True, 'PREP_PHRASE': True,
+        'SENTENCE_FRAG': True, 'TRUMP': True,
+    },
+    'OPEN': {
+        'GERUND': True, 'NOUN_PHRASE': True, 'ADJECTIVE': True,
+        'SHORT_LABEL': True, 'PREP_PHRASE': True,
+        'SENTENCE_FRAG': True, 'TRUMP': True,
+    },
+}
+
+
+class ExampleReservoir:
+    """Keeps at most k examples out of a stream of bad combos.
+
+    By default these are the first k in deck order; with an rng it is a
+    uniform reservoir sample instead (Algorithm R).
+    """
+
+    def __init__(self, k, rng=None):
+        self.k = k
+        self.rng = rng
+        self.seen = 0
+        self.items = []
+
+    def slot(self):
+        """Count one more example; return the index to store it at, or None to drop it."""
+        self.seen += 1
+        if len(self.items) < self.k:
+            self.items.append(None)
+            return len(self.items) - 1
+        if self.rng is not None:
+            j = self.rng.randrange(self.seen)
+            if j < self.k:
+                return j
+        return None
+
+
+def bad_example(s_raw, s, r, slot_type, r_type):
+    return {
+        'scenario': s_raw,
+        'response': r,
+        'filled': s.replace('_____', r),
+        'slot_type': slot_type,
+        'resp_type': r_type,
+    }
+
+
+def first_examples(kept, resp_types, k):
+    """The first k bad combos per issue key and per problem scenario, as the exhaustive loop would keep them.
+
+    kept is [(raw scenario, normalized scenario, slot type)] and resp_types is
+    [(response, resp type)], both in deck order. Every response of a bad type
+    is bad for every scenario of that slot type, so the first k combos of a
+    key come from its first k scenarios and first k responses.
+    """
+    resp_first = {}
+    for r, r_type in resp_types:
+        firsts = resp_first.setdefault(r_type, [])
+        if len(firsts) < k:
+            firsts.append(r)
+    slot_first = {}
+    for s_raw, s, slot_type in kept:
+        firsts = slot_first.setdefault(slot_type, [])
+        if len(firsts) < k:
+            firsts.append((s_raw, s))
+
+    by_key = {}
+    bad_firsts = {}
+    for slot_type, scenario_firsts in slot_first.items():
+        compat = COMPAT.get(slot_type, COMPAT['OPEN'])
+        bad_types = [rt for rt in resp_first if rt != 'TRUMP' and not compat.get(rt, True)]
+        for r_type in bad_types:
+            items = by_key[f"{slot_type} + {r_type}"] = []
+            for s_raw, s in scenario_firsts:
+                for r in resp_first[r_type]:
+                    if len(items) < k:
+                        items.append(bad_example(s_raw, s, r, slot_type, r_type))
+        # First k bad responses for this slot type, in response order.
+        if bad_types:
+            firsts = bad_firsts[slot_type] = []
+            for r, r_type in resp_types:
+                if len(firsts) == k:
+                    break
+                if r_type in bad_types:
+                    firsts.append((r, r_type))
+
+    by_scenario = {}
+    for s_raw, s, slot_type in kept:
+        firsts = bad_firsts.get(slot_type)
+        if firsts is None:
+            continue
+        items = by_scenario.setdefault(s_raw, [])
+        for r, r_type in firsts:
+            if len(items) < k:
+                items.append(bad_example(s_raw, s, r, slot_type, r_type))
+    return {'by_key': by_key, 'by_scenario': by_scenario}
+
+
+# ── Analysis ──
+class _CompiledKept:
+    """(raw, normalized) of a compiled deck's dealt scenarios, decoded when read."""
+
+    def __init__(self, scenarios, positions, normalize):
+        self.scenarios = scenarios
+        self.positions = positions
+        self.normalize = normalize
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        s_raw = self.scenarios[int(self.positions[i])]
+        return s_raw, self.normalize(s_raw)
+
+
+class DeepAnalyzer:
+    """Analyzes categories with one set of options.
+
+    A category result is (total, bad, slot_issues, problem_scenarios,
+    examples, worst): slot_issues maps "SLOT + RESP" → [count, first filled
+    example] and problem_scenarios maps raw scenario → bad count, both in
+    first-seen order; examples holds the kept bad combos per issue key
+    ('by_key') and per problem scenario ('by_scenario'); worst is
+    ([(scenario, bad), ...], [(response, bad), ...]) when worst > 0 in numpy
+    mode, else None.
+
+    With a cache, card classifications and (outside the exhaustive mode)
+    whole-category results are read from and written to it.
+    """
+
+    def __init__(self, mode='exhaustive', examples=1, reservoir=False, seed=0, worst=0,
+                 jobs=1, shard_size=2000, cache=None):
+        if mode not in MODES:
+            raise ValueError(f'unknown mode {mode!r}')
+        if reservoir and mode != 'exhaustive':
+            raise ValueError('reservoir sampling needs the exhaustive mode')
+        if worst and mode != 'numpy':
+            raise ValueError('worst-offender rankings need the numpy mode')
+        if examples < 0:
+            raise ValueError('examples must not be negative')
+        if jobs < 1 or shard_size < 1:
+            raise ValueError('jobs and shard_size must be at least 1')
+        self.mode = mode
+        self.examples = examples
+        self.reservoir = reservoir
+        self.seed = seed
+        self.worst = worst
+        self.jobs = jobs
+        self.shard_size = shard_size
+        self.cache = cache
+        self.normalize_scenario = normalize_scenario
+
+        self.classify_scenario_slot_rule = classify_scenario_slot_rule
+        self.classify_response_rule = classify_response_rule
+        self.results_scope = None
+        if cache is not None:
+            scenario_version, response_version = classifier_versions()
+            self.classify_scenario_slot_rule = cache.classifier(
+                'deep.scenario', classify_scenario_slot_rule, scenario_version)
+            self.classify_response_rule = cache.classifier('deep.response', classify_response_rule, response_version)
+            # Whole-category results only depend on the cards, the classifiers,
+            # COMPAT and the code turning types into results. Reservoir samples
+            # depend on the seed, so the exhaustive mode always re-runs.
+            if mode != 'exhaustive':
+                code = [normalize_scenario, bad_example, first_examples, DeepAnalyzer.shard_tasks,
+                        DeepAnalyzer.merge_results]
+                if mode == 'aggregate':
+                    code.append(DeepAnalyzer.analyze_category_aggregate)
+                else:
+                    from . import numpy_engine
+                    code += [DeepAnalyzer.analyze_category_numpy, _CompiledKept, numpy_engine]
+                self.results_scope = f'deep.analyze_category_{mode}'
+                self.results_version = digest([
+                    scenario_version, response_version, classifier_version(*code), COMPAT, worst, examples])
+
+        if mode == 'numpy':
+            from . import numpy_engine
+            self._np = numpy_engine
+            self.slot_types = list(COMPAT)
+            self.bad_matrix = numpy_engine.build_bad_matrix(COMPAT, self.slot_types)
+
+    def options(self):
+        """The keyword arguments that recreate this analyzer, minus jobs and cache."""
+        return {'mode': self.mode, 'examples': self.examples, 'reservoir': self.reservoir,
+                'seed': self.seed, 'worst': self.worst, 'shard_size': self.shard_size}
+
+    def classify_scenario_slot(self, s):
+        slot_type, _, sl = self.classify_scenario_slot_rule(s)
+        return slot_type, sl
+
+    def classify_response(self, r):
+        return self.classify_response_rule(r)[0]
+
+    def memoize(self, maxsize=None):
+        """Keep classifications in memory (the last maxsize, or all), for long-running callers; a cache already does."""
+        if self.cache is None and not hasattr(self.classify_response_rule, 'cache_info'):
+            self.classify_scenario_slot_rule = functools.lru_cache(maxsize)(self.classify_scenario_slot_rule)
+            self.classify_response_rule = functools.lru_cache(maxsize)(self.classify_response_rule)
+
+    def analyze_category(self, scenarios, responses):
+        if self.mode == 'numpy':
+            return self.analyze_category_numpy(scenarios, responses)
+        if self.mode == 'aggregate':
+            return self.analyze_category_aggregate(scenarios, responses)
+        return self.analyze_category_exhaustive(scenarios, responses)
+
+    def analyze_category_exhaustive(self, scenarios, responses):
+        """Check every scenario × response pair."""
+        total = 0
+        bad = 0
+        slot_issues = {}
+        problem_scenarios = {}
+        by_key = {}
+        by_scenario = {}
+        rng = random.Random(self.seed) if self.reservoir else None
+
+        # Classify all responses once
+        resp_types = [(r, self.classify_response(r)) for r in responses]
+
+        for s_raw in scenarios:
+            s = self.normalize_scenario(s_raw)
+            if s is None:
+                continue
+
+            slot_type, _ = self.classify_scenario_slot(s)
+            if slot_type == 'SKIP':
+                continue
+
+            compat = COMPAT.get(slot_type, COMPAT['OPEN'])
+
+            for r, r_type in resp_types:
+                if r_type == 'TRUMP':
+                    total += 1
+                    continue
+
+                total += 1
+                is_ok = compat.get(r_type, True)
+
+                if not is_ok:
+                    bad += 1
+                    key = (slot_type, r_type)
+                    issue = slot_issues.get(key)
+                    if issue is None:
+                        issue = slot_issues[key] = [0, s.replace('_____', r)]
+                        by_key[key] = ExampleReservoir(self.examples, rng)
+                    issue[0] += 1
+                    problem_scenarios[s_raw] = problem_scenarios.get(s_raw, 0) + 1
+
+                    i = by_key[key].slot()
+                    if i is not None:
+                        by_key[key].items[i] = bad_example(s_raw, s, r, slot_type, r_type)
+                    if s_raw not in by_scenario:
+                        by_scenario[s_raw] = ExampleReservoir(self.examples, rng)
+                    i = by_scenario[s_raw].slot()
+                    if i is not None:
+                        by_scenario[s_raw].items[i] = bad_example(s_raw, s, r, slot_type, r_type)
+
+        examples = {
+            'by_key': {f"{st} + {rt}": res.items for (st, rt), res in by_key.items()},
+            'by_scenario': {ps: res.items for ps, res in by_scenario.items()},
+        }
+        slot_issues = {f"{st} + {rt}": issue for (st, rt), issue in slot_issues.items()}
+        return total, bad, slot_issues, problem_scenarios, examples, None
+
+    def analyze_category_aggregate(self, scenarios, responses):
+        """Same result as analyze_category_exhaustive, from type histograms in O(S+R).
+
+        Examples are reconstructed from the first scenarios of each slot type
+        and the first responses of each response type, which are exactly the
+        first bad pairs the exhaustive loop would have produced for that key.
+        """
+        # Response histogram: type → count, plus the first response of each type,
+        # both in first-seen order so issue keys come out in the same order.
+        resp_counts = {}
+        resp_first = {}
+        resp_types = []
+        for r in responses:
+            r_type = self.classify_response(r)
+            resp_types.append((r, r_type))
+            if r_type not in resp_counts:
+                resp_counts[r_type] = 0
+                resp_first[r_type] = r
+            resp_counts[r_type] += 1
+        n_resp = len(responses)
+
+        total = 0
+        bad = 0
+        slot_issues = {}
+        problem_scenarios = {}
+        bad_per_slot = {}
+        kept = []
+        for s_raw in scenarios:
+            s = self.normalize_scenario(s_raw)
+            if s is None:
+                continue
+
+            slot_type, _ = self.classify_scenario_slot(s)
+            if slot_type == 'SKIP':
+                continue
+            kept.append((s_raw, s, slot_type))
+
+            if slot_type not in bad_per_slot:
+                compat = COMPAT.get(slot_type, COMPAT['OPEN'])
+                slot_bad = 0
+                for r_type, ct in resp_counts.items():
+                    if r_type != 'TRUMP' and not compat.get(r_type, True):
+                        slot_bad += ct
+                        slot_issues[f"{slot_type} + {r_type}"] = [0, s.replace('_____', resp_first[r_type])]
+                bad_per_slot[slot_type] = slot_bad
+
+            total += n_resp
+            slot_bad = bad_per_slot[slot_type]
+            if slot_bad:
+                bad += slot_bad
+                problem_scenarios[s_raw] = problem_scenarios.get(s_raw, 0) + slot_bad
+                compat = COMPAT.get(slot_type, COMPAT['OPEN'])
+                for r_type, ct in resp_counts.items():
+                    if r_type != 'TRUMP' and not compat.get(r_type, True):
+                        slot_issues[f"{slot_type} + {r_type}"][0] += ct
+        return total, bad, slot_issues, problem_scenarios, first_examples(kept, resp_types, self.examples), None
+
+    def analyze_category_numpy(self, scenarios, responses):
+        """Same result as analyze_category_exhaustive, computed with NumPy array operations."""
+        import numpy as np
+        from .binary import type_codes
+        engine = self._np
+        slot_types = self.slot_types
+        compiled = type_codes(scenarios), type_codes(responses)
+        if None not in compiled:
+            # A compiled deck: its type codes are read in place, nothing is classified.
+            slot_all = np.frombuffer(compiled[0], dtype=np.int8)
+            positions = np.flatnonzero(slot_all >= 0)
+            slot_codes = slot_all[positions].view(np.uint8)
+            resp_codes = np.frombuffer(compiled[1], dtype=np.uint8)
+            kept = _CompiledKept(scenarios, positions, self.normalize_scenario)
+        else:
+            kept = []
+            slot_labels = []
+            for s_raw in scenarios:
+                s = self.normalize_scenario(s_raw)
+                if s is None:
+                    continue
+                slot_type, _ = self.classify_scenario_slot(s)
+                if slot_type == 'SKIP':
+                    continue
+                kept.append((s_raw, s))
+                slot_labels.append(slot_type)
+
+            resp_labels = [self.classify_response(r) for r in responses]
+            slot_codes = engine.encode(slot_labels, slot_types)
+            resp_codes = engine.encode(resp_labels, engine.RESP_TYPES)
+        res = engine.analyze_codes(slot_codes, resp_codes, self.bad_matrix)
+
+        # Issue keys in the order the exhaustive loop first meets them: slot types
+        # by first scenario, then response types by first response.
+        slot_first = engine.first_index(slot_codes, len(slot_types))
+        resp_first = engine.first_index(resp_codes, len(engine.RESP_TYPES))
+        slot_issues = {}
+        for i in sorted(np.flatnonzero(slot_first >= 0), key=lambda i: slot_first[i]):
+            s = kept[slot_first[i]][1]
+            for j in sorted(np.flatnonzero(res['pair_bad'][i]), key=lambda j: resp_first[j]):
+                key = f"{slot_types[i]} + {engine.RESP_TYPES[j]}"
+                slot_issues[key] = [int(res['pair_bad'][i, j]), s.replace('_____', responses[resp_first[j]])]
+
+        problem_scenarios = {}
+        per_scenario = res['per_scenario']
+        for i in np.flatnonzero(per_scenario):
+            s_raw = kept[i][0]
+            problem_scenarios[s_raw] = problem_scenarios.get(s_raw, 0) + int(per_scenario[i])
+
+        worst = None
+        if self.worst:
+            worst = (
+                [(kept[i][0], int(per_scenario[i])) for i in engine.worst_offenders(per_scenario, self.worst)],
+                [(responses[i], int(res['per_response'][i])) for i in engine.worst_offenders(res['per_response'], self.worst)],
+            )
+        if None in compiled:
+            examples = first_examples([(s_raw, s, st) for (s_raw, s), st in zip(kept, slot_labels)],
+                                      list(zip(responses, resp_labels)), self.examples)
+        else:
+            # first_examples only looks at the first k cards of each type and at
+            # the problem scenarios, so only those are decoded.
+            def firsts(codes, n):
+                return {int(i) for c in range(n) for i in np.flatnonzero(codes == c)[:max(self.examples, 1)]}
+
+            scen = sorted(firsts(slot_codes, len(slot_types)) | set(np.flatnonzero(per_scenario).tolist()))
+            resp = sorted(firsts(resp_codes, len(engine.RESP_TYPES)))
+            examples = first_examples([(*kept[i], slot_types[slot_codes[i]]) for i in scen],
+                                      [(responses[j], engine.RESP_TYPES[resp_codes[j]]) for j in resp],
+                                      self.examples)
+        return res['total'], res['bad'], slot_issues, problem_scenarios, examples, worst
+
+    def shard_tasks(self, cat_data):
+        """Split a category into (scenarios, responses) tasks of at most shard_size scenarios."""
+        scenarios = cat_data['scenarios']
+        responses = cat_data['responses']
+        # Worst-offender rankings and reservoir samples need every scenario of the
+        # category in one place.
+        if self.jobs == 1 or self.worst or self.reservoir or len(scenarios) <= self.shard_size:
+            return [(scenarios, responses)]
+        return [(scenarios[i:i + self.shard_size], responses) for i in range(0, len(scenarios), self.shard_size)]
+
+    def merge_results(self, parts):
+        """Combine shard results, given in scenario order, into one category result.
+
+        Issue keys and problem scenarios keep the order in which the first shard
+        containing them met them, which is the order a serial run produces.
+        """
+        if len(parts) == 1:
+            return parts[0]
+        total = 0
+        bad = 0
+        slot_issues = {}
+        problem_scenarios = {}
+        examples = {'by_key': {}, 'by_scenario': {}}
+        for p_total, p_bad, p_issues, p_problems, p_examples, _ in parts:
+            total += p_total
+            bad += p_bad
+            for key, (count, example) in p_issues.items():
+                if key in slot_issues:
+                    slot_issues[key][0] += count
+                else:
+                    slot_issues[key] = [count, example]
+            for ps, count in p_problems.items():
+                problem_scenarios[ps] = problem_scenarios.get(ps, 0) + count
+            # Examples are the first K in deck order, so earlier shards win.
+            for group in ('by_key', 'by_scenario'):
+                for key, items in p_examples[group].items():
+                    kept = examples[group].setdefault(key, [])
+                    kept.extend(items[:self.examples - len(kept)])
+        return total, bad, slot_issues, problem_scenarios, examples, None
+
+    def category_results(self, categories):
+        """Yield (cat_key, cat_data, result) for every (cat_key, cat_data) in categories, in order.
+
+        Cached results are reused. With jobs > 1 the shards of up to 2×jobs
+        categories are in flight at once, but results are still yielded in
+        order.
+        """
+        cache = self.cache
+        pool = None
+        if self.jobs > 1:
+            pool = concurrent.futures.ProcessPoolExecutor(
+                self.jobs, initializer=_init_worker,
+                initargs=(self.options(), cache.path if cache is not None else None))
+        pending = collections.deque()
+
+        def finish(cat_key, cat_data, cat_digest, result, futures):
+            if futures:
+                parts = []
+                for future in futures:
+                    part, new = future.result()
+                    parts.append(part)
+                    if new:
+                        cache.add_new(new)
+                result = self.merge_results(parts)
+            if cat_digest is not None:
+                cache.put_result(self.results_scope, self.results_version, cat_digest, result)
+            return cat_key, cat_data, result
+
+        try:
+            for cat_key, cat_data in categories:
+                cat_digest = None
+                result = None
+                futures = None
+                if self.results_scope is not None:
+                    cat_digest = digest([cat_data['scenarios'], cat_data['responses']])
+                    result = cache.get_result(self.results_scope, self.results_version, cat_digest)
+                    if result is not None:
+                        cat_digest = None
+                if result is None:
+                    if pool is None:
+                        result = self.analyze_category(cat_data['scenarios'], cat_data['responses'])
+                    else:
+                        futures = [pool.submit(_analyze_shard, task) for task in self.shard_tasks(cat_data)]
+                pending.append((cat_key, cat_data, cat_digest, result, futures))
+                while len(pending) > (2 * self.jobs if pool is not None else 0):
+                    yield finish(*pending.popleft())
+            while pending:
+                yield finish(*pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+
+# ── Pool workers ──
+# Each worker builds its own analyzer, reading (never writing) the parent's
+# cache, so this works with any multiprocessing start method.
+_worker = None
+
+def _init_worker(options, cache_path):
+    global _worker
+    cache = ClassificationCache(cache_path, readonly=True) if cache_path is not None else None
+    _worker = DeepAnalyzer(cache=cache, **options)
+
+def _analyze_shard(task):
+    """Analyze one shard of a category.
+
+    Also returns the cards this worker classified for the first time, so the
+    parent can write them to the cache.
+    """
+    scenarios, responses = task
+    result = _worker.analyze_category(scenarios, responses)
+    return result, (_worker.cache.take_new() if _worker.cache is not None else None)
+
+
+# ── Report ──
+def report_categories(analyzer, categories, report):
+    """Write the per-category blocks and the overall line; return (grand_total, grand_bad)."""
+    grand_total = 0
+    grand_bad = 0
+
+    for cat_key, cat_data, (total, bad, slot_issues, problem_scenarios, examples, worst) in analyzer.category_results(categories):
+        pct_bad = (bad / total * 100) if total > 0 else 0
+        pct_ok = 100 - pct_bad
+        grand_total += total
+        grand_bad += bad
+
+        report.line(f"\n{'─' * 100}")
+        report.line(f"  Category: {cat_data['name']}")
+        report.line(f"  Total combos: {total} | OK: {total-bad} ({pct_ok:.1f}%) | BAD: {bad} ({pct_bad:.1f}%)")
+        report.record('category', category=cat_key, name=cat_data['name'], total=total, ok=total - bad, bad=bad,
+                      problem_scenarios=len(problem_scenarios))
+        if not report.detail:
+            continue
+
+        # Show slot type breakdown
+        if slot_issues:
+            report.line(f"  Issue breakdown:")
+            for key, (count, example) in report.cap(sorted(slot_issues.items(), key=lambda x: -x[1][0])):
+                report.line(f"    {key}: {count} bad combos")
+                report.line(f"      e.g. \"{example[:90]}\"")
+                slot_type, resp_type = key.split(' + ')
+                report.record('issue', category=cat_key, slot_type=slot_type, resp_type=resp_type, bad=count,
+                              example=example)
+                for combo in report.cap(examples['by_key'].get(key, ())):
+                    report.record('bad_combo', category=cat_key, **combo)
+
+        # Count how many scenarios have the problematic slot types
+        if problem_scenarios:
+            report.line(f"  Scenarios causing most issues ({len(problem_scenarios)}):")
+            for ps, count in report.cap(problem_scenarios.items(), 5):
+                report.line(f"    \"{ps[:70]}\" → {count} bad responses")
+                report.record('problem_scenario', category=cat_key, scenario=ps, bad=count,
+                              responses=[combo['response'] for combo in examples['by_scenario'].get(ps, ())])
+
+        if worst:
+            worst_scenarios, worst_responses = worst
+            if worst_scenarios:
+                report.line(f"  Worst scenarios:")
+                for ps, count in report.cap(worst_scenarios):
+                    report.line(f"    {count:>6}  \"{ps[:70]}\"")
+                    report.record('worst_scenario', category=cat_key, scenario=ps, bad=count)
+            if worst_responses:
+                report.line(f"  Worst responses:")
+                for pr, count in report.cap(worst_responses):
+                    report.line(f"    {count:>6}  \"{pr[:70]}\"")
+                    report.record('worst_response', category=cat_key, response=pr, bad=count)
+
+    report.line(f"\n{'=' * 100}")
+    report.line(f"OVERALL: {grand_total} combos tested | {grand_total-grand_bad} OK ({(grand_total-grand_bad)/grand_total*100:.1f}%) | {grand_bad} BAD ({grand_bad/grand_total*100:.1f}%)")
+    report.line(f"{'=' * 100}")
+    report.record('overall', total=grand_total, ok=grand_total - grand_bad, bad=grand_bad)
+    return grand_total, grand_bad
+
+
+def report_type_distributions(analyzer, categories, report):
+    """Write the response type and scenario slot type distributions per category.
+
+    categories is a callable returning a fresh (cat_key, cat_data) iterator,
+    since each table makes its own pass over the deck.
+    """
+    from .binary import response_types
+    # Analyze what response type distribution looks like per category
+    report.line(f"\n{'=' * 100}")
+    report.line("RESPONSE TYPE DISTRIBUTION PER CATEGORY")
+    report.line(f"{'=' * 100}")
+    for cat_key, cat_data in categories():
+        resp_types = {}
+        for rt in response_types(analyzer, cat_data['responses']):
+            resp_types[rt] = resp_types.get(rt, 0) + 1
+        total_r = len(cat_data['responses'])
+        report.line(f"\n  {cat_data['name']}:")
+        for rt, ct in sorted(resp_types.items(), key=lambda x: -x[1]):
+            report.line(f"    {rt}: {ct} ({ct/total_r*100:.0f}%)")
+        report.record('response_types', category=cat_key, total=total_r,
+                      counts=dict(sorted(resp_types.items(), key=lambda x: -x[1])))
+
+    # Analyze what scenario slot types exist per category
+    report.line(f"\n{'=' * 100}")
+    report.line("SCENARIO SLOT TYPE DISTRIBUTION PER CATEGORY")
+    report.line(f"{'=' * 100}")
+    for cat_key, cat_data in categories():
+        slot_types = {}
+        for s in cat_data['scenarios']:
+            st, _ = analyzer.classify_scenario_slot(s)
+            slot_types[st] = slot_types.get(st, 0) + 1
+        total_s = len(cat_data['scenarios'])
+        report.line(f"\n  {cat_data['name']}:")
+        for st, ct in sorted(slot_types.items(), key=lambda x: -x[1]):
+            pct = ct/total_s*100
+            compat = COMPAT.get(st, {})
+            ok_types = [k for k,v in compat.items() if v and k != 'TRUMP']
+            report.line(f"    {st}: {ct} ({pct:.0f}%) — accepts: {', '.join(ok_types)}")
+        report.record('slot_types', category=cat_key, total=total_s,
+                      counts=dict(sorted(slot_types.items(), key=lambda x: -x[1])))
+
+
+def report_category_detail(analyzer, cat_key, cat_data, report):
+    """Write every scenario of one category with its OK/BAD counts and first bad responses."""
+    report.line(f"\n{'=' * 100}")
+    report.line(f"DETAILED {cat_key.upper()} ANALYSIS")
+    report.line(f"{'=' * 100}")
+    from .binary import response_types
+    resp_types = list(zip(cat_data['responses'], response_types(analyzer, cat_data['responses'])))
+    # Every scenario of a slot type gets the same verdicts, so work them out
+    # once per slot type.
+    by_slot = {}
+    for s in cat_data['scenarios']:
+        st, normalized = analyzer.classify_scenario_slot(s)
+        if st not in by_slot:
+            compat = COMPAT.get(st, COMPAT['OPEN'])
+            ok_count = 0
+            bad_count = 0
+            bad_responses = []
+            for r, rt in resp_types:
+                if rt == 'TRUMP':
+                    ok_count += 1
+                    continue
+                if compat.get(rt, True):
+                    ok_count += 1
+                else:
+                    bad_count += 1
+                    bad_responses.append((r, rt))
+            by_slot[st] = (ok_count, bad_count, bad_responses)
+        ok_count, bad_count, bad_responses = by_slot[st]
+        total = ok_count + bad_count
+        pct_ok = ok_count/total*100 if total else 0
+        report.line(f"\n  \"{s}\" [{st}]")
+        report.line(f"    OK: {ok_count}/{total} ({pct_ok:.0f}%) | BAD: {bad_count}")
+        shown = report.cap(bad_responses, 3)
+        for r, rt in shown:
+            report.line(f"      ✗   \"{r}\" [{rt}]")
+        report.record('scenario_detail', category=cat_key, scenario=s, slot_type=st, total=total, ok=ok_count,
+                      bad=bad_count, bad_responses=[{'response': r, 'resp_type': rt} for r, rt in shown])
+
+
+def find_category(categories, cat_key):
+    for key, cat_data in categories:
+        if key == cat_key:
+            return cat_data
+    raise KeyError(cat_key)
+
+
+def run_deep(analyzer, report, deck_path=DECK_PATH, streaming=False, detail_category='genz', profiler=None):
+    """Write the full deep check report for a deck.
+
+    Without streaming the deck is read once and shared by every section;
+    with it each section streams the file again. A profiler (see
+    profiling.py) gets the deck loading time.
+    """
+    load, categories_of = load_deck, iter_deck
+    if profiler is not None:
+        load = profiler.timed('load', load_deck)
+        categories_of = lambda *args: profiler.timed_iter('load', iter_deck(*args))
+    data = None if streaming else load(deck_path)
+    categories = lambda: categories_of(deck_path, streaming, data)
+
+    report.line("=" * 100)
+    report.line("DEEP GRAMMAR ANALYSIS — Every Scenario × Every Response")
+    report.line("=" * 100)
+
+    report_categories(analyzer, categories(), report)
+    if not report.detail:
+        return
+
+    report_type_distributions(analyzer, categories, report)
+
+    # Imported here: optimize.py builds on this module's COMPAT.
+    from .optimize import report_plans
+    report_plans(analyzer, categories(), report)
+
+    if detail_category is None:
+        return
+    try:
+        cat_data = find_category(categories(), detail_category)
+    except KeyError:
+        return
+    report_category_detail(analyzer, detail_category, cat_data, report)
+
+
+def run_category_detail(analyzer, report, deck_path=DECK_PATH, streaming=False, category='genz'):
+    """Write just the per-scenario detail for one category."""
+    report_category_detail(analyzer, category, find_category(iter_deck(deck_path, streaming), category), report)
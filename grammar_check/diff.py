@@ -0,0 +1,274 @@
+"""
+Deck diff: what an edit did to grammar compatibility, without re-running the
+whole check on both decks.
+
+Scenarios and responses of each category are lined up old against new as
+multisets, so moved cards are not changes, and an old and a new card left
+over between the same matched neighbours count as one edited card rather
+than as one removal plus one addition. With S0 the
+scenarios both versions share, the change in BAD combos is exactly
+
+  new scenario rows × new responses  −  removed scenario rows × old responses
+  + S0 × new response columns        −  S0 × removed response columns
+
+so only the rows and columns of changed cards are evaluated, against
+slot-type and response-type counts of the rest. Each changed card gets its
+own share of the delta, and the shares add up to the category's delta.
+"""
+import collections
+
+from .deck import load_deck
+from .deep import COMPAT
+
+KINDS = ('scenarios', 'responses')
+
+
+def line_up(old, new):
+    """Return (removed, added, changed) between two card lists; changed is [(old, new)]."""
+    old_count = collections.Counter(old)
+    new_count = collections.Counter(new)
+    repeats = len(old_count) < len(old) or len(new_count) < len(new)
+    old_left = _unmatched(old, _surplus(old_count, new_count, repeats))
+    new_left = _unmatched(new, _surplus(new_count, old_count, repeats))
+    removed = []
+    added = []
+    changed = []
+    for gap in sorted(old_left.keys() | new_left.keys()):
+        gone = old_left.get(gap, [])
+        fresh = new_left.get(gap, [])
+        n = min(len(gone), len(fresh))
+        changed.extend(zip(gone[:n], fresh[:n]))
+        removed.extend(gone[n:])
+        added.extend(fresh[n:])
+    return removed, added, changed
+
+
+def _surplus(count, other, repeats):
+    """{card: how many more copies count has than other}, for the cards where that is positive."""
+    surplus = {card: count[card] for card in count.keys() - other.keys()}
+    if repeats:
+        # A card both lists have may still be in one of them more often.
+        surplus.update((card, count[card] - other[card]) for card in count.keys() & other.keys()
+                       if count[card] > other[card])
+    return surplus
+
+
+def _unmatched(cards, extra):
+    """{matched cards before them: cards} for the extra cards, in list order."""
+    gaps = {}
+    if not extra:
+        return gaps
+    left = extra.copy()
+    matched = 0
+    for card in cards:
+        if left.get(card):
+            left[card] -= 1
+            gaps.setdefault(matched, []).append(card)
+        else:
+            matched += 1
+    return gaps
+
+
+def _take(counter, card):
+    if counter[card]:
+        counter[card] -= 1
+        return True
+    return False
+
+
+class TypeCounts:
+    """Type histogram of a set of classified cards, with the first card of each type."""
+
+    def __init__(self):
+        self.counts = {}
+        self.first = {}
+        self.n = 0
+
+    def add(self, card_type, text):
+        self.n += 1
+        if card_type not in self.counts:
+            self.counts[card_type] = 0
+            self.first[card_type] = text
+        self.counts[card_type] += 1
+
+    @classmethod
+    def of(cls, types, texts):
+        """Counts of parallel type and card lists, in one pass of Counter."""
+        counts = cls()
+        counts.counts = dict(collections.Counter(types))
+        counts.n = len(types)
+        for card_type, text in zip(types, texts):
+            if card_type not in counts.first:
+                counts.first[card_type] = text
+                if len(counts.first) == len(counts.counts):
+                    break
+        return counts
+
+
+class DeckDiff:
+    """Per-card compatibility deltas between two versions of a deck."""
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self._counted = {}              # id(responses) → (responses, counts) of lists still current
+
+    def slot(self, s):
+        """(slot type or None when the scenario is never dealt, normalized scenario)."""
+        s = self.analyzer.normalize_scenario(s)
+        if s is None:
+            return None, None
+        slot_type, _ = self.analyzer.classify_scenario_slot(s)
+        return (None if slot_type == 'SKIP' else slot_type), s
+
+    def response_counts(self, responses):
+        if not responses:
+            return TypeCounts()
+        known = self._counted.get(id(responses))
+        if known is not None and known[0] is responses:
+            return known[1]
+        counts = TypeCounts.of(list(map(self.analyzer.classify_response, responses)), responses)
+        self._counted[id(responses)] = (responses, counts)
+        return counts
+
+    def row(self, s, responses):
+        """One scenario against a response histogram: a card entry for the report."""
+        slot_type, normalized = self.slot(s)
+        if slot_type is None:
+            return {'text': s, 'type': 'SKIP', 'total': 0, 'bad': 0, 'example': None}
+        compat = COMPAT.get(slot_type, COMPAT['OPEN'])
+        bad = 0
+        example = None
+        for r_type, count in responses.counts.items():
+            if r_type != 'TRUMP' and not compat.get(r_type, True):
+                bad += count
+                if example is None:
+                    example = normalized.replace('_____', responses.first[r_type])
+        return {'text': s, 'type': slot_type, 'total': responses.n, 'bad': bad, 'example': example}
+
+    def column(self, r, scenarios):
+        """One response against a slot-type histogram of the shared scenarios."""
+        r_type = self.analyzer.classify_response(r)
+        bad = 0
+        example = None
+        if r_type != 'TRUMP':
+            for slot_type, count in scenarios.counts.items():
+                if not COMPAT.get(slot_type, COMPAT['OPEN']).get(r_type, True):
+                    bad += count
+                    if example is None:
+                        example = scenarios.first[slot_type].replace('_____', r)
+        return {'text': r, 'type': r_type, 'total': scenarios.n, 'bad': bad, 'example': example}
+
+    def category(self, old, new):
+        """Diff one category; old or new may be None when the category was added or removed."""
+        empty = {'scenarios': [], 'responses': []}
+        old = old or empty
+        new = new or empty
+        s_removed, s_added, s_changed = line_up(old['scenarios'], new['scenarios'])
+        r_removed, r_added, r_changed = line_up(old['responses'], new['responses'])
+
+        # Shared scenarios: every new scenario that isn't an addition or the new side of an edit.
+        fresh = collections.Counter(s_added) + collections.Counter(s for _, s in s_changed)
+        shared = TypeCounts()
+        for s in new['scenarios']:
+            if not _take(fresh, s):
+                slot_type, normalized = self.slot(s)
+                if slot_type is not None:
+                    shared.add(slot_type, normalized)
+
+        old_responses = self.response_counts(old['responses'])
+        new_responses = self.response_counts(new['responses'])
+        # The new list is the old one of the next diff of this category (see watch.py).
+        if old['responses'] is not new['responses']:
+            self._counted.pop(id(old['responses']), None)
+        cards = []
+        for change, kind, before, after in (
+                [('added', 'scenarios', None, s) for s in s_added]
+                + [('removed', 'scenarios', s, None) for s in s_removed]
+                + [('changed', 'scenarios', a, b) for a, b in s_changed]
+                + [('added', 'responses', None, r) for r in r_added]
+                + [('removed', 'responses', r, None) for r in r_removed]
+                + [('changed', 'responses', a, b) for a, b in r_changed]):
+            if kind == 'scenarios':
+                old_entry = self.row(before, old_responses) if before is not None else None
+                new_entry = self.row(after, new_responses) if after is not None else None
+            else:
+                old_entry = self.column(before, shared) if before is not None else None
+                new_entry = self.column(after, shared) if after is not None else None
+            cards.append(card_delta(change, kind, old_entry, new_entry))
+        return cards
+
+
+def card_delta(change, kind, old_entry, new_entry):
+    total = (new_entry['total'] if new_entry else 0) - (old_entry['total'] if old_entry else 0)
+    bad = (new_entry['bad'] if new_entry else 0) - (old_entry['bad'] if old_entry else 0)
+    return {'change': change, 'cards': kind, 'old': old_entry, 'new': new_entry,
+            'total': total, 'ok': total - bad, 'bad': bad,
+            'rechecked': (old_entry['total'] if old_entry else 0) + (new_entry['total'] if new_entry else 0)}
+
+
+def diff_decks(analyzer, old_path, new_path):
+    """Yield (cat_key, name, cards) for every category of either deck, new deck order first."""
+    old_deck = load_deck(old_path)
+    new_deck = load_deck(new_path)
+    differ = DeckDiff(analyzer)
+    for cat_key in list(new_deck) + [k for k in old_deck if k not in new_deck]:
+        old = old_deck.get(cat_key)
+        new = new_deck.get(cat_key)
+        yield cat_key, (new or old)['name'], differ.category(old, new)
+
+
+_MARK = {'added': '+', 'removed': '-', 'changed': '~'}
+
+
+def _signed(n):
+    return f'{n:+d}'
+
+
+def report_diff(report, diffs, old_path, new_path):
+    """Write the per-category and overall OK/BAD deltas; return the overall BAD delta."""
+    report.line("=" * 100)
+    report.line(f"DECK DIFF: {old_path} → {new_path}")
+    report.line("=" * 100)
+    grand = {'total': 0, 'ok': 0, 'bad': 0, 'rechecked': 0}
+    for cat_key, name, cards in diffs:
+        if not cards:
+            continue
+        sums = {field: sum(c[field] for c in cards) for field in grand}
+        for field in grand:
+            grand[field] += sums[field]
+        changes = {(kind, change): 0 for kind in KINDS for change in _MARK}
+        for c in cards:
+            changes[c['cards'], c['change']] += 1
+        counts = ' | '.join(f"{kind.capitalize()}: " + ' '.join(f"{_MARK[change]}{changes[kind, change]}"
+                                                               for change in _MARK) for kind in KINDS)
+        report.line(f"\n{'─' * 100}")
+        report.line(f"  Category: {name}")
+        report.line(f"  {counts}")
+        report.line(f"  Re-checked {sums['rechecked']} combos | Combos: {_signed(sums['total'])} | "
+                    f"OK: {_signed(sums['ok'])} | BAD: {_signed(sums['bad'])}")
+        report.record('diff_category', category=cat_key, name=name, **sums,
+                      changes={kind: {change: changes[kind, change] for change in _MARK} for kind in KINDS})
+        if not report.detail:
+            continue
+        ranked = sorted(cards, key=lambda c: -abs(c['bad']))
+        for c in report.cap(ranked, 10):
+            kind = c['cards'][:-1]
+            old, new = c['old'], c['new']
+            if c['change'] == 'changed':
+                text = f"\"{old['text'][:50]}\" → \"{new['text'][:50]}\""
+                types = old['type'] if old['type'] == new['type'] else f"{old['type']} → {new['type']}"
+            else:
+                entry = new or old
+                text = f"\"{entry['text'][:90]}\""
+                types = entry['type']
+            report.line(f"    {_MARK[c['change']]} {kind} {text} [{types}] BAD {_signed(c['bad'])}")
+            example = (new or {}).get('example') if c['bad'] > 0 else (old or {}).get('example')
+            if c['bad'] and example:
+                report.line(f"        {'now bad' if c['bad'] > 0 else 'was bad'}: \"{example[:90]}\"")
+            report.record('diff_card', category=cat_key, **c)
+    report.line(f"\n{'=' * 100}")
+    report.line(f"OVERALL: re-checked {grand['rechecked']} combos | Combos: {_signed(grand['total'])} | "
+                f"OK: {_signed(grand['ok'])} | BAD: {_signed(grand['bad'])}")
+    report.line(f"{'=' * 100}")
+    report.record('diff_overall', **grand)
+    return grand['bad']
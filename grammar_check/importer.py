@@ -0,0 +1,136 @@
+"""
+Bulk import of numbered card lists (scenario_cards.txt / response_cards.txt
+format) into a category of cards.json.
+
+Lists are read one line at a time, so batches of any size stream through.
+Each card is cleaned up (quotes, whitespace, blanks), classified with the deep
+check's classifiers, and dropped if the category already has it, compared the
+same way the dedupe tool compares texts. The merged deck is written to a
+temporary file next to the deck and moved into place, so a failed import never
+leaves a half-written cards.json behind.
+"""
+import json
+import os
+import re
+
+from .binary import is_compiled
+from .deck import DECK_PATH, iter_card_list, load_deck, normalize_scenario
+from .dedupe import normalize_text
+
+KINDS = ('scenarios', 'responses')
+
+_QUOTES = str.maketrans({'“': '"', '”': '"', '„': '"', '‘': "'", '’': "'", '`': "'"})
+_BLANK = re.compile(r'_{3,}')
+_SPACE = re.compile(r'\s+')
+
+
+def clean_card(text):
+    """Straight quotes, one space between words, no wrapping quotes, blanks as exactly five underscores."""
+    text = _SPACE.sub(' ', text.translate(_QUOTES)).strip()
+    while len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'':
+        text = text[1:-1].strip()
+    return _BLANK.sub('_____', text)
+
+
+class ImportResult:
+    """What an import added and skipped, per kind."""
+
+    def __init__(self):
+        self.read = dict.fromkeys(KINDS, 0)
+        self.added = {kind: [] for kind in KINDS}
+        self.duplicates = dict.fromkeys(KINDS, 0)
+        self.rejected = []          # (kind, text, reason)
+        self.types = {kind: {} for kind in KINDS}
+
+
+def import_lists(analyzer, paths, category, deck_path=DECK_PATH, kind=None, name=None, description=None,
+                 dry_run=False):
+    """Merge the cards of the lists at paths into deck_path's category; return an ImportResult.
+
+    The kind of each list comes from its header or file name unless kind is
+    given. A missing category is created, which needs a name. With dry_run
+    nothing is written.
+    """
+    if is_compiled(deck_path):
+        raise ValueError(f'{deck_path} is a compiled deck; import into the JSON deck and compile it again')
+    deck = load_deck(deck_path)
+    if category not in deck:
+        if name is None:
+            raise ValueError(f'category {category!r} does not exist; give it a name to create it')
+        deck[category] = {'name': name, 'description': description or '', 'scenarios': [], 'responses': []}
+    cat_data = deck[category]
+    seen = {k: {normalize_text(text) for text in cat_data[k]} for k in KINDS}
+    result = ImportResult()
+
+    for path in paths:
+        for list_kind, raw in iter_card_list(path):
+            card_kind = kind or list_kind
+            if card_kind not in KINDS:
+                raise ValueError(f'{path}: cannot tell whether the cards are scenarios or responses')
+            result.read[card_kind] += 1
+            text = clean_card(raw)
+            if not text:
+                result.rejected.append((card_kind, raw, 'empty'))
+                continue
+            if card_kind == 'scenarios':
+                # Same normalization the game applies to multi-blank scenarios.
+                if normalize_scenario(text) is None:
+                    result.rejected.append((card_kind, text, 'no blank'))
+                    continue
+                card_type = analyzer.classify_scenario_slot(text)[0]
+            else:
+                card_type = analyzer.classify_response(text)
+            key = normalize_text(text)
+            if key in seen[card_kind]:
+                result.duplicates[card_kind] += 1
+                continue
+            seen[card_kind].add(key)
+            cat_data[card_kind].append(text)
+            result.added[card_kind].append((text, card_type))
+            types = result.types[card_kind]
+            types[card_type] = types.get(card_type, 0) + 1
+
+    if not dry_run and any(result.added.values()):
+        write_deck_atomic(deck_path, deck)
+    return result
+
+
+def write_deck_atomic(path, deck):
+    """Write a deck in cards.json's own layout, replacing path only once the file is complete."""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(deck, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def report_import(report, result, category, deck_path, dry_run):
+    report.line("=" * 100)
+    report.line(f"IMPORT INTO {deck_path}:{category}" + (" (dry run, nothing written)" if dry_run else ""))
+    report.line("=" * 100)
+    for kind in KINDS:
+        if not result.read[kind]:
+            continue
+        added = len(result.added[kind])
+        rejected = sum(1 for k, _, _ in result.rejected if k == kind)
+        report.line(f"\n  {kind.capitalize()}: {result.read[kind]} read | {added} added | "
+                    f"{result.duplicates[kind]} duplicates | {rejected} rejected")
+        for card_type, count in sorted(result.types[kind].items(), key=lambda x: -x[1]):
+            report.line(f"    {card_type}: {count}")
+        report.record('import', category=category, cards=kind, read=result.read[kind], added=added,
+                      duplicates=result.duplicates[kind], rejected=rejected, types=result.types[kind])
+        if report.detail:
+            for text, card_type in report.cap(result.added[kind], 0):
+                report.record('added', category=category, cards=kind, text=text, card_type=card_type)
+    if result.rejected and report.detail:
+        report.line(f"\n  Rejected:")
+        for kind, text, reason in report.cap(result.rejected, 10):
+            report.line(f"    [{reason}] \"{text[:80]}\"")
+            report.record('rejected', category=category, cards=kind, text=text, reason=reason)
@@ -0,0 +1,103 @@
+"""
+Compatibility index for the web dealer, written next to the deck
+(data/cards.json → data/cards.index.json).
+
+A card's verdict only depends on (slot type, response type), so the index
+stores one small code per card plus COMPAT as one bitmask per slot type:
+
+  {
+    "respTypes": ["GERUND", ...],           response type per bit
+    "slotTypes": ["IS_PREDICATE", ...],     slot type per code
+    "compat": [95, ...],                    compatible response bits per slot code
+    "versions": ["3f0c...", "9a1e..."],     classifier versions the codes come from
+    "categories": {
+      "genz": {"digest": "5d2b...",         sha256 of the category's cards
+               "scenarios": [0, 1, ...],    slot code per scenario (-1: no single blank)
+               "responses": [0, 6, ...]}    response bit per response
+    }
+  }
+
+so js/app.js can check "does response r fit scenario s" with one shift and
+mask instead of running the classifiers in the browser. Codes are in deck
+order, parallel to each category's scenarios and responses arrays.
+
+A category's digest is the sha256 of JSON.stringify([scenarios, responses])
+as the browser computes it from cards.json, so js/app.js deals blind from a
+category whose cards changed since the index was written. The versions only
+change with the classifiers, which the browser doesn't have; `index --check`
+compares both against the deck and the current classifiers.
+"""
+import hashlib
+import json
+import os
+
+from .binary import versions
+from .deck import DECK_PATH, load_deck
+from .deep import COMPAT
+
+INDEX_VERSION = 2
+
+
+def index_path_for(deck_path):
+    root, _ = os.path.splitext(deck_path)
+    return root + '.index.json'
+
+
+def cards_digest(cat_data):
+    """sha256 of a category's cards, byte for byte what js/app.js hashes."""
+    cards = [list(cat_data['scenarios']), list(cat_data['responses'])]
+    return hashlib.sha256(json.dumps(cards, ensure_ascii=False, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def index_header():
+    """Everything in the index but the categories: the vocabularies, COMPAT and the classifier versions."""
+    slot_types = list(COMPAT)
+    resp_types = list(COMPAT['OPEN'])
+    resp_code = {rt: i for i, rt in enumerate(resp_types)}
+    return {
+        'version': INDEX_VERSION,
+        'respTypes': resp_types,
+        'slotTypes': slot_types,
+        'compat': [sum(1 << resp_code[rt] for rt, ok in COMPAT[st].items() if ok) for st in slot_types],
+        'versions': versions(),
+    }
+
+
+def build_index(analyzer, deck):
+    slot_code = {st: i for i, st in enumerate(COMPAT)}
+    resp_code = {rt: i for i, rt in enumerate(COMPAT['OPEN'])}
+    categories = {}
+    for cat_key, cat_data in deck.items():
+        categories[cat_key] = {
+            'digest': cards_digest(cat_data),
+            'scenarios': [slot_code.get(analyzer.classify_scenario_slot(s)[0], -1) for s in cat_data['scenarios']],
+            'responses': [resp_code[analyzer.classify_response(r)] for r in cat_data['responses']],
+        }
+    return {**index_header(), 'categories': categories}
+
+
+def write_index(analyzer, deck_path=DECK_PATH, index_path=None):
+    """Build the index for a deck file and write it; returns the path written."""
+    index_path = index_path or index_path_for(deck_path)
+    index = build_index(analyzer, load_deck(deck_path))
+    tmp = index_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+        f.write('\n')
+    os.replace(tmp, index_path)
+    return index_path
+
+
+def stale_categories(deck_path=DECK_PATH, index_path=None):
+    """Keys of the deck's categories the index file is out of date for (all of them when it is unreadable)."""
+    deck = load_deck(deck_path)
+    try:
+        with open(index_path or index_path_for(deck_path), encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return list(deck)
+    if any(index.get(k) != v for k, v in index_header().items()):
+        return list(deck)
+    codes = index.get('categories', {})
+    return [cat_key for cat_key, cat_data in deck.items()
+            if cat_key not in codes or codes[cat_key].get('digest') != cards_digest(cat_data)]
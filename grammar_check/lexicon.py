@@ -0,0 +1,261 @@
+"""
+Offline part-of-speech lexicon for the deep check's response classifier.
+
+A response's type mostly depends on its first words: "crying in the shower"
+is a gerund phrase, "emotionally unavailable" an adjective phrase, "free
+dhaniya with vegetables" a noun phrase. Each word is tagged once (tag() is
+memoized per word) with:
+
+  1. the bundled word table below, one dict lookup;
+  2. failing that, suffix rules: -ing gerunds, -ly adverbs, and the
+     adjective endings -ed, -ous, -ful, -less, -ive, -able/-ible, -ish, each
+     with the common words that only look like they match (morning, family,
+     table, ...);
+  3. otherwise None, an unknown word, which is usually a noun (or Hinglish).
+
+PhraseRules then reads the tags of the first few words, after two checks
+for Hinglish, whose word order is the other way round:
+
+  ... copula                SENTENCE_FRAG   "main apni favorite hoon" (main = I)
+  X ka/ki/ke Y              NOUN_PHRASE     "overacting ka 70mm certificate" (Y of X)
+  adverbs* gerund           GERUND          "secretly sabotaging my happiness"
+  adverbs* pronoun          NOUN_PHRASE     "nothing really mattering anyway"
+  adverbs* noun             NOUN_PHRASE     "things way too kinky"
+  adverbs* determiner       NOUN_PHRASE     "their worst nightmare"
+  adverbs* preposition      PREP_PHRASE     "from another dimension"
+  adverbs* adjective+ noun  NOUN_PHRASE     "absolute cosmic insignificance"
+  adverbs* adjective+       ADJECTIVE       "sleep-deprived and dehydrated"
+  adverbs+ anything else    ADJECTIVE       "literally insane"
+
+where noun also covers unknown words. Anything else is left to the rules
+after it (short labels, then the fallback). The noun table only holds nouns
+that head a noun phrase on their own (plural and abstract nouns); a bare
+singular noun still makes a label, as in "giving chaos energy". A genitive
+followed by a postposition or a negation ("lunch break ke baad aana") is
+not a noun phrase and is left to the other rules.
+"""
+import functools
+import hashlib
+import time
+
+ADV, ADJ, GERUND, NOUN, PRON, DET, PREP, CONJ, PERSONAL = (
+    'ADV', 'ADJ', 'GERUND', 'NOUN', 'PRON', 'DET', 'PREP', 'CONJ', 'PERSONAL')
+COPULA, GENITIVE, POSTPOSITION, NEGATION = 'COPULA', 'GENITIVE', 'POSTPOSITION', 'NEGATION'    # Hinglish
+
+# Bump when tag() or PhraseRules.match read words differently; the tables
+# are part of VERSION on their own.
+RULES_VERSION = 2
+
+# ── Word table ──
+# Whitespace-separated words per tag, folded into one frozen dict below.
+_WORDS = {
+    ADV: """
+        already also always almost anymore anywhere barely constantly even ever everywhere forever
+        hardly here highkey high-key just kinda lowkey low-key maybe never nowhere not now often
+        once only perhaps quite rather seldom sometimes somewhere soon sorta still there today
+        together tomorrow tonight too twice very yesterday
+    """,
+    ADJ: """
+        absolute aesthetic alive alone angry asleep awake awkward bad basic best better big
+        bisexual broke busy cheap chaotic cold complete cool cosmic crazy cringe cute dark dead
+        delulu desi down dramatic dumb early elderly emotional entire eternal extra fake feral
+        filmy final free full good great happy hard holy hot huge iconic ill illegal ironic
+        judgemental judgmental last late lazy legal little lively lonely lovely loud loyal mad
+        main mental mid normal offline old online permanent personal petty physical poor pretty
+        professional pure quiet random real rich romantic sad salty sexual sick silly single slow
+        small smart sober social soft spiritual sus temporary tiny total toxic tragic true ugly
+        unlikely viral weird whole wholesome wise worse worst wrong young
+        amazing annoying boring charming confusing depressing devastating disturbing embarrassing
+        exciting exhausting frustrating horrifying inspiring interesting overwhelming promising
+        refreshing relaxing satisfying shocking stunning surprising terrifying
+    """,
+    NOUN: """
+        people stuff things positions situations regrets fantasies substances comfort potential
+        betrayal time choices decisions dreams emotions expectations feelings friends habits
+        hopes lies memories parents plans problems secrets thoughts tears vibes
+    """,
+    PRON: """
+        anybody anyone anything everybody everyone everything nobody none nothing somebody
+        someone something
+    """,
+    DET: """
+        another both each few his her its many several their these those whose zero
+    """,
+    PREP: """
+        about above across after against along among around before behind below beneath beside
+        between beyond by despite during for from inside into near of off onto out outside over
+        past since through throughout till to toward towards under underneath until up upon via
+        with within without
+    """,
+    CONJ: """
+        although and because but if nor or though unless whereas while yet
+    """,
+    PERSONAL: """
+        i i'm i've i'd i'll me myself you you're yourself he he's him himself she she's herself
+        we we're us ourselves they they're them themselves it it's itself
+    """,
+    # Hinglish: "the" (were) and "ho" (are) are left out, they read as English.
+    COPULA: 'hai hain hoon hu hun tha thi',
+    GENITIVE: 'ka ki ke',
+    POSTPOSITION: 'andar baad bahar bina liye neeche paas saamne saath upar',
+    NEGATION: 'nahi nahin',
+}
+WORDS = {word: pos for pos, words in _WORDS.items() for word in words.split()}
+
+# ── Suffix rules ──
+# Checked in order for words not in the table; words listed in the
+# exceptions only look like they carry the suffix.
+SUFFIXES = (
+    ('ing', GERUND, """
+        building ceiling clothing darling duckling earring engineering evening lightning morning
+        pudding sibling sterling stocking viking wedding
+    """),
+    ('ly', ADV, """
+        ally anomaly apply assembly belly bully butterfly comply dolly family firefly fly folly
+        gully holly imply italy jelly july lily monopoly multiply rally rely reply supply tally
+    """),
+    ('ed', ADJ, 'hatred hundred kindred shed sled'),
+    ('ous', ADJ, ''),
+    ('ful', ADJ, 'cupful handful mouthful spoonful'),
+    ('less', ADJ, 'bless nevertheless unless'),
+    ('ive', ADJ, """
+        adjective alternative archive detective directive drive executive explosive five hive
+        incentive initiative laxative motive narrative native objective olive perspective
+        relative representative sedative
+    """),
+    ('able', ADJ, 'cable constable fable parable syllable table timetable turntable vegetable'),
+    ('ible', ADJ, 'bible'),
+    ('ish', ADJ, """
+        abolish accomplish astonish cherish demolish diminish dish establish famish finish fish
+        flourish nourish perish polish publish punish radish relish replenish squish swish vanish
+        wish
+    """),
+)
+_SUFFIXES = {suffix: (pos, frozenset(exceptions.split())) for suffix, pos, exceptions in SUFFIXES}
+_SUFFIX_LENGTHS = sorted({len(suffix) for suffix in _SUFFIXES}, reverse=True)
+_VOWELS = frozenset('aeiouy')
+_PUNCT = '.,!?;:()[]"\'“”‘’…*'
+
+
+def _suffix_tag(word):
+    for n in _SUFFIX_LENGTHS:
+        suffix = word[-n:]
+        rule = _SUFFIXES.get(suffix)
+        if rule is None:
+            continue
+        pos, exceptions = rule
+        stem = word[:-n]
+        if word in exceptions:
+            return None
+        if suffix == 'ing':
+            # "cc-ing" is a gerund; "bring", "thing" and "spring" have no vowel left.
+            return pos if stem.endswith('-') or (len(word) >= 5 and _VOWELS.intersection(stem)) else None
+        if suffix == 'ed' and (len(word) < 5 or stem.endswith('e')):
+            return None             # bed, need, speed
+        return pos if len(stem) >= 2 else None
+    return None
+
+
+# Words seen in a deck repeat a lot; the bound keeps long-running callers
+# (serve) from holding every word a client ever sent.
+@functools.lru_cache(maxsize=1 << 16)
+def tag(word):
+    """The part of speech of one lowercased word (ADV, ADJ, GERUND, ...), or None when unknown."""
+    word = word.strip(_PUNCT)
+    if word.endswith(("'s", "’s")):
+        word = word[:-2]
+    pos = WORDS.get(word)
+    if pos is not None:
+        return pos
+    if '-' in word:
+        # Compounds take the tag of their last part ("sleep-deprived", "rent-free",
+        # "job-searching"), or of the first when that is a gerund ("replying-all").
+        pos = WORDS.get(word.rsplit('-', 1)[1]) or _suffix_tag(word)
+        if pos is None and _suffix_tag(word.split('-', 1)[0]) == GERUND:
+            pos = GERUND
+        return pos
+    return _suffix_tag(word)
+
+
+# ── Phrase rules ──
+_HEAD = {GERUND: ('GERUND', 'gerund'), PRON: ('NOUN_PHRASE', 'pronoun'),
+         NOUN: ('NOUN_PHRASE', 'noun_indicator'), DET: ('NOUN_PHRASE', 'determiner_word'),
+         PREP: ('PREP_PHRASE', 'preposition')}
+_NOUNISH = (NOUN, PRON, None)
+_ADJECTIVE = ('ADJECTIVE', 'adjective')
+_CLAUSE = ('SENTENCE_FRAG', 'hinglish_clause')
+_GENITIVE = ('NOUN_PHRASE', 'hinglish_genitive')
+_NOT_HEAD = (POSTPOSITION, NEGATION)
+_COPULA_ENDINGS = tuple(' ' + word for word, pos in WORDS.items() if pos == COPULA)
+
+# Short hash of the tables and RULES_VERSION, so caches can tell when the lexicon changed.
+VERSION = hashlib.sha256(repr((RULES_VERSION, sorted(WORDS.items()), SUFFIXES, sorted(_HEAD.items())))
+                         .encode('utf-8')).hexdigest()[:16]
+
+
+class PhraseRules:
+    """A stage of a RuleChain that classifies a response from its first words' tags."""
+
+    labels = {'gerund': 'GERUND', 'adverb_gerund': 'GERUND', 'pronoun': 'NOUN_PHRASE',
+              'noun_indicator': 'NOUN_PHRASE', 'determiner_word': 'NOUN_PHRASE',
+              'preposition': 'PREP_PHRASE', 'adjective_noun': 'NOUN_PHRASE', 'adjective': 'ADJECTIVE',
+              'hinglish_clause': 'SENTENCE_FRAG', 'hinglish_genitive': 'NOUN_PHRASE'}
+
+    version = VERSION
+
+    def match(self, text):
+        """Return (label, rule) for text (lowercased and stripped), or None."""
+        first, _, rest = text.partition(' ')
+        if rest:
+            if text.rstrip(_PUNCT).endswith(_COPULA_ENDINGS):
+                return _CLAUSE
+            if ' k' in text:
+                words = rest.split()
+                for i in range(len(words) - 1):
+                    if tag(words[i]) == GENITIVE and tag(words[i + 1]) not in _NOT_HEAD:
+                        return _GENITIVE
+        pos = tag(first)
+        head = _HEAD.get(pos)
+        if head is not None:
+            return head
+        if pos != ADV and pos != ADJ:
+            return None
+        # Only phrases opening with an adverb or an adjective need the next words.
+        words = rest.split()
+        i = 0
+        if pos == ADV:
+            while i < len(words) and tag(words[i]) == ADV:
+                i += 1
+            if i == len(words):
+                return _ADJECTIVE
+            pos = tag(words[i])
+            i += 1
+            if pos == GERUND:
+                return 'GERUND', 'adverb_gerund'
+            if pos in _HEAD:
+                return _HEAD[pos]
+            if pos != ADJ:
+                return _ADJECTIVE      # "literally insane": adverbs open adjective phrases
+        for word in words[i:]:
+            pos = tag(word)
+            if pos in _NOUNISH:
+                return 'NOUN_PHRASE', 'adjective_noun'
+            if pos != ADJ and pos != ADV:
+                break
+        return _ADJECTIVE
+
+    def profile_stage(self, texts):
+        """Like RuleSet.profile_stage: ([(rule, label, hits, seconds), ...], texts no rule matched)."""
+        hits = dict.fromkeys(self.labels, 0)
+        seconds = dict.fromkeys(self.labels, 0.0)
+        remaining = []
+        for text in texts:
+            start = time.perf_counter()
+            m = self.match(text)
+            elapsed = time.perf_counter() - start
+            if m is None:
+                remaining.append(text)
+                continue
+            hits[m[1]] += 1
+            seconds[m[1]] += elapsed
+        return [(rule, label, hits[rule], seconds[rule]) for rule, label in self.labels.items()], remaining
@@ -0,0 +1,146 @@
+"""
+Mixed-deck analysis: several categories pooled into one deck, so every
+scenario meets every response of every chosen category.
+
+A verdict only depends on (slot type, response type), so each category is
+reduced to two short vectors while the deck streams past:
+
+  bad_by_type[rt]  how many of its scenarios reject response type rt
+  resp_hist[rt]    how many of its responses have type rt
+
+and the BAD count of scenarios from category i with responses from category
+j is bad_by_type_i · resp_hist_j. The category × category matrix is computed
+a block of rows at a time (a block × categories slab, with NumPy when it is
+installed) and written out as it goes, so memory grows with the number of
+categories, never with its square or with the number of cards.
+"""
+import heapq
+import itertools
+
+from .deep import COMPAT
+from .optimize import is_bad
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BLOCK = 64
+COLUMNS = 12                # heatmap columns per band in the text report
+WORST = 5
+RESP_TYPES = list(COMPAT['OPEN'])
+SHADES = ((0, ' '), (0.01, '·'), (0.05, '░'), (0.15, '▒'), (0.35, '▓'), (1.01, '█'))
+
+
+class CategoryVectors:
+    """Per-category type vectors of the pooled deck, in deck order."""
+
+    def __init__(self, analyzer, categories, keys=None):
+        self.keys = []
+        self.names = []
+        self.n_scenarios = []
+        self.n_responses = []
+        self.bad_by_type = []
+        self.resp_hist = []
+        for cat_key, cat_data in categories:
+            if keys and cat_key not in keys:
+                continue
+            slots = {}
+            for s in cat_data['scenarios']:
+                s = analyzer.normalize_scenario(s)
+                if s is None:
+                    continue
+                slot_type, _ = analyzer.classify_scenario_slot(s)
+                if slot_type != 'SKIP':
+                    slots[slot_type] = slots.get(slot_type, 0) + 1
+            hist = dict.fromkeys(RESP_TYPES, 0)
+            for r in cat_data['responses']:
+                hist[analyzer.classify_response(r)] += 1
+            self.keys.append(cat_key)
+            self.names.append(cat_data['name'])
+            self.n_scenarios.append(sum(slots.values()))
+            self.n_responses.append(len(cat_data['responses']))
+            self.bad_by_type.append([sum(n for st, n in slots.items() if is_bad(st, rt)) for rt in RESP_TYPES])
+            self.resp_hist.append([hist[rt] for rt in RESP_TYPES])
+
+    def rows(self, block=BLOCK):
+        """Yield (i, totals, bads) per scenario category, totals and bads over every response category."""
+        n = len(self.keys)
+        if np is not None:
+            bad_by_type = np.array(self.bad_by_type, dtype=np.int64).reshape(n, len(RESP_TYPES))
+            resp_hist_t = np.array(self.resp_hist, dtype=np.int64).reshape(n, len(RESP_TYPES)).T.copy()
+            n_responses = np.array(self.n_responses, dtype=np.int64)
+            for lo in range(0, n, block):
+                bads = bad_by_type[lo:lo + block] @ resp_hist_t
+                for k, row in enumerate(bads):
+                    i = lo + k
+                    yield i, (self.n_scenarios[i] * n_responses).tolist(), row.tolist()
+            return
+        for i in range(n):
+            v = self.bad_by_type[i]
+            bads = [sum(a * b for a, b in zip(v, r)) for r in self.resp_hist]
+            yield i, [self.n_scenarios[i] * nr for nr in self.n_responses], bads
+
+
+def shade(bad_rate):
+    for limit, char in SHADES:
+        if bad_rate <= limit:
+            return char
+    return SHADES[-1][1]
+
+
+def report_mixed(report, vectors, block=BLOCK):
+    """Write the pooled totals, the heatmap of BAD % by scenario × response category and the worst pairs."""
+    n = len(vectors.keys)
+    report.line("=" * 100)
+    report.line(f"MIXED DECK — {n} categories pooled")
+    report.line("=" * 100)
+
+    grand_total = 0
+    grand_bad = 0
+    col_total = [0] * n
+    col_bad = [0] * n
+    worst = []                  # the worst off-diagonal pairs so far
+    for i, totals, bads in vectors.rows(block):
+        row_total = sum(totals)
+        row_bad = sum(bads)
+        grand_total += row_total
+        grand_bad += row_bad
+        for j in range(n):
+            col_total[j] += totals[j]
+            col_bad[j] += bads[j]
+        pairs = ((bads[j] / totals[j], bads[j], i, j) for j in range(n) if j != i and totals[j] and bads[j])
+        worst = heapq.nlargest(WORST, itertools.chain(worst, pairs))
+        report.record('mixed_row', scenarios=vectors.keys[i], total=row_total, ok=row_total - row_bad, bad=row_bad,
+                      bad_by_responses={vectors.keys[j]: bads[j] for j in range(n) if bads[j]})
+
+    report.line(f"\n  Pooled: {grand_total} combos | OK: {grand_total - grand_bad} "
+                f"({(grand_total - grand_bad) / grand_total * 100 if grand_total else 0:.1f}%) | BAD: {grand_bad} "
+                f"({grand_bad / grand_total * 100 if grand_total else 0:.1f}%)")
+    report.record('mixed_overall', categories=vectors.keys, total=grand_total, ok=grand_total - grand_bad,
+                  bad=grand_bad)
+    if not report.detail:
+        return
+
+    if report.text:
+        # One band of columns at a time, recomputing the rows for each, so
+        # the matrix is never held in memory.
+        report.line(f"\n  BAD % of scenarios from the row category with responses from the column category")
+        for i, name in enumerate(vectors.names):
+            report.line(f"  {i + 1:>5}  {vectors.keys[i]:<16} {name}")
+        report.line(f"  (shade: · <1%  ░ <5%  ▒ <15%  ▓ <35%  █ ≥35%)")
+        for lo in range(0, n, COLUMNS):
+            cols = range(lo, min(lo + COLUMNS, n))
+            report.line("\n" + " " * 22 + ''.join(f"{j + 1:>6} " for j in cols))
+            for i, totals, bads in vectors.rows(block):
+                rates = [bads[j] / totals[j] if totals[j] else 0 for j in cols]
+                report.line(f"  {i + 1:>3} {vectors.keys[i][:16]:<16}"
+                            + ''.join(f"{rate * 100:>6.1f}{shade(rate)}" for rate in rates))
+            report.line(f"  {'all':>20}" + ''.join(
+                f"{(col_bad[j] / col_total[j] * 100 if col_total[j] else 0):>6.1f} " for j in cols))
+
+    if worst:
+        report.line(f"\n  Worst cross-category pairs:")
+        for rate, bad, i, j in report.cap(worst):
+            report.line(f"    {vectors.keys[i]} scenarios + {vectors.keys[j]} responses: {rate * 100:.1f}% BAD ({bad})")
+            report.record('mixed_pair', scenarios=vectors.keys[i], responses=vectors.keys[j], bad=bad, share=rate)
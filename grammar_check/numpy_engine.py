@@ -0,0 +1,77 @@
+"""
+Vectorized NumPy engine for the deep grammar check.
+
+Each category's classified scenarios and responses are stored as small-integer
+code arrays, and COMPAT is stored as a boolean "bad" matrix indexed by
+(slot code, response code). Every count the report needs then falls out of a
+couple of bincounts and matrix-vector products:
+
+  bad per scenario = bad_matrix @ response_histogram, gathered by slot code
+  bad per response = scenario_histogram @ bad_matrix, gathered by response code
+
+so a deck of ~1M responses is scored in milliseconds once it is classified.
+numpy is only needed for this engine (the deep check with --numpy).
+"""
+import numpy as np
+
+# Response types produced by classify_response, in a fixed code order.
+RESP_TYPES = ['GERUND', 'NOUN_PHRASE', 'ADJECTIVE', 'SHORT_LABEL',
+              'PREP_PHRASE', 'SENTENCE_FRAG', 'TRUMP']
+
+
+def build_bad_matrix(compat, slot_types, resp_types=RESP_TYPES):
+    """Boolean matrix where [i, j] is True if slot_types[i] + resp_types[j] is a bad combo.
+
+    Mirrors the dict lookups of the pure-Python loop: unknown slot types fall
+    back to OPEN, unknown response types are OK, and TRUMP is always OK.
+    """
+    bad = np.zeros((len(slot_types), len(resp_types)), dtype=bool)
+    for i, st in enumerate(slot_types):
+        row = compat.get(st, compat['OPEN'])
+        for j, rt in enumerate(resp_types):
+            bad[i, j] = rt != 'TRUMP' and not row.get(rt, True)
+    return bad
+
+
+def encode(labels, vocab):
+    """Map a sequence of type labels to a uint8 code array using vocab order."""
+    index = {label: i for i, label in enumerate(vocab)}
+    return np.fromiter((index[label] for label in labels), dtype=np.uint8, count=len(labels))
+
+
+def analyze_codes(slot_codes, resp_codes, bad_matrix):
+    """Score one category from its code arrays.
+
+    Returns a dict with the total and bad combo counts, the per-(slot, resp)
+    bad count matrix, and per-scenario / per-response bad counts aligned with
+    the input arrays.
+    """
+    n_slots, n_resps = bad_matrix.shape
+    slot_hist = np.bincount(slot_codes, minlength=n_slots).astype(np.int64)
+    resp_hist = np.bincount(resp_codes, minlength=n_resps).astype(np.int64)
+    bad_int = bad_matrix.astype(np.int64)
+
+    pair_bad = bad_int * np.outer(slot_hist, resp_hist)
+    per_scenario = (bad_int @ resp_hist)[slot_codes]
+    per_response = (slot_hist @ bad_int)[resp_codes]
+    return {
+        'total': len(slot_codes) * len(resp_codes),
+        'bad': int(pair_bad.sum()),
+        'pair_bad': pair_bad,
+        'per_scenario': per_scenario,
+        'per_response': per_response,
+    }
+
+
+def first_index(codes, n):
+    """First position of each code in codes, or -1 for codes that never occur."""
+    first = np.full(n, -1, dtype=np.int64)
+    uniq, idx = np.unique(codes, return_index=True)
+    first[uniq] = idx
+    return first
+
+
+def worst_offenders(bad_counts, k):
+    """Indices of the k cards with the most bad combos, ties kept in deck order."""
+    order = np.argsort(-bad_counts, kind='stable')[:k]
+    return order[bad_counts[order] > 0]
@@ -0,0 +1,156 @@
+"""
+Deck composition optimizer: the fewest response cards to rewrite or drop for
+a category to reach a target OK rate, worked out from type counts.
+
+With S[st] scenarios of each slot type and R[rt] responses of each response
+type, one response of type rt is bad in
+
+  col_bad[rt] = sum over st of S[st] × bad(st, rt)
+
+combos. Rewriting it as the category's best type (the one with the fewest bad
+combos) removes col_bad[rt] − col_bad[best] of them; dropping it removes its
+whole column. Every card of a type has the same effect, so the plan is built
+type by type: take the change that raises the OK rate most, as many cards of
+it as the target needs, and repeat. That only looks at a dozen types, so it is
+instant whatever the deck size once the cards are classified.
+
+Scenarios in verb slots (I_VERB, WHO_CLAUSE, SOMEONE_VERB) only take sentence
+fragments, so they are ranked separately by the bad combos they cause.
+"""
+import math
+
+from .binary import dealt_scenarios, response_types
+from .deep import COMPAT
+
+TARGET = 0.99
+VERB_SLOTS = ('I_VERB', 'WHO_CLAUSE', 'SOMEONE_VERB')
+
+
+def is_bad(slot_type, resp_type):
+    return resp_type != 'TRUMP' and not COMPAT.get(slot_type, COMPAT['OPEN']).get(resp_type, True)
+
+
+class Composition:
+    """Slot-type and response-type counts of one category, with the cards of each type."""
+
+    def __init__(self, analyzer, cat_data):
+        self.slots = {}
+        self.scenarios = dealt_scenarios(analyzer, cat_data['scenarios'])     # (scenario, slot type)
+        for _, slot_type in self.scenarios:
+            self.slots[slot_type] = self.slots.get(slot_type, 0) + 1
+        self.responses = {}             # type → responses of that type, in deck order
+        for r, r_type in zip(cat_data['responses'], response_types(analyzer, cat_data['responses'])):
+            self.responses.setdefault(r_type, []).append(r)
+        self.n_scenarios = len(self.scenarios)
+        self.n_responses = len(cat_data['responses'])
+
+    def col_bad(self, resp_type):
+        return sum(count for st, count in self.slots.items() if is_bad(st, resp_type))
+
+    def row_bad(self, slot_type):
+        return sum(len(cards) for rt, cards in self.responses.items() if is_bad(slot_type, rt))
+
+
+def plan(comp, target=TARGET):
+    """Return (ok, total, steps, ok_after, total_after).
+
+    steps is [(action, resp_type, into, cards)] with action 'rewrite' (as
+    type into) or 'drop'. When the target can't be reached the plan goes as
+    far as changes still help.
+    """
+    total = comp.n_scenarios * comp.n_responses
+    bad = sum(comp.col_bad(rt) * len(cards) for rt, cards in comp.responses.items())
+    ok = total - bad
+    n_s = comp.n_scenarios
+    col_bad = {rt: comp.col_bad(rt) for rt in COMPAT['OPEN'] if rt != 'TRUMP'}
+    best = min(col_bad, key=lambda rt: (col_bad[rt], -len(comp.responses.get(rt, ()))))
+    left = {rt: len(cards) for rt, cards in comp.responses.items()}
+    steps = []
+    cur_ok, cur_total = ok, total
+    while cur_total and cur_ok < target * cur_total:
+        choice = None
+        for rt, n in left.items():
+            if not n or rt not in col_bad:
+                continue
+            gain = col_bad[rt] - col_bad[best]
+            if gain > 0:
+                option = ((cur_ok + gain) / cur_total, 'rewrite', rt)
+                choice = max(choice, option) if choice else option
+            if cur_total > n_s:
+                option = ((cur_ok - (n_s - col_bad[rt])) / (cur_total - n_s), 'drop', rt)
+                if option[0] > cur_ok / cur_total:
+                    choice = max(choice, option) if choice else option
+        if choice is None:
+            break
+        _, action, rt = choice
+        deficit = target * cur_total - cur_ok
+        if action == 'rewrite':
+            gain = col_bad[rt] - col_bad[best]
+            k = math.ceil(deficit / gain)
+        else:
+            per_card = col_bad[rt] - (1 - target) * n_s
+            k = math.ceil(deficit / per_card) if per_card > 0 else left[rt]
+        # A drop also shrinks the total, so never drop the last response.
+        k = min(k, left[rt], (cur_total // n_s) - 1 if action == 'drop' else left[rt])
+        if k <= 0:
+            break
+        done = len(comp.responses[rt]) - left[rt]
+        cards = comp.responses[rt][done:done + k]
+        if steps and steps[-1][:2] == (action, rt):
+            steps[-1][3].extend(cards)
+        else:
+            steps.append((action, rt, best if action == 'rewrite' else None, cards))
+        left[rt] -= k
+        if action == 'rewrite':
+            cur_ok += k * (col_bad[rt] - col_bad[best])
+        else:
+            cur_ok -= k * (n_s - col_bad[rt])
+            cur_total -= k * n_s
+    return ok, total, steps, cur_ok, cur_total
+
+
+def costly_scenarios(comp, slot_types=VERB_SLOTS):
+    """[(scenario, slot type, bad combos)] for scenarios in the given slots, most bad first."""
+    costs = {st: comp.row_bad(st) for st in comp.slots if st in slot_types}
+    ranked = [(s, st, costs[st]) for s, st in comp.scenarios if st in costs]
+    ranked.sort(key=lambda x: -x[2])
+    return ranked
+
+
+def _rate(ok, total):
+    return ok / total * 100 if total else 0
+
+
+def report_plans(analyzer, categories, report, target=TARGET):
+    """Write the computed fix for every (cat_key, cat_data) in categories."""
+    report.line(f"\n{'=' * 100}")
+    report.line(f"RECOMMENDED FIX: FEWEST RESPONSE CHANGES TO REACH {target * 100:.0f}% OK PER CATEGORY")
+    report.line(f"{'=' * 100}")
+    for cat_key, cat_data in categories:
+        comp = Composition(analyzer, cat_data)
+        ok, total, steps, ok_after, total_after = plan(comp, target)
+        report.line(f"\n  {cat_data['name']}: {_rate(ok, total):.1f}% OK now")
+        if not steps:
+            report.line("    nothing to change" if ok >= target * total else "    no response change helps")
+        for action, rt, into, cards in steps:
+            what = f"rewrite {len(cards)} {rt} response(s) as {into}" if action == 'rewrite' \
+                else f"drop {len(cards)} {rt} response(s)"
+            report.line(f"    {what}")
+            for card in report.cap(cards, 3):
+                report.line(f"      \"{card[:80]}\"")
+            report.record('fix', category=cat_key, action=action, resp_type=rt, into=into, count=len(cards),
+                          responses=report.cap(cards))
+        if steps:
+            reached = "" if ok_after >= target * total_after else " (target out of reach with response changes)"
+            report.line(f"    → {_rate(ok_after, total_after):.1f}% OK with {sum(len(c) for *_, c in steps)} "
+                        f"card(s) changed{reached}")
+        report.record('plan', category=cat_key, name=cat_data['name'], target=target, ok=ok, total=total,
+                      ok_after=ok_after, total_after=total_after, cards=sum(len(c) for *_, c in steps))
+        costly = costly_scenarios(comp)
+        if costly and report.detail:
+            bad = total - ok
+            report.line(f"    Verb-slot scenarios costing the most ({len(costly)}):")
+            for s, st, cost in report.cap(costly, 5):
+                share = cost / bad * 100 if bad else 0
+                report.line(f"      {cost:>6} bad ({share:.0f}% of BAD) [{st}] \"{s[:60]}\"")
+                report.record('costly_scenario', category=cat_key, scenario=s, slot_type=st, bad=cost)
@@ -0,0 +1,78 @@
+"""
+Report output for the grammar checks: the human-readable text report, or
+machine-readable records.
+
+In text mode line() prints and record() does nothing; in the json/ndjson
+modes it's the other way round. Records are written as soon as they are
+produced:
+
+  ndjson  one JSON object per line
+  json    a single JSON array, streamed one element at a time
+
+Every record has a "type" field (e.g. "category", "issue", "overall").
+limit caps how many entries of each per-category list (issues, problem
+scenarios, sampled bad combos, ...) are emitted; quiet keeps only the
+per-category and overall totals.
+"""
+import itertools
+import json
+import sys
+
+FORMATS = ('text', 'json', 'ndjson')
+
+
+def add_arguments(parser):
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help='report format: text (default), json (one array) or ndjson (one record per line)')
+    parser.add_argument('--limit', type=int, default=None, metavar='N',
+                        help='emit at most N entries of each per-category list')
+    parser.add_argument('--quiet', action='store_true',
+                        help='only emit per-category and overall totals')
+
+
+class Report:
+    def __init__(self, fmt='text', limit=None, quiet=False, out=None):
+        self.fmt = fmt
+        self.limit = limit
+        self.quiet = quiet
+        self.out = out or sys.stdout
+        self.text = fmt == 'text'
+        self._first = True
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.format, args.limit, args.quiet)
+
+    @property
+    def detail(self):
+        """Whether the detailed (non-total) parts of the report are wanted."""
+        return not self.quiet
+
+    def line(self, text=''):
+        if self.text:
+            print(text, file=self.out)
+
+    def record(self, kind, **fields):
+        if self.text:
+            return
+        data = json.dumps({'type': kind, **fields}, ensure_ascii=False)
+        if self.fmt == 'ndjson':
+            self.out.write(data + '\n')
+        else:
+            self.out.write(('[\n' if self._first else ',\n') + data)
+        self._first = False
+        self.out.flush()
+
+    def cap(self, items, text_cap=None):
+        """items cut to --limit, and to text_cap in text mode, as a list."""
+        n = self.limit
+        if self.text and text_cap is not None:
+            n = text_cap if n is None else min(n, text_cap)
+        if n is None:
+            return list(items)
+        return list(itertools.islice(items, max(n, 0)))
+
+    def close(self):
+        if self.fmt == 'json':
+            self.out.write('[]\n' if self._first else '\n]\n')
+            self.out.flush()
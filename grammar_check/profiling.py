@@ -0,0 +1,117 @@
+"""
+Profiling for the deep check (deep --profile).
+
+Profiler wraps a DeepAnalyzer's normalize, classify and analyze_category
+callables with timers and tallies wall time per phase:
+
+  load       reading/parsing the deck
+  normalize  multi-blank normalization
+  classify   the scenario and response classifiers (cache lookups included)
+  matrix     the rest of analyze_category: the COMPAT checks and bookkeeping
+  report     everything else, mostly formatting and writing the report
+
+Times are exclusive: a phase running inside another (classify inside
+analyze_category) is not counted twice. The wrappers add a little overhead
+per call, so absolute numbers run somewhat high.
+
+It also remembers every distinct card the classifiers saw (scenarios in
+their normalized form, which is what the rules match, so a scenario
+classified both raw and normalized counts once), and afterwards
+replays them through the rule tables rule by rule (RuleSet.profile) to show
+how many cards each rule matched, how many fell through to the OPEN and
+SHORT_LABEL defaults, and what each rule's regex cost.
+"""
+import time
+
+from .deep import DEEP_RESPONSE_RULES, DEEP_SCENARIO_RULES, response_text, scenario_slot_text
+
+PHASES = ('load', 'normalize', 'classify', 'matrix', 'report')
+
+
+class Profiler:
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.scenarios = set()
+        self.responses = set()
+        self._stack = []
+
+    def timed(self, phase, fn, seen=None, key=None):
+        """fn wrapped to add its exclusive wall time to phase (and key(result), or its argument, to seen)."""
+        stack = self._stack
+        seconds = self.seconds
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            frame = [0.0]
+            stack.append(frame)
+            start = perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                stack.pop()
+                seconds[phase] += elapsed - frame[0]
+                if stack:
+                    stack[-1][0] += elapsed
+            if seen is not None:
+                seen.add(args[0] if key is None else key(result))
+            return result
+        return wrapper
+
+    def timed_iter(self, phase, iterable):
+        """Iterate over iterable, counting the time spent producing each item as phase."""
+        step = self.timed(phase, next)
+        it = iter(iterable)
+        while True:
+            try:
+                item = step(it)
+            except StopIteration:
+                return
+            yield item
+
+    def instrument(self, analyzer):
+        """Wrap the analyzer's phases; it must run serially (jobs=1)."""
+        analyzer.normalize_scenario = self.timed('normalize', analyzer.normalize_scenario)
+        # Scenarios reach the classifier both raw and normalized; count the
+        # normalized text it returns.
+        analyzer.classify_scenario_slot_rule = self.timed('classify', analyzer.classify_scenario_slot_rule,
+                                                          self.scenarios, key=lambda result: result[2])
+        analyzer.classify_response_rule = self.timed('classify', analyzer.classify_response_rule, self.responses)
+        analyzer.analyze_category = self.timed('matrix', analyzer.analyze_category)
+
+    def rule_stats(self):
+        """Return {classifier: [(rule, label, hits, seconds), ...]} for the cards seen.
+
+        The scenario table ends with the OPEN default and a 'skip' row for
+        scenarios without a single blank; the response table ends with the
+        SHORT_LABEL default.
+        """
+        texts = [scenario_slot_text(s)[0] for s in self.scenarios]
+        rules, fallthrough = DEEP_SCENARIO_RULES.profile([t for t in texts if t is not None])
+        label, rule = DEEP_SCENARIO_RULES.default
+        scenario = rules + [(rule, label, fallthrough, 0.0), ('skip', 'SKIP', texts.count(None), 0.0)]
+        rules, fallthrough = DEEP_RESPONSE_RULES.profile([response_text(r) for r in self.responses])
+        label, rule = DEEP_RESPONSE_RULES.default
+        response = rules + [(rule, label, fallthrough, 0.0)]
+        return {'scenario': scenario, 'response': response}
+
+
+def report_profile(profiler, report):
+    report.line(f"\n{'=' * 100}")
+    report.line("PROFILE")
+    report.line(f"{'=' * 100}")
+    total = sum(profiler.seconds.values())
+    report.line(f"\n  Wall time per phase ({total:.4f}s total):")
+    for phase in PHASES:
+        secs = profiler.seconds[phase]
+        report.line(f"    {phase:<10} {secs:>10.4f}s  {secs / total * 100 if total else 0:5.1f}%")
+        report.record('profile_phase', phase=phase, seconds=secs)
+
+    for classifier, rows in profiler.rule_stats().items():
+        cards = len(profiler.scenarios if classifier == 'scenario' else profiler.responses)
+        regex_total = sum(secs for *_, secs in rows)
+        report.line(f"\n  {classifier.capitalize()} rules ({cards} distinct cards, {regex_total * 1000:.2f} ms of regex):")
+        report.line(f"    {'rule':<16} {'label':<20} {'hits':>8} {'share':>7} {'regex ms':>9}")
+        for rule, label, hits, secs in rows:
+            report.line(f"    {rule:<16} {label:<20} {hits:>8} {hits / cards * 100 if cards else 0:6.1f}% {secs * 1000:>9.3f}")
+            report.record('profile_rule', classifier=classifier, rule=rule, label=label, hits=hits, seconds=secs)
@@ -0,0 +1,194 @@
+"""
+Quick check: a coarse scenario/response classification with a handful of
+mismatch patterns, reported per category and by root cause.
+"""
+import re
+
+from .cache import classifier_version
+from .deck import DECK_PATH, iter_deck, normalize_scenario
+from .rules import QUICK_RESPONSE_RULES, QUICK_SCENARIO_RULES
+
+# Classification rules for detecting grammatical mismatches
+# We categorize scenarios by what grammatical form the blank expects:
+#   - NOUN_PHRASE: blank expects a noun/noun-phrase (e.g. "My guilty pleasure: _____.")
+#   - GERUND_CLAUSE: blank expects "doing something" / "-ing" form (e.g. "What I got caught doing: _____.")
+#   - IDENTITY: blank expects "I am _____" style (e.g. "The reality of who I am: _____.")
+#   - QUESTION: blank expects a direct answer to a question
+#   - OPEN: basically anything goes
+# The rules themselves live in rules.py as one compiled table.
+
+def classify_scenario_rule(s):
+    """Return (expected grammatical type for the blank, rule that fired)."""
+    return QUICK_SCENARIO_RULES.classify(s.lower().strip())
+
+
+def classify_scenario(s):
+    """Return expected grammatical type for the blank."""
+    return classify_scenario_rule(s)[0]
+
+
+def classify_response_rule(r):
+    """Return (grammatical type of the response, rule that fired)."""
+    return QUICK_RESPONSE_RULES.classify(r.lower().strip().rstrip('.'))
+
+
+def classify_response(r):
+    """Return grammatical type of the response."""
+    return classify_response_rule(r)[0]
+
+
+EXAMPLES = 5
+
+
+def issue_pattern(issue):
+    """The pattern an issue string belongs to, i.e. everything before the first colon."""
+    return issue.split(':')[0] if ':' in issue else issue
+
+
+class QuickChecker:
+    """Tests scenario + response combinations, classifying cards through an optional cache."""
+
+    def __init__(self, cache=None, examples=EXAMPLES):
+        self.cache = cache
+        self.examples = examples
+        self.classify_scenario_rule = classify_scenario_rule
+        self.classify_response_rule = classify_response_rule
+        if cache is not None:
+            self.classify_scenario_rule = cache.classifier(
+                'quick.scenario', classify_scenario_rule,
+                classifier_version(QUICK_SCENARIO_RULES, classify_scenario_rule))
+            self.classify_response_rule = cache.classifier(
+                'quick.response', classify_response_rule,
+                classifier_version(QUICK_RESPONSE_RULES, classify_response_rule))
+
+    def test_combination(self, scenario, response):
+        """
+        Test if a scenario+response combination makes grammatical sense.
+        Returns (ok: bool, issue: str or None)
+        """
+        if response.startswith('TRUMP:'):
+            return True, None
+
+        s_type = self.classify_scenario_rule(scenario)[0]
+        r_type = self.classify_response_rule(response)[0]
+
+        # Substitute and check
+        filled = scenario.replace('_____', response)
+
+        issues = []
+
+        # IDENTITY scenarios need identity-compatible responses (adjective, noun_phrase, gerund)
+        if s_type == 'IDENTITY':
+            if r_type == 'VERB_PHRASE':
+                issues.append(f'IDENTITY scenario + VERB_PHRASE response: "{filled[:80]}"')
+
+        # GERUND scenarios need gerund responses
+        if s_type == 'GERUND':
+            if r_type == 'NOUN_PHRASE' or r_type == 'VERB_PHRASE' or r_type == 'SENTENCE':
+                # Check if it actually reads okay
+                if not response.lower().strip().endswith('ing') and not re.match(r'^(a|an|the|my|that)', response.lower()):
+                    issues.append(f'GERUND scenario + non-gerund response: "{filled[:80]}"')
+
+        # Check "verb after colon" issue - scenarios like "My guilty pleasure: _____."
+        # filled with a verb phrase like "revolts against that" sounds wrong
+        if s_type == 'NOUN_PHRASE' and r_type == 'VERB_PHRASE':
+            issues.append(f'NOUN/LABEL scenario + VERB_PHRASE response: "{filled[:80]}"')
+
+        # Check capitalization consistency
+        # Scenario "It's giving _____ energy" + "a functioning alcoholic" =
+        # "It's giving a functioning alcoholic energy" (sounds wrong)
+        if s_type == 'ADJECTIVE' and r_type not in ('ADJECTIVE', 'NOUN_PHRASE'):
+            issues.append(f'ADJECTIVE slot + wrong type: "{filled[:80]}"')
+
+        # QUESTION scenarios - most responses work
+        if s_type == 'QUESTION' and r_type == 'VERB_PHRASE':
+            issues.append(f'QUESTION + VERB_PHRASE mismatch: "{filled[:80]}"')
+
+        if issues:
+            return False, issues[0]
+        return True, None
+
+    def check_category(self, cat_data):
+        """Return (total, bad, patterns, examples) for one category's cards.
+
+        patterns counts the issues per pattern, in first-seen order; examples
+        are the first `examples` issue strings. Memory stays O(patterns), not
+        O(bad combos).
+        """
+        responses = [r for r in cat_data['responses'] if not r.startswith('TRUMP:')]
+        total = 0
+        bad = 0
+        patterns = {}
+        examples = []
+        for s in cat_data['scenarios']:
+            # Transform multi-blank scenarios same as the JS does
+            s = normalize_scenario(s)
+            if s is None:
+                continue
+            for r in responses:
+                total += 1
+                ok, issue = self.test_combination(s, r)
+                if not ok:
+                    bad += 1
+                    pattern = issue_pattern(issue)
+                    patterns[pattern] = patterns.get(pattern, 0) + 1
+                    if len(examples) < self.examples:
+                        examples.append(issue)
+        return total, bad, patterns, examples
+
+
+def run_quick(checker, report, deck_path=DECK_PATH, streaming=False):
+    """Write the quick check report for a deck."""
+    report.line("=" * 90)
+    report.line("SCENARIO + RESPONSE GRAMMAR/SENSE TEST")
+    report.line("=" * 90)
+
+    grand_total = 0
+    grand_bad = 0
+    pattern_counts = {}
+
+    for cat_key, cat_data in iter_deck(deck_path, streaming):
+        total, bad, cat_patterns, cat_issues = checker.check_category(cat_data)
+        pct_bad = (bad / total * 100) if total > 0 else 0
+        pct_good = 100 - pct_bad
+        grand_total += total
+        grand_bad += bad
+        for pattern, count in cat_patterns.items():
+            pattern_counts[pattern] = pattern_counts.get(pattern, 0) + count
+
+        report.line(f"\n{'─' * 90}")
+        report.line(f"Category: {cat_data['name']}")
+        report.line(f"  Combinations tested: {total}")
+        report.line(f"  Grammatically OK:    {total - bad} ({pct_good:.1f}%)")
+        report.line(f"  Issues found:        {bad} ({pct_bad:.1f}%)")
+        report.record('category', category=cat_key, name=cat_data['name'], total=total, ok=total - bad, bad=bad)
+        if cat_issues and report.detail:
+            report.line(f"  Sample issues:")
+            for iss in report.cap(cat_issues, 5):
+                report.line(f"    - {iss}")
+                report.record('issue', category=cat_key, pattern=issue_pattern(iss), issue=iss)
+
+    report.line(f"\n{'=' * 90}")
+    report.line(f"OVERALL SUMMARY")
+    report.line(f"{'=' * 90}")
+    report.line(f"  Total combinations tested: {grand_total}")
+    report.line(f"  Grammatically OK:          {grand_total - grand_bad} ({(grand_total - grand_bad)/grand_total*100:.1f}%)")
+    report.line(f"  Issues found:              {grand_bad} ({grand_bad/grand_total*100:.1f}%)")
+    report.record('overall', total=grand_total, ok=grand_total - grand_bad, bad=grand_bad)
+
+    if not report.detail:
+        return
+
+    report.line(f"\n{'=' * 90}")
+    report.line(f"ROOT CAUSE PATTERN ANALYSIS")
+    report.line(f"{'=' * 90}")
+
+    report.line(f"\nIssue breakdown by pattern:")
+    for pattern, count in sorted(pattern_counts.items(), key=lambda x: -x[1]):
+        report.line(f"  {pattern}: {count} ({count/grand_bad*100:.1f}% of all issues)")
+        report.record('pattern', pattern=pattern, count=count, share=count / grand_bad)
+
+    # No plan here: the quick check's verdicts also look at the response
+    # text, so they can't be planned from type counts the way deep's can.
+    report.line(f"\n  For the fewest changes that reach a target OK rate (deep check's types): "
+                f"python -m grammar_check optimize")
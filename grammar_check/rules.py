@@ -0,0 +1,204 @@
+"""
+Declarative classification rules for the quick and deep checks.
+
+Each classifier is an ordered table of (rule, label, pattern). On first use a
+RuleSet compiles its table into a single anchored regex of named alternatives:
+
+    ^(?:(?P<rule_1>pattern_1)|(?P<rule_2>pattern_2)|...)
+
+Python tries the alternatives of an anchored alternation in order, so the
+first rule that can match wins — the same precedence as the old chain of
+if/re.search blocks — and the name of the group that matched tells us which
+rule fired. Classifying a card is one regex call instead of up to a dozen.
+
+Scenario rules for the deep check look at what comes before and after the
+blank, so they are matched against "before" + SEP + "after" rather than the
+raw text; "before ends with X" is written as "X" followed by SEP.
+"""
+import hashlib
+import re
+import time
+
+from .lexicon import PhraseRules
+
+# Separates the text before the blank from the text after it.
+SEP = '\x00'
+_BEFORE = f'[^{SEP}]*'
+
+
+class RuleSet:
+    """An ordered rule table compiled into one combined regex."""
+
+    def __init__(self, rules, default):
+        self.rules = rules
+        self.default = default
+        self.labels = {name: label for name, label, _ in rules}
+        self._regex = None
+
+    @property
+    def regex(self):
+        if self._regex is None:
+            alternatives = '|'.join(f'(?P<{name}>{pattern})' for name, _, pattern in self.rules)
+            self._regex = re.compile(f'^(?:{alternatives})', re.DOTALL)
+        return self._regex
+
+    @property
+    def version(self):
+        """Short hash of the rule table, so caches can tell when the rules changed."""
+        return hashlib.sha256(repr((self.rules, self.default)).encode('utf-8')).hexdigest()[:16]
+
+    def match(self, text):
+        """Return (label, rule) for the first rule matching text, or None."""
+        m = self.regex.match(text)
+        if m is None:
+            return None
+        return self.labels[m.lastgroup], m.lastgroup
+
+    def classify(self, text):
+        """Return (label, rule), falling back to the default (label, rule)."""
+        return self.match(text) or self.default
+
+    def profile(self, texts):
+        """Hits and matching time per rule for classifying texts.
+
+        Returns ([(rule, label, hits, seconds), ...], default hits). The
+        combined regex tries the rules in order, so each rule is timed on its
+        own against just the texts no earlier rule matched, which is the work
+        that rule adds to the combined match.
+        """
+        stats, remaining = self.profile_stage(texts)
+        return stats, len(remaining)
+
+    def profile_stage(self, texts):
+        """profile() for a stage of a RuleChain: (stats, texts no rule matched)."""
+        remaining = list(texts)
+        stats = []
+        for name, label, pattern in self.rules:
+            match = re.compile(f'(?:{pattern})', re.DOTALL).match
+            start = time.perf_counter()
+            matched = [match(t) is not None for t in remaining]
+            elapsed = time.perf_counter() - start
+            stats.append((name, label, sum(matched), elapsed))
+            remaining = [t for t, m in zip(remaining, matched) if not m]
+        return stats, remaining
+
+
+class RuleChain:
+    """Stages (RuleSets, lexicon.PhraseRules) tried in order, the first match winning, then a default."""
+
+    def __init__(self, stages, default):
+        self.stages = stages
+        self.default = default
+        self._matches = tuple(stage.match for stage in stages)
+
+    @property
+    def version(self):
+        return hashlib.sha256(repr(([stage.version for stage in self.stages], self.default))
+                              .encode('utf-8')).hexdigest()[:16]
+
+    def match(self, text):
+        for match in self._matches:
+            m = match(text)
+            if m is not None:
+                return m
+        return None
+
+    def classify(self, text):
+        return self.match(text) or self.default
+
+    def profile(self, texts):
+        """RuleSet.profile over every stage's rules, in order."""
+        stats = []
+        for stage in self.stages:
+            stage_stats, texts = stage.profile_stage(texts)
+            stats.extend(stage_stats)
+        return stats, len(texts)
+
+
+# ── Deep check: what grammatical form does the blank expect? ──
+# Matched against before + SEP + after, both lowercased and stripped.
+DEEP_SCENARIO_RULES = RuleSet([
+    # "X is: _____" / "The tea is: _____"
+    ('is_predicate', 'IS_PREDICATE', rf'{_BEFORE}\bis[:\s]*{SEP}'),
+    # "I'm _____" / "I'm literally: _____"
+    ('identity', 'IDENTITY', rf"{_BEFORE}(?:i'?m|i am)\s*(?:literally\s*)?[:\s]*{SEP}"),
+    # "caught me/myself doing _____"
+    ('caught', 'GERUND_OBJECT', rf'{_BEFORE}caught\b'),
+    # "It's giving _____ energy"
+    ('giving_energy', 'ADJECTIVE_MODIFIER', rf'{_BEFORE}giving[^{SEP}]*{SEP}.*?energy'),
+    # "when I: _____" / "when I _____"
+    ('when_i', 'I_VERB', rf'{_BEFORE}when i[:\s]*{SEP}'),
+    # "saw me do: _____"
+    ('saw_me', 'VERB_INF', rf'{_BEFORE}(?:saw me|saw me do)[:\s]*{SEP}'),
+    # "I respect people who: _____"
+    ('who', 'WHO_CLAUSE', rf'{_BEFORE}who[:\s]*{SEP}'),
+    # "would be if someone: _____"
+    ('someone', 'SOMEONE_VERB', rf'{_BEFORE}someone[:\s]*{SEP}'),
+    # "stopping me from: _____"
+    ('from', 'FROM_GERUND', rf'{_BEFORE}from[:\s]*{SEP}'),
+    # "is full of: _____" / "addicted to: _____" / "over: _____"
+    ('preposition', 'OBJECT', rf'{_BEFORE}(?:of|to|over|about|for|at|from|into|with|doing)[:\s]*{SEP}'),
+    # Question mark at the end
+    ('question', 'ANSWER', r'.*\?\Z'),
+    # Label/title before a colon: "My X: _____"
+    ('label_colon', 'NOUN_LABEL', rf'{_BEFORE}:'),
+], default=('OPEN', 'open'))
+
+# Closed-class openers are regexes; the first words of everything else are
+# looked up in the lexicon (lexicon.py), and only then does length decide.
+DEEP_RESPONSE_RULES = RuleChain([
+    RuleSet([
+        ('trump', 'TRUMP', r'trump:'),
+        # Noun phrases (start with article/determiner/possessive)
+        ('determiner', 'NOUN_PHRASE', r'(?:a |an |the |my |your |our |that |this |some |one |no |every)'),
+        # Prepositional phrases ("at the gym", "in the closet", "on Reddit")
+        ('prep', 'PREP_PHRASE', r'(?:at |in |on |just |only |way )'),
+        # Sentence fragments starting with verbs
+        ('sentence_frag', 'SENTENCE_FRAG', r"(?:can't|won't|didn't|i )"),
+    ], default=None),
+    # Gerund, adjective and noun phrases, from the parts of speech of the first words
+    PhraseRules(),
+    RuleSet([
+        # Short phrases (four words or fewer) that act as labels/nouns
+        # (the text is stripped, so no leading \s* for failed matches to backtrack over)
+        ('short_label', 'SHORT_LABEL', r'\S+(?:\s+\S+){0,3}\s*\Z'),
+    ], default=None),
+], default=('SHORT_LABEL', 'fallback'))
+
+
+# ── Quick check: coarser rules ──
+# Matched against the whole lowercased scenario.
+QUICK_SCENARIO_RULES = RuleSet([
+    # Questions expect a direct noun/phrase answer
+    ('question', 'QUESTION', r'.*\?\Z'),
+    # "caught me/myself _____" expects gerund
+    ('caught', 'GERUND', r'.*?caught (?:me|myself|doing)\b'),
+    # "I'm/I am _____", "who I am: _____", "I'm literally: _____"
+    ('identity', 'IDENTITY', r".*?(?:i'?m|i am|who i am|you find out i'm|i'm literally)\s*[:\.]?\s*_"),
+    # "How I ..." expects gerund/phrase
+    ('how_i', 'GERUND', r'how i\b'),
+    # "why I ..." can accept gerund or noun phrase
+    ('why', 'REASON', r'why\b'),
+    # "What I do when ..." expects gerund
+    ('what_i_do', 'GERUND', r'.*?what i do\b'),
+    # "My guilty pleasure: _____." accepts noun phrases
+    ('label_colon', 'NOUN_PHRASE', r'.*?:\s*_____'),
+    # "It's giving _____ energy"
+    ('giving_energy', 'ADJECTIVE', r'(?=.*?giving)(?=.*?energy)'),
+    # "My partner has no clue I'm _____"
+    ('im_blank', 'IDENTITY', r".*?i'?m\s+_"),
+], default=('OPEN', 'open'))
+
+QUICK_RESPONSE_RULES = RuleSet([
+    ('trump', 'TRUMP', r'trump:'),
+    # Gerund / -ing phrase
+    ('gerund', 'GERUND', r'(?:getting|being|having|doing|making|thinking|watching|texting|saying|working|living|pretending|writing|napping|sleeping|avoiding|fighting|tweeting|oversharing|committing|touching|running|loving|rotting|eating|drinking|slapping|using|asking|calling|putting|bargaining|planning|paying|surviving|dodging|collecting|mastering|stealing|buying|raising|comparing|considering|wishing|realizing|pretending|looking|remembering|becoming|finding|existing|knowing)'),
+    # Starts with article/determiner → noun phrase
+    ('determiner', 'NOUN_PHRASE', r'(?:a |an |the |my |your |our |that |this |some )'),
+    # Adjective/identity phrases (often start with adjective or adverb)
+    ('adjective', 'ADJECTIVE', r'(?:chronically|absolutely|literally|genuinely|mentally|emotionally|professionally|seriously|honestly|completely|desperately|secretly|actively|currently|already|still|actually|basically|essentially|two-faced|fake|down|weird|aesthetic|broke)'),
+    # Full sentence indicators
+    ('sentence', 'SENTENCE', r"(?:i |he |she |they |we |it |just |can't|won't|didn't)"),
+    # Conjugated verb phrases
+    ('verb_phrase', 'VERB_PHRASE', r"(?:revolts|wakes|can't|sets|complains|shops|buys|asks|saves|turns|knows|worries|budgets|romanticizes|resents|calls|compares|groan|check|forget|need)"),
+], default=('NOUN_PHRASE', 'fallback'))
@@ -0,0 +1,213 @@
+"""
+Stratified sampling estimate of the deep check's OK rate, for decks too big
+to be worth a full run when all that's wanted is a health number.
+
+Strata are (category, slot type): scenarios are classified up front (one
+pass, cached), responses only when a sampled pair draws them. A stratum h
+holding S_h scenarios of a category with R_c responses stands for
+S_h × R_c of the deck's combos, its weight W_h. Pairs are drawn in rounds;
+each round goes to the categories whose interval is still too wide, split
+across their strata in proportion to W_h × sd_h (Neyman allocation). The
+estimate is Σ W_h p_h with variance Σ W_h² p_h(1 − p_h) / n_h, where p_h is
+smoothed as (ok + 1) / (n + 2) so a stratum that has only seen OK pairs
+still counts as uncertain.
+
+Sampling stops when every category's 95% interval and the overall one are
+within ±precision, or when the time budget is spent. The clock is checked
+between rounds of at most ROUND pairs and during the classification pass,
+so the budget holds to within one round. The up-front pass gets at most half
+the budget; categories it doesn't reach become one stratum each whose
+scenarios are classified as they are drawn, and whose weight counts the
+drawn scenarios that turn out not to be dealt (no single blank) as an
+estimate.
+"""
+import math
+import random
+import time
+
+from .deep import COMPAT
+
+Z = 1.96
+PRECISION = 0.005
+BUDGET = 5.0
+ROUND = 2000
+PILOT = 20                  # pairs per stratum in the first round
+
+
+class Stratum:
+    """Scenarios of one category and slot type; slot_type None for a category not classified up front."""
+
+    def __init__(self, cat_key, slot_type, scenarios, responses):
+        self.cat_key = cat_key
+        self.slot_type = slot_type
+        self.scenarios = scenarios
+        self.responses = responses
+        self.n = 0
+        self.ok = 0
+        self.skipped = 0            # drawn scenarios that aren't dealt, for slot_type None
+
+    @property
+    def size(self):
+        size = len(self.scenarios) * len(self.responses)
+        if self.skipped:
+            size = size * self.n // (self.n + self.skipped)
+        return size
+
+    def draw(self, analyzer, rng):
+        """Sample one pair; return whether it is OK, or None if the scenario is never dealt."""
+        slot_type = self.slot_type
+        if slot_type is None:
+            s = analyzer.normalize_scenario(self.scenarios[rng.randrange(len(self.scenarios))])
+            slot_type = analyzer.classify_scenario_slot(s)[0] if s is not None else 'SKIP'
+            if slot_type == 'SKIP':
+                self.skipped += 1
+                return None
+        # A classified scenario only matters through its slot type, which the stratum fixes.
+        r_type = analyzer.classify_response(self.responses[rng.randrange(len(self.responses))])
+        return r_type == 'TRUMP' or COMPAT.get(slot_type, COMPAT['OPEN']).get(r_type, True)
+
+    def p(self):
+        return (self.ok + 1) / (self.n + 2)
+
+    def sd(self):
+        p = self.p()
+        return math.sqrt(p * (1 - p))
+
+
+def combine(strata):
+    """(estimated OK rate, 95% half-width, pairs sampled) over strata, weighted by size."""
+    size = sum(h.size for h in strata)
+    if not size:
+        return None, 0.0, 0
+    rate = 0.0
+    var = 0.0
+    for h in strata:
+        w = h.size / size
+        rate += w * (h.ok / h.n if h.n else h.p())
+        var += w * w * h.p() * (1 - h.p()) / max(h.n, 1)
+    return rate, Z * math.sqrt(var), sum(h.n for h in strata)
+
+
+class SampleEstimate:
+    """The estimate as sampled so far, per category and overall."""
+
+    def __init__(self, names, strata):
+        self.names = names              # cat_key → display name, in deck order
+        self.strata = strata
+        self.rounds = 0
+        self.seconds = 0.0
+        self.stopped = None
+
+    def by_category(self):
+        groups = {cat_key: [] for cat_key in self.names}
+        for h in self.strata:
+            groups[h.cat_key].append(h)
+        return groups
+
+    def overall(self):
+        return combine(self.strata)
+
+
+def build_strata(analyzer, categories, deadline, clock):
+    """Return (names, strata), classifying scenarios into (category, slot type) strata until the deadline."""
+    names = {}
+    strata = []
+    for cat_key, cat_data in categories:
+        names[cat_key] = cat_data['name']
+        if not cat_data['responses']:
+            continue
+        by_slot = {}
+        for i, s in enumerate(cat_data['scenarios']):
+            if i % 1000 == 0 and clock() > deadline:
+                by_slot = None
+                break
+            s = analyzer.normalize_scenario(s)
+            if s is None:
+                continue
+            slot_type, _ = analyzer.classify_scenario_slot(s)
+            if slot_type != 'SKIP':
+                by_slot.setdefault(slot_type, []).append(s)
+        if by_slot is None:
+            if cat_data['scenarios']:
+                strata.append(Stratum(cat_key, None, cat_data['scenarios'], cat_data['responses']))
+            continue
+        for slot_type, scenarios in by_slot.items():
+            strata.append(Stratum(cat_key, slot_type, scenarios, cat_data['responses']))
+    return names, strata
+
+
+def estimate(analyzer, categories, precision=PRECISION, budget=BUDGET, seed=0, clock=time.perf_counter):
+    """Sample the deck until the intervals are within ±precision or budget seconds have passed."""
+    start = clock()
+    deadline = start + budget
+    rng = random.Random(seed)
+    names, strata = build_strata(analyzer, categories, start + budget / 2, clock)
+    result = SampleEstimate(names, strata)
+    groups = result.by_category()
+
+    while True:
+        if result.rounds:
+            wide = [hs for hs in groups.values() if hs and combine(hs)[1] > precision]
+            if not wide and result.overall()[1] <= precision:
+                result.stopped = 'precision'
+                break
+            if not wide:
+                wide = [hs for hs in groups.values() if hs]
+        else:
+            wide = [hs for hs in groups.values() if hs]
+        if not wide:
+            result.stopped = 'empty'
+            break
+        if clock() > deadline:
+            result.stopped = 'budget'
+            break
+
+        # Each wide category gets an equal share of the round, split by Neyman allocation.
+        plan = []
+        for hs in wide:
+            if not result.rounds:
+                plan.extend((h, PILOT) for h in hs)
+                continue
+            share = ROUND // len(wide)
+            weights = [h.size * h.sd() for h in hs]
+            total = sum(weights) or 1
+            plan.extend((h, max(1, round(share * w / total))) for h, w in zip(hs, weights))
+        for h, k in plan:
+            for _ in range(k):
+                ok = h.draw(analyzer, rng)
+                if ok is not None:
+                    h.n += 1
+                    h.ok += ok
+        result.rounds += 1
+    result.seconds = clock() - start
+    return result
+
+
+def _interval(rate, half):
+    return f"{rate * 100:.1f}% ± {half * 100:.1f}" if rate is not None else "n/a"
+
+
+def report_sample(report, result, precision=PRECISION):
+    report.line("=" * 100)
+    report.line(f"SAMPLED ESTIMATE — stratified by category and slot type, 95% intervals, target ±{precision * 100:.1f}")
+    report.line("=" * 100)
+    for cat_key, hs in result.by_category().items():
+        rate, half, n = combine(hs)
+        report.line(f"\n  Category: {result.names[cat_key]}")
+        report.line(f"  OK: {_interval(rate, half)}% | {n} pairs sampled from {len(hs)} slot types")
+        report.record('sample_category', category=cat_key, name=result.names[cat_key], ok_rate=rate,
+                      ci95=half, pairs=n, strata=len(hs))
+        if report.detail:
+            for h in report.cap(sorted(hs, key=lambda h: -h.size), 5):
+                report.line(f"    {h.slot_type or 'not classified up front'}: {h.ok}/{h.n} OK of {h.size} combos")
+                report.record('sample_stratum', category=cat_key, slot_type=h.slot_type, combos=h.size,
+                              pairs=h.n, ok=h.ok)
+    rate, half, n = result.overall()
+    stopped = {'precision': 'intervals within target', 'budget': 'time budget spent',
+               'empty': 'nothing to sample'}[result.stopped]
+    report.line(f"\n{'=' * 100}")
+    report.line(f"OVERALL: OK {_interval(rate, half)}% | {n} pairs in {result.rounds} rounds, "
+                f"{result.seconds:.2f}s ({stopped})")
+    report.line(f"{'=' * 100}")
+    report.record('sample_overall', ok_rate=rate, ci95=half, pairs=n, rounds=result.rounds,
+                  seconds=result.seconds, stopped=result.stopped)
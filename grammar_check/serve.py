@@ -0,0 +1,337 @@
+"""
+Local HTTP daemon for the deep check's classifiers, so a dev build of the
+web game or a card editor can ask about combos live:
+
+  GET  /combo?scenario=S&response=R         does R fit S (with the sentence)
+  GET  /compatible?scenario=S[&category=K][&limit=N]
+                                            responses of the deck that fit S
+  GET  /hand?scenario=S&hand=R1&hand=R2...  which cards of a hand fit S
+  GET  /classify?scenario=S | ?response=R   slot or response type and the rule that matched
+  GET  /index                               the compatibility index (as data/cards.index.json)
+  GET  /status                              deck, load time, reloads, last reload error
+  POST /reload                              re-read the deck now
+
+Every endpoint also takes its parameters as a JSON object in a POST body
+(handy for hands: {"scenario": ..., "hand": [...]}). Replies are JSON, with
+a Server-Timing header with the time spent answering. Pages served from
+another local port (http://localhost, 127.0.0.1 or [::1]) may read them
+through CORS; other sites get no CORS headers, and their POSTs are refused.
+
+The deck is loaded and classified once into a Snapshot: per category, the
+responses that fit each slot type, in deck order, and every card's type.
+A query is then a few dict lookups. Query text is classified without the
+on-disk cache, through an LRU of the last MEMO_SIZE texts, so whatever
+clients send neither grows the cache nor stays in memory; the deck's own
+classifications are written to the cache after every load. The deck file
+is polled and reloaded in a background thread when it changes; the new
+Snapshot replaces the old one in a single assignment, so queries never
+wait for a reload and never see half of one. A deck that fails to load
+keeps the old Snapshot serving, and so does any error while polling.
+"""
+import http.server
+import json
+import re
+import threading
+import time
+import urllib.parse
+
+from . import binary
+from .batch import check_deck
+from .deck import load_deck
+from .deep import COMPAT, DeepAnalyzer
+from .index import build_index
+from .watch import _stamp
+
+HOST = '127.0.0.1'
+PORT = 8765
+INTERVAL = 1.0
+LIMIT = 50
+MEMO_SIZE = 1 << 14
+MIN_COMPATIBLE = 2          # js/app.js MIN_COMPATIBLE
+_LOCAL_ORIGIN = re.compile(r'https?://(?:localhost|127\.0\.0\.1|\[::1\])(?::\d+)?\Z')
+
+
+def fits(slot_type, resp_type):
+    return resp_type == 'TRUMP' or COMPAT.get(slot_type, COMPAT['OPEN']).get(resp_type, True)
+
+
+class Snapshot:
+    """One loaded version of the deck, with every card classified.
+
+    The deck is classified with analyzer; queries use the queries analyzer
+    (analyzer itself when not given).
+    """
+
+    def __init__(self, analyzer, deck_path, queries=None):
+        self.analyzer = queries or analyzer
+        self.deck_path = deck_path
+        self.stamp = _stamp(deck_path)
+        deck = load_deck(deck_path)
+        if not binary.is_compiled(deck_path):       # a compiled deck was checked when it was compiled
+            check_deck(deck)
+        self.index = build_index(analyzer, deck)
+        self.names = {}
+        self.compatible = {}            # cat_key → {slot type → responses that fit, in deck order}
+        every = {}                      # every response of the deck once, in deck order, with its type
+        for cat_key, cat_data in deck.items():
+            self.names[cat_key] = cat_data['name']
+            typed = [(r, analyzer.classify_response(r)) for r in cat_data['responses']]
+            for r, rt in typed:
+                every.setdefault(r, rt)
+            self.compatible[cat_key] = {st: tuple(r for r, rt in typed if fits(st, rt)) for st in COMPAT}
+        self.compatible[None] = {st: tuple(r for r, rt in every.items() if fits(st, rt)) for st in COMPAT}
+        self.loaded_at = time.time()
+
+    def slot(self, scenario):
+        """(slot type, normalized scenario); slot type None when it has no single blank."""
+        s = self.analyzer.normalize_scenario(scenario)
+        if s is None:
+            return None, scenario
+        slot_type, _ = self.analyzer.classify_scenario_slot(s)
+        return (None if slot_type == 'SKIP' else slot_type), s
+
+    def combo(self, scenario, response):
+        slot_type, s = self.slot(scenario)
+        resp_type = self.analyzer.classify_response(response)
+        if slot_type is None:
+            return {'ok': None, 'slot_type': None, 'response_type': resp_type,
+                    'reason': 'the scenario has no single blank, so it is never dealt'}
+        return {'ok': fits(slot_type, resp_type), 'slot_type': slot_type, 'response_type': resp_type,
+                'sentence': s.replace('_____', response)}
+
+    def compatible_responses(self, scenario, category=None, limit=LIMIT):
+        if category not in self.compatible:
+            raise ValueError(f'no category {category!r}')
+        slot_type, _ = self.slot(scenario)
+        if slot_type is None:
+            return {'slot_type': None, 'count': 0, 'responses': []}
+        responses = self.compatible[category].get(slot_type, self.compatible[category]['OPEN'])
+        return {'slot_type': slot_type, 'count': len(responses), 'responses': list(responses[:max(limit, 0)])}
+
+    def hand(self, scenario, hand):
+        slot_type, _ = self.slot(scenario)
+        cards = []
+        for response in hand:
+            resp_type = self.analyzer.classify_response(response)
+            cards.append({'response': response, 'response_type': resp_type,
+                          'ok': None if slot_type is None else fits(slot_type, resp_type)})
+        compatible = sum(1 for card in cards if card['ok'])
+        return {'slot_type': slot_type, 'cards': cards, 'compatible': compatible,
+                'score': compatible / len(cards) if cards else 0.0,
+                'stuck': slot_type is not None and compatible == 0,
+                'enough': compatible >= min(MIN_COMPATIBLE, len(cards))}
+
+    def classify(self, scenario=None, response=None):
+        if scenario is not None:
+            s = self.analyzer.normalize_scenario(scenario)
+            if s is None:
+                return {'slot_type': None, 'rule': None, 'normalized': None}
+            slot_type, rule, normalized = self.analyzer.classify_scenario_slot_rule(s)
+            return {'slot_type': slot_type, 'rule': rule, 'normalized': normalized}
+        resp_type, rule = self.analyzer.classify_response_rule(response)
+        return {'response_type': resp_type, 'rule': rule}
+
+
+class Daemon:
+    """The current Snapshot of a deck file, reloaded when the file changes."""
+
+    def __init__(self, analyzer, deck_path, interval=INTERVAL):
+        analyzer.memoize(MEMO_SIZE)
+        self.analyzer = analyzer
+        self.queries = DeepAnalyzer()
+        self.queries.memoize(MEMO_SIZE)
+        self.deck_path = deck_path
+        self.interval = interval
+        self.snapshot = Snapshot(analyzer, deck_path, self.queries)
+        self._flush()
+        self.stamp = self.snapshot.stamp
+        self.reloads = 0
+        self.last_error = None
+        self._reloading = threading.Lock()
+        self._stop = threading.Event()
+
+    def reload(self):
+        """Load the deck again; keep the current Snapshot if that fails. Returns whether it loaded."""
+        with self._reloading:
+            try:
+                snapshot = Snapshot(self.analyzer, self.deck_path, self.queries)
+            except Exception as e:                  # whatever is in the file, keep serving the last good deck
+                self.last_error = f'{type(e).__name__}: {e}'
+                return False
+            self._flush()
+            self.snapshot = snapshot
+            self.reloads += 1
+            self.last_error = None
+            return True
+
+    def _flush(self):
+        # Reloads run one at a time (under _reloading), so the cache is never
+        # used from two threads at once.
+        if self.analyzer.cache is not None:
+            self.analyzer.cache.flush()
+
+    def poll(self):
+        while not self._stop.wait(self.interval):
+            try:
+                stamp = _stamp(self.deck_path)
+                if stamp != self.stamp:
+                    # Also after a failed load: try again when the file changes again.
+                    self.stamp = stamp
+                    self.reload()
+            except Exception as e:
+                self.last_error = f'{type(e).__name__}: {e}'
+
+    def status(self):
+        snapshot = self.snapshot
+        return {'deck': self.deck_path, 'categories': snapshot.names, 'loaded_at': snapshot.loaded_at,
+                'reloads': self.reloads, 'last_error': self.last_error}
+
+    def stop(self):
+        self._stop.set()
+
+
+def _param(params, name, required=True):
+    value = params.get(name)
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None:
+        if required:
+            raise ValueError(f'missing parameter {name!r}')
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f'parameter {name!r} must be a string')
+    return value
+
+
+def _limit(params):
+    limit = params.get('limit', LIMIT)
+    if isinstance(limit, list):
+        limit = limit[0] if limit else LIMIT
+    if isinstance(limit, str) and limit.strip().lstrip('-').isdigit():
+        limit = int(limit)
+    if isinstance(limit, bool) or not isinstance(limit, int):
+        raise ValueError("parameter 'limit' must be a whole number")
+    return limit
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'           # keep-alive, so a page's queries reuse one connection
+    disable_nagle_algorithm = True          # headers and body go out as two writes
+    server_version = 'grammar_check'
+
+    def do_OPTIONS(self):
+        self._send(204, None, 0.0)
+
+    def _origin(self):
+        """The request's Origin when it is a local page, else None."""
+        origin = self.headers.get('Origin')
+        return origin if origin is not None and _LOCAL_ORIGIN.match(origin) else None
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        self._answer(url.path, urllib.parse.parse_qs(url.query))
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(url.query)
+        if self.headers.get('Origin') is not None and self._origin() is None:
+            # A form or fetch from another site needs no preflight to get here.
+            self.close_connection = True
+            self._send(403, {'error': 'POST is only accepted from local pages'}, 0.0)
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self.close_connection = True        # the body can't be skipped without its length
+            self._send(400, {'error': 'Content-Length must be a whole number of bytes'}, 0.0)
+            return
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError as e:
+                self._send(400, {'error': f'body is not JSON: {e}'}, 0.0)
+                return
+            if not isinstance(body, dict):
+                self._send(400, {'error': 'body must be a JSON object'}, 0.0)
+                return
+            params.update(body)
+        self._answer(url.path, params, post=True)
+
+    def _answer(self, path, params, post=False):
+        start = time.perf_counter()
+        daemon = self.server.deck_daemon
+        snapshot = daemon.snapshot
+        try:
+            if path == '/combo':
+                reply = snapshot.combo(_param(params, 'scenario'), _param(params, 'response'))
+            elif path == '/compatible':
+                limit = _limit(params)
+                reply = snapshot.compatible_responses(_param(params, 'scenario'),
+                                                      _param(params, 'category', required=False), limit)
+            elif path == '/hand':
+                hand = params.get('hand')
+                if not isinstance(hand, list) or not all(isinstance(card, str) for card in hand):
+                    raise ValueError("missing parameter 'hand' (a list of responses)")
+                reply = snapshot.hand(_param(params, 'scenario'), hand)
+            elif path == '/classify':
+                scenario = _param(params, 'scenario', required=False)
+                response = _param(params, 'response', required=False)
+                if (scenario is None) == (response is None):
+                    raise ValueError("give one of 'scenario' or 'response'")
+                reply = snapshot.classify(scenario, response)
+            elif path == '/index':
+                reply = snapshot.index
+            elif path == '/status':
+                reply = daemon.status()
+            elif path == '/reload' and post:
+                reply = {'reloaded': daemon.reload(), **daemon.status()}
+            else:
+                self._send(404, {'error': f'no endpoint {path}'}, time.perf_counter() - start)
+                return
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': str(e)}, time.perf_counter() - start)
+            return
+        except Exception as e:
+            self._send(500, {'error': f'{type(e).__name__}: {e}'}, time.perf_counter() - start)
+            return
+        self._send(200, reply, time.perf_counter() - start)
+
+    def _send(self, code, reply, seconds):
+        body = b'' if reply is None else json.dumps(reply, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        origin = self._origin()
+        if origin is not None:
+            self.send_header('Access-Control-Allow-Origin', origin)
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Vary', 'Origin')
+        self.send_header('Server-Timing', f'query;dur={seconds * 1000:.3f}')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(daemon, host=HOST, port=PORT, verbose=False, ready=None):
+    """Answer queries until interrupted; ready(server) is called once the socket is listening."""
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.deck_daemon = daemon
+    server.verbose = verbose
+    poller = threading.Thread(target=daemon.poll, daemon=True)
+    poller.start()
+    if ready is not None:
+        ready(server)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
@@ -0,0 +1,229 @@
+"""
+Monte Carlo simulation of the web game's dealing (js/app.js), to see how
+often a player is left holding no response that fits the scenario.
+
+The simulator follows app.js round by round: initializeGame shuffles the
+deck and deals 7 cards to each player, nextRound takes the next scenario
+until there are none left, every player but the judge plays one card, and
+judgePick discards the played cards and refills every hand to 7 with
+drawResponse, which reshuffles the discard pile when the deck runs out.
+With the compatibility index (the default, as when data/cards.index.json is
+served) startPlayTurn's ensureCompatible swaps cards into short hands;
+dealer='blind' deals without it. shuffle_when_stuck has stuck players use
+shuffleHand once.
+
+Whether a card fits only depends on its response type, so a game's state is
+just type counts: of the draw pile, of the discard pile and of every hand.
+Drawing the top card of a shuffled deck is drawing a uniformly random card
+of the remaining ones, so draws are categorical samples from the pile
+counts. Games are run in batches as NumPy arrays, one row per game.
+
+Two simplifications: players play a fitting card whenever they hold one,
+and ensureCompatible gives up a random non-fitting card rather than the
+last one in hand order.
+"""
+import numpy as np
+
+from .deck import load_deck
+from .index import build_index
+
+HAND_SIZE = 7
+MIN_COMPATIBLE = 2          # js/app.js MIN_COMPATIBLE
+PLAYERS = range(3, 13)      # the setup screen allows 3–12 players
+DEALERS = ('index', 'blind')
+BATCH = 50000
+
+
+def pick(counts, rng, active=None):
+    """One random card per column of a [types, games] count array, by type; -1 for an empty column."""
+    totals = counts.sum(0)
+    u = rng.random(counts.shape[1]) * totals
+    picked = (counts.cumsum(0) <= u).sum(0)
+    picked[totals == 0] = -1
+    if active is not None:
+        picked[~active] = -1
+    return picked
+
+
+def take(counts, picked):
+    """Remove the picked cards (-1: none) from counts."""
+    games = np.flatnonzero(picked >= 0)
+    counts[picked[games], games] -= 1
+    return games
+
+
+class Table:
+    """Piles of one batch of games: the draw pile and the discard pile as type counts."""
+
+    def __init__(self, pile, rng):
+        self.pile = pile
+        self.discard = np.zeros_like(pile)
+        self.rng = rng
+
+    def draw(self, active, fits=None):
+        """Draw one card per active game, only among fitting types if fits is given.
+
+        Like drawFromPiles, the discard pile is shuffled back in when no
+        eligible card is left. Returns the type drawn, -1 for games that got
+        none.
+        """
+        eligible = self.pile if fits is None else self.pile * fits
+        dry = active & (eligible.sum(0) == 0) & (self.discard.sum(0) > 0)
+        if dry.any():
+            self.pile[:, dry] += self.discard[:, dry]
+            self.discard[:, dry] = 0
+            eligible = self.pile if fits is None else self.pile * fits
+        picked = pick(eligible, self.rng, active)
+        take(self.pile, picked)
+        return picked
+
+
+def simulate_batch(slot_codes, resp_codes, compat, n_types, players, games, rng, dealer='index',
+                   rounds=None, shuffle_when_stuck=False):
+    """Play a batch of games; return per-game counts of turns, dealt-stuck, stuck and stuck after a shuffle.
+
+    Counts are stored types × games, so every per-type step is a few
+    contiguous vector operations across the whole batch.
+    """
+    kinds = n_types + 1                     # the last type is app.js's "No more responses" filler
+    filler = n_types
+    fits_by_slot = np.array([[(mask >> t) & 1 for t in range(n_types)] + [0] for mask in compat], dtype=bool)
+    pile = np.repeat(np.bincount(resp_codes, minlength=kinds)[:, None], games, axis=1).astype(np.int32)
+    table = Table(pile, rng)
+    hands = np.zeros((players, kinds, games), dtype=np.int32)
+    everyone = np.ones(games, dtype=bool)
+    columns = np.arange(games)
+
+    def deal(hand, n, active):
+        for _ in range(n):
+            card = table.draw(active)
+            card[active & (card < 0)] = filler
+            got = np.flatnonzero(card >= 0)
+            hand[card[got], got] += 1
+
+    def ensure(hand, fits, have):
+        if dealer != 'index':
+            return have
+        for _ in range(MIN_COMPATIBLE):
+            need = (have < MIN_COMPATIBLE) & ((hand * ~fits).sum(0) > 0)
+            if not need.any():
+                break
+            card = table.draw(need, fits)
+            got = card >= 0
+            out = pick(hand * ~fits, rng, got)
+            take(hand, out)
+            g = np.flatnonzero(got)
+            table.discard[out[g], g] += 1
+            hand[card[g], g] += 1
+            have = have + got
+        return have
+
+    for p in range(players):
+        deal(hands[p], HAND_SIZE, everyone)
+
+    scenarios = rng.permuted(np.tile(slot_codes, (games, 1)), axis=1)
+    n_rounds = scenarios.shape[1] if rounds is None else min(rounds, scenarios.shape[1])
+    stats = {key: np.zeros(games, dtype=np.int32) for key in ('turns', 'dealt_stuck', 'stuck', 'still_stuck')}
+    for r in range(n_rounds):
+        judge = r % players
+        fits = np.ascontiguousarray(fits_by_slot[scenarios[:, r]].T)
+        played = np.zeros((kinds, games), dtype=np.int32)
+        for i in range(players - 1):
+            hand = hands[(judge + 1 + i) % players]
+            have = (hand * fits).sum(0)
+            stats['turns'] += 1
+            stats['dealt_stuck'] += have == 0
+            have = ensure(hand, fits, have)
+            stuck = have == 0
+            stats['stuck'] += stuck
+            if shuffle_when_stuck and stuck.any():
+                table.discard[:, stuck] += hand[:, stuck]
+                hand[:, stuck] = 0
+                deal(hand, HAND_SIZE, stuck)
+                redealt = ensure(hand, fits, np.where(stuck, (hand * fits).sum(0), MIN_COMPATIBLE))
+                have = np.where(stuck, redealt, have)
+                stats['still_stuck'] += stuck & (have == 0)
+            card = np.where(have > 0, pick(hand * fits, rng), pick(hand, rng))
+            take(hand, card)
+            played[card, columns] += 1
+        table.discard += played
+        for p in range(players):
+            if p != judge:
+                deal(hands[p], 1, everyone)
+    return stats
+
+
+def category_codes(analyzer, deck):
+    """Yield (cat_key, name, dealt slot codes, response codes, index) per category."""
+    index = build_index(analyzer, deck)
+    for cat_key, cat_data in deck.items():
+        codes = index['categories'][cat_key]
+        slots = np.array([c for c in codes['scenarios'] if c >= 0], dtype=np.intp)
+        yield cat_key, cat_data['name'], slots, np.array(codes['responses'], dtype=np.intp), index
+
+
+def simulate(analyzer, deck_path, games=10000, players=PLAYERS, categories=None, dealer='index', rounds=None,
+             shuffle_when_stuck=False, seed=0):
+    """Yield one result dict per category and player count."""
+    rng = np.random.default_rng(seed)
+    for cat_key, name, slots, responses, index in category_codes(analyzer, load_deck(deck_path)):
+        if categories and cat_key not in categories:
+            continue
+        if not len(slots) or not len(responses):
+            continue
+        for n in players:
+            totals = dict.fromkeys(('turns', 'dealt_stuck', 'stuck', 'still_stuck'), 0)
+            rates = []
+            hit = []
+            left = games
+            while left:
+                batch = min(left, BATCH)
+                left -= batch
+                stats = simulate_batch(slots, responses, index['compat'], len(index['respTypes']), n, batch, rng,
+                                       dealer, rounds, shuffle_when_stuck)
+                for key, v in stats.items():
+                    totals[key] += int(v.sum())
+                rates.append(stats['stuck'] / np.maximum(stats['turns'], 1))
+                hit.append(stats['stuck'] > 0)
+            rates = np.concatenate(rates)
+            turns = max(totals['turns'], 1)
+            yield {
+                'category': cat_key, 'name': name, 'players': n, 'games': games, 'responses': len(responses),
+                'rounds': totals['turns'] // (games * (n - 1)),
+                'turns': totals['turns'],
+                'dealt_stuck_rate': totals['dealt_stuck'] / turns,
+                'stuck_rate': totals['stuck'] / turns,
+                # Turns of one game aren't independent, so the interval comes from per-game rates.
+                'stuck_ci95': float(1.96 * rates.std(ddof=1) / np.sqrt(games)) if games > 1 else None,
+                'games_with_stuck': float(np.concatenate(hit).mean()),
+                'still_stuck_rate': totals['still_stuck'] / turns if shuffle_when_stuck else None,
+            }
+
+
+def report_simulation(report, results, dealer, shuffle_when_stuck):
+    report.line("=" * 100)
+    report.line(f"GAME SIMULATION — dealer: {dealer}"
+                + (", stuck players shuffle their hand" if shuffle_when_stuck else ""))
+    report.line("=" * 100)
+    report.line("  stuck: turns where the hand holds no response that fits the scenario"
+                + (" (dealt: before ensureCompatible)" if dealer == 'index' else ""))
+    current = None
+    for res in results:
+        if res['category'] != current:
+            current = res['category']
+            report.line(f"\n{'─' * 100}")
+            report.line(f"  Category: {res['name']} ({res['games']} games, {res['rounds']} rounds each)")
+            report.line(f"    {'players':>7}  {'stuck':>16}  {'games hit':>9}"
+                        + (f"  {'dealt':>7}" if dealer == 'index' else "")
+                        + (f"  {'after shuffle':>13}" if shuffle_when_stuck else ""))
+        ci = f" ± {res['stuck_ci95'] * 100:.2f}" if res['stuck_ci95'] is not None else ""
+        line = f"    {res['players']:>7}  {res['stuck_rate'] * 100:>8.2f}{ci:<8}%  {res['games_with_stuck'] * 100:>8.1f}%"
+        if dealer == 'index':
+            line += f"  {res['dealt_stuck_rate'] * 100:>6.2f}%"
+        if shuffle_when_stuck:
+            line += f"  {res['still_stuck_rate'] * 100:>12.2f}%"
+        # Past this app.js deals "No more responses available!" fillers, which never fit.
+        if res['responses'] < HAND_SIZE * res['players']:
+            line += f"  (only {res['responses']} responses for {res['players']} hands)"
+        report.line(line)
+        report.record('simulation', dealer=dealer, **res)
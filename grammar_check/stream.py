@@ -0,0 +1,125 @@
+"""
+Streaming reader for cards.json-shaped deck files.
+
+json.load keeps the whole deck in memory as one dict. iter_categories reads the
+file in chunks instead and yields one category at a time, so peak memory is
+bounded by the largest category rather than the whole file:
+
+    for key, cat in iter_categories('data/cards.json'):
+        cat['name'], cat['description']      # plain values
+        for s in cat['scenarios']: ...       # iterators over the card arrays
+        for r in cat['responses']: ...
+
+Arrays are decoded item by item with json.JSONDecoder.raw_decode, so even a
+huge category never needs its raw text and its decoded cards in memory at once.
+"""
+import json
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = ' \t\n\r'
+
+
+class _StreamReader:
+    """Minimal pull parser over a text file: enough to walk one level of objects and arrays."""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or '' at end of file."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch):
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f'expected {ch!r} in deck file, got {got or "end of file"!r}')
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more of the file as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number (or literal) cut off by the chunk boundary decodes "fine"
+            # but short; only trust a value that ends before the buffer does.
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self):
+        """Yield the keys of the object at the current position, leaving the reader on each value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError('object keys in deck file must be strings')
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+    def items(self):
+        """Yield the elements of the array at the current position one at a time."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+
+def iter_categories(path, chunk_size=CHUNK_SIZE):
+    """Yield (key, category) for each category in a deck file, one at a time.
+
+    category is a dict with the plain fields of the category ('name',
+    'description', ...) and iterators for its 'scenarios' and 'responses'.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _StreamReader(f, chunk_size)
+        for key in reader.members():
+            category = {}
+            for field in reader.members():
+                if reader.peek() == '[':
+                    category[field] = list(reader.items())
+                else:
+                    category[field] = reader.value()
+            for field in ('scenarios', 'responses'):
+                category[field] = iter(category.get(field, ()))
+            yield key, category
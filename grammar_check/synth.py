@@ -0,0 +1,140 @@
+"""
+Synthetic decks shaped like data/cards.json, for benchmarks.
+
+Scenarios are built from the same slot templates the real decks use (one per
+deep-check slot type, weighted roughly like the real decks, plus multi-blank
+scenarios that normalize to one blank), and responses from the same prefixes
+the response rules key on (gerunds, determiners, adverbs, prepositions, verb
+fragments, short labels), with the usual "TRUMP:" wildcards mixed in. About a
+quarter of the cards are scenarios, as in the real decks.
+
+Every card gets a distinct filler word, so caches and dedup see a deck of
+unique cards. The same (cards, categories, seed) always gives the same deck.
+"""
+import json
+import random
+
+# (weight, template); {noun}, {adj}, {gerund} and {name} are filled from the word pools.
+SCENARIO_TEMPLATES = [
+    (50, 'My {adj} {noun}: _____.'),
+    (18, 'My {noun} is secretly addicted to: _____.'),
+    (10, "Nobody talks about the {noun} of: _____."),
+    (6, 'The {adj} {noun} is: _____.'),
+    (5, "No cap, my {noun} says I'm literally: _____."),
+    (3, 'Caught my {noun} {gerund} over: _____.'),
+    (3, "_____ is why my {noun} left."),
+    (2, "My {noun} is giving _____ energy."),
+    (2, 'The {noun} is real when I: _____.'),
+    (2, 'What is stopping my {noun} from: _____.'),
+    (1, '{name} and my {noun} saw me do: _____.'),
+    (1, 'My {noun} respects people who: _____.'),
+    (1, 'My {noun} would end if someone: _____.'),
+    (1, 'Why does my {noun} always need _____?'),
+    # Multi-blank: normalized to a single blank like loadCategory does.
+    (3, 'I secretly cheat at _____ using my {noun}: _____.'),
+    (2, "Meanwhile my {noun} is _____ and I'm: _____."),
+]
+
+# (weight, prefix); responses are prefix + rest.
+RESPONSE_PREFIXES = [
+    (38, 'gerund'),
+    (36, 'label'),
+    (17, 'determiner'),
+    (6, 'adverb'),
+    (1, 'prep'),
+    (1, 'fragment'),
+    (1, 'long'),
+]
+
+NOUNS = ['tea', 'situationship', 'landlord', 'group chat', 'career', 'therapist', 'aunty', 'boss',
+         'playlist', 'ex', 'roommate', 'startup', 'gym', 'wedding', 'inbox', 'pension']
+ADJECTIVES = ['guilty', 'toxic', 'secret', 'unhinged', 'corporate', 'emotional', 'filmy', 'cursed']
+GERUNDS = ['getting', 'texting', 'pretending', 'avoiding', 'napping', 'oversharing', 'planning',
+           'collecting', 'checking', 'complaining', 'watching', 'romanticizing']
+DETERMINERS = ['a', 'an', 'the', 'my', 'your', 'our', 'that', 'this', 'some', 'no']
+ADVERBS = ['chronically', 'absolutely', 'literally', 'emotionally', 'secretly', 'basically', 'still']
+PREPOSITIONS = ['at', 'in', 'on', 'just', 'only']
+FRAGMENTS = ["can't", "won't", "didn't", 'i']
+NAMES = ['Twitter', 'My mom', 'The whole office', 'Sharma ji', 'HR']
+TRUMPS = ['TRUMP: my own written response', 'TRUMP: swap any card', 'TRUMP: pick any response']
+TRUMP_RATE = 0.01
+
+CATEGORY_KEYS = ['basic', 'edgier', 'office', 'superEdgy', 'millennial30s', 'millennial40s',
+                 'genz', 'bollywood', 'dark']
+SCENARIO_SHARE = 0.25
+
+
+def _word(i):
+    """A distinct lowercase filler word for card number i."""
+    letters = 'bcdfghjklmnprstvz'
+    word = ''
+    while True:
+        i, d = divmod(i, len(letters))
+        word += letters[d] + 'aeiou'[d % 5]
+        if not i:
+            return word
+
+
+def _weighted(rng, table):
+    weights = [w for w, _ in table]
+    items = [x for _, x in table]
+    return lambda: rng.choices(items, weights)[0]
+
+
+def make_scenario(rng, template, i):
+    return template.format(noun=f'{rng.choice(NOUNS)} {_word(i)}', adj=rng.choice(ADJECTIVES),
+                           gerund=rng.choice(GERUNDS), name=rng.choice(NAMES))
+
+
+def make_response(rng, kind, i):
+    w = _word(i)
+    noun = rng.choice(NOUNS)
+    if kind == 'gerund':
+        return f'{rng.choice(GERUNDS)} {w} with my {noun}'
+    if kind == 'determiner':
+        return f'{rng.choice(DETERMINERS)} {rng.choice(ADJECTIVES)} {w} {noun}'
+    if kind == 'adverb':
+        return f'{rng.choice(ADVERBS)} {w}'
+    if kind == 'prep':
+        return f'{rng.choice(PREPOSITIONS)} the {w} {noun}'
+    if kind == 'fragment':
+        return f'{rng.choice(FRAGMENTS)} even {w} anymore'
+    if kind == 'long':
+        return f'{w.capitalize()} and the {noun} and the whole {rng.choice(NOUNS)} situation'
+    return f'{w.capitalize()} {noun}'
+
+
+def generate_deck(cards, categories=len(CATEGORY_KEYS), seed=0):
+    """Return a deck dict with about `cards` cards split evenly over `categories` categories."""
+    rng = random.Random(seed)
+    next_template = _weighted(rng, SCENARIO_TEMPLATES)
+    next_prefix = _weighted(rng, RESPONSE_PREFIXES)
+    deck = {}
+    i = 0
+    per_category = max(cards // categories, 2)
+    for c in range(categories):
+        key = CATEGORY_KEYS[c] if c < len(CATEGORY_KEYS) else f'synthetic{c}'
+        n_scenarios = max(int(per_category * SCENARIO_SHARE), 1)
+        scenarios = []
+        for _ in range(n_scenarios):
+            scenarios.append(make_scenario(rng, next_template(), i))
+            i += 1
+        responses = []
+        for _ in range(per_category - n_scenarios):
+            if rng.random() < TRUMP_RATE:
+                responses.append(rng.choice(TRUMPS))
+            else:
+                responses.append(make_response(rng, next_prefix(), i))
+            i += 1
+        deck[key] = {
+            'name': f'Synthetic {key}',
+            'description': f'{per_category} generated cards',
+            'scenarios': scenarios,
+            'responses': responses,
+        }
+    return deck
+
+
+def write_deck(path, cards, categories=len(CATEGORY_KEYS), seed=0):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(generate_deck(cards, categories, seed), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,241 @@
+"""
+Watch mode: re-check a deck every time it is saved, printing the OK/BAD
+delta of the categories that changed.
+
+The last version of the deck stays in memory: its text, where each
+category sits in it, the parsed categories and their totals. The file is
+polled with os.stat (no extra dependency, and it also catches editors that
+save by writing a new file and renaming it over the old one). On a change
+the new text is compared with the old one; categories wholly inside the
+unchanged head and tail of the file are reused as they are, and only the
+stretch in between is parsed again. Categories whose cards differ are then
+diffed with the deck diff (see diff.py), which evaluates just the rows and
+columns of the edited cards against type counts of the rest, built from
+memoized classifications. A save that isn't a valid deck (caught
+half-written, or with a card that isn't a string) is reported and skipped
+until the next one.
+"""
+import json
+import os
+import re
+import time
+
+from .batch import check_deck
+from .diff import DeckDiff, _MARK, _signed
+
+INTERVAL = 0.05
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _skip(text, pos):
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _expect(text, pos, ch):
+    pos = _skip(text, pos)
+    if not text.startswith(ch, pos):
+        raise ValueError(f'expected {ch!r} in deck file at char {pos}')
+    return pos + 1
+
+
+def parse_members(text, pos, stop=None, opened=False):
+    """Parse the deck's categories from pos: just after '{' if opened, else after a category's value.
+
+    Returns ([(key, key_start, value_end, category)], stopped), where
+    stopped is True when parsing stopped before a key starting at stop
+    rather than at the end of the deck.
+    """
+    members = []
+    pos = _skip(text, pos)
+    need_key = opened and not text.startswith('}', pos)
+    while True:
+        if not need_key:
+            if text.startswith('}', pos):
+                if _skip(text, pos + 1) != len(text):
+                    raise ValueError(f'extra data after the deck at char {pos + 1}')
+                return members, False
+            pos = _skip(text, _expect(text, pos, ','))
+        need_key = False
+        if pos == stop:
+            return members, True
+        key, end = _DECODER.raw_decode(text, pos)
+        if not isinstance(key, str):
+            raise ValueError('object keys in deck file must be strings')
+        value, value_end = _DECODER.raw_decode(text, _skip(text, _expect(text, end, ':')))
+        members.append((key, pos, value_end, value))
+        pos = _skip(text, value_end)
+
+
+def _common_prefix(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def reparse(old_text, members, text):
+    """Members of the new text, reusing the old members outside the changed stretch.
+
+    Returns (members, keys of the members that were parsed again).
+    """
+    head = _common_prefix(old_text, text, min(len(old_text), len(text)))
+    tail = _common_suffix(old_text, text, min(len(old_text), len(text)) - head)
+    n_head = 0
+    while n_head < len(members) and members[n_head][2] < head:
+        n_head += 1
+    n_tail = 0
+    while n_tail < len(members) - n_head and members[-1 - n_tail][1] >= len(old_text) - tail:
+        n_tail += 1
+    shift = len(text) - len(old_text)
+    kept_tail = [(key, start + shift, end + shift, value)
+                 for key, start, end, value in members[len(members) - n_tail:]]
+    stop = kept_tail[0][1] if kept_tail else None
+    if n_head:
+        middle, stopped = parse_members(text, members[n_head - 1][2], stop)
+    else:
+        middle, stopped = parse_members(text, _expect(text, 0, '{'), stop, opened=True)
+    if kept_tail and not stopped:
+        # The edit changed how the rest of the file parses (say, an unclosed quote).
+        middle, _ = parse_members(text, _expect(text, 0, '{'), opened=True)
+        return middle, {key for key, *_ in middle}
+    return members[:n_head] + middle + kept_tail, {key for key, *_ in middle}
+
+
+class DeckWatcher:
+    """The last good version of a deck file and its per-category totals."""
+
+    def __init__(self, analyzer, path):
+        analyzer.memoize()
+        self.differ = DeckDiff(analyzer)
+        self.path = path
+        self.stamp = _stamp(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            self.text = f.read()
+        self.members, _ = parse_members(self.text, _expect(self.text, 0, '{'), opened=True)
+        self.deck = {key: value for key, _, _, value in self.members}
+        check_deck(self.deck)
+        self.totals = {}
+        for cat_key, cat_data in self.deck.items():
+            self.totals[cat_key] = self._add({'total': 0, 'bad': 0}, self.differ.category(None, cat_data))
+
+    @staticmethod
+    def _add(totals, cards):
+        return {'total': totals['total'] + sum(c['total'] for c in cards),
+                'bad': totals['bad'] + sum(c['bad'] for c in cards)}
+
+    def changed(self):
+        """Whether the file looks different from the version in memory."""
+        stamp = _stamp(self.path)
+        if stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        return stamp is not None
+
+    def update(self):
+        """Re-read the file; return [(cat_key, name, cards, before, after)] per changed category.
+
+        Raises ValueError (or KeyError for a category without a name) when
+        the file isn't a valid deck, keeping the version in memory.
+        """
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        members, parsed = reparse(self.text, self.members, text)
+        deck = {key: value for key, _, _, value in members}
+        check_deck({key: deck[key] for key in parsed})     # the others were checked when they were parsed
+        totals = dict(self.totals)
+        changes = []
+        for cat_key in [k for k in deck if k in parsed] + [k for k in self.deck if k not in deck]:
+            old = self.deck.get(cat_key)
+            new = deck.get(cat_key)
+            if old is not None and new is not None and (old['scenarios'] == new['scenarios']
+                                                        and old['responses'] == new['responses']):
+                continue
+            cards = self.differ.category(old, new)
+            before = totals.get(cat_key, {'total': 0, 'bad': 0})
+            after = self._add(before, cards)
+            if new is None:
+                del totals[cat_key]
+            else:
+                totals[cat_key] = after
+            changes.append((cat_key, (new or old)['name'], cards, before, after))
+        self.text = text
+        self.members = members
+        self.deck = deck
+        self.totals = totals
+        return changes
+
+
+def _ok_rate(totals):
+    return (totals['total'] - totals['bad']) / totals['total'] * 100 if totals['total'] else 0.0
+
+
+def report_changes(report, changes, ms):
+    report.line(f"\n[{time.strftime('%H:%M:%S')}] {len(changes)} categor{'y' if len(changes) == 1 else 'ies'} "
+                f"re-checked in {ms:.0f} ms")
+    for cat_key, name, cards, before, after in changes:
+        delta_total = after['total'] - before['total']
+        delta_bad = after['bad'] - before['bad']
+        counts = ' '.join(f"{_MARK[change]}{sum(c['change'] == change for c in cards)}" for change in _MARK)
+        report.line(f"  {name}: {_ok_rate(after):.1f}% OK ({_ok_rate(after) - _ok_rate(before):+.1f}) | "
+                    f"BAD: {after['bad']} ({_signed(delta_bad)}) | Combos: {after['total']} "
+                    f"({_signed(delta_total)}) | cards {counts}")
+        report.record('watch_category', category=cat_key, name=name, total=after['total'],
+                      ok=after['total'] - after['bad'], bad=after['bad'], delta_total=delta_total,
+                      delta_ok=delta_total - delta_bad, delta_bad=delta_bad, ms=ms)
+        if not report.detail:
+            continue
+        for c in report.cap(sorted((c for c in cards if c['bad']), key=lambda c: -abs(c['bad'])), 3):
+            entry = c['new'] or c['old']
+            report.line(f"    {_MARK[c['change']]} {c['cards'][:-1]} \"{entry['text'][:70]}\" [{entry['type']}] "
+                        f"BAD {_signed(c['bad'])}")
+            report.record('diff_card', category=cat_key, **c)
+
+
+def run_watch(watcher, report, interval=INTERVAL, clock=time.perf_counter, sleep=time.sleep):
+    """Poll the deck until interrupted, reporting every save."""
+    grand = {'total': sum(t['total'] for t in watcher.totals.values()),
+             'bad': sum(t['bad'] for t in watcher.totals.values())}
+    report.line(f"\nWatching {watcher.path} — {len(watcher.totals)} categories, {_ok_rate(grand):.1f}% OK. "
+                f"Ctrl-C to stop.")
+    try:
+        while True:
+            sleep(interval)
+            if not watcher.changed():
+                continue
+            start = clock()
+            try:
+                changes = watcher.update()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # Also raised by a file caught half-written; the next save brings it back.
+                report.line(f"\n[{time.strftime('%H:%M:%S')}] {watcher.path} not readable as a deck, "
+                            f"keeping the last good version: {e}")
+                report.record('watch_error', path=watcher.path, error=str(e))
+                continue
+            if changes:
+                report_changes(report, changes, (clock() - start) * 1000)
+    except KeyboardInterrupt:
+        pass
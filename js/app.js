@@ -9,7 +9,11 @@ let state = {
   played: [],
   category: 'basic',
   playerCount: 4,
-  currentPlayerTurns: null // track which player is currently playing
+  currentPlayerTurns: null, // track which player is currently playing
+  manifest: null,    // data/categories/manifest.json, written by `python -m grammar_check bundle`
+  compatIndex: null, // data/cards.index.json, written by `python -m grammar_check index`
+  cardIndex: null,   // per-category lookups built from compatIndex by loadCategory
+  piles: null        // undealt responses split by response type (only with cardIndex)
 };
 
 const $ = id => document.getElementById(id);
@@ -76,6 +80,21 @@ function playSound(type = 'select'){
 }
 
 async function loadCards(){
+  // With per-category bundles only the manifest is fetched up front; each
+  // category is fetched when it is picked (see loadCategory). Whether they
+  // match cards.json is checked when they are built (`bundle --check` in CI,
+  // and the Pages workflow rebuilds them), not here.
+  try{
+    const res = await fetch('data/categories/manifest.json');
+    if(!res.ok) throw new Error('HTTP '+res.status+' fetching categories/manifest.json');
+    state.manifest = await res.json();
+    state.categoryData = {};
+    debugLog('Loaded bundle manifest — categories: ' + Object.keys(state.manifest.categories).join(','));
+    return;
+  }catch(err){
+    state.manifest = null;
+    debugLog('No category bundles, loading cards.json: ' + err.message);
+  }
   try{
     const res = await fetch('data/cards.json');
     if(!res.ok) throw new Error('HTTP '+res.status+' fetching cards.json');
@@ -86,10 +105,23 @@ async function loadCards(){
     debugLog('loadCards error: ' + err.message);
     throw err;
   }
+  // The compatibility index is optional: without it cards are dealt blind.
+  try{
+    const res = await fetch('data/cards.index.json');
+    if(!res.ok) throw new Error('HTTP '+res.status+' fetching cards.index.json');
+    state.compatIndex = await res.json();
+  }catch(err){
+    state.compatIndex = null;
+    debugLog('No compatibility index: ' + err.message);
+  }
 }
 
-function loadCategory(cat){
+async function loadCategory(cat){
   state.category = cat;
+  if(state.manifest){
+    await loadBundle(cat);
+    return;
+  }
   const catData = state.categoryData[cat];
   // Prefer scenarios that contain exactly one blank (single-blank scenarios)
   function countBlanksExact(s){
@@ -112,6 +144,66 @@ function loadCategory(cat){
   state.scenarios = transformed.filter(s => countBlanksExact(s) === 1);
   debugLog(`Loaded ${state.scenarios.length} single-blank scenarios for ${cat} (transformed)`);
   state.responses = catData.responses.slice();
+  state.cardIndex = await buildCardIndex(cat, transformed);
+}
+
+// Bundles are already normalized and carry their own compatibility codes.
+async function loadBundle(cat){
+  if(!state.categoryData[cat]){
+    const entry = state.manifest.categories[cat];
+    if(!entry) throw new Error('No bundle for category ' + cat);
+    const res = await fetch('data/categories/' + entry.file);
+    if(!res.ok) throw new Error('HTTP '+res.status+' fetching '+entry.file);
+    state.categoryData[cat] = await res.json();
+  }
+  const bundle = state.categoryData[cat];
+  state.scenarios = bundle.scenarios.slice();
+  state.responses = bundle.responses.slice();
+  const slotMask = new Map();
+  bundle.scenarios.forEach((s, i) => { if(bundle.slotMasks[i] !== null) slotMask.set(s, bundle.slotMasks[i]); });
+  const respType = new Map();
+  bundle.responses.forEach((r, i) => respType.set(r, bundle.responseTypes[i]));
+  state.cardIndex = {slotMask, respType, types: bundle.typeCount};
+  debugLog(`Loaded ${state.scenarios.length} scenarios for ${cat} from its bundle`);
+}
+
+// Hex sha256 of a string, or null where the browser has no WebCrypto
+// (pages not served over https or from localhost).
+async function sha256Hex(text){
+  if(!(window.crypto && window.crypto.subtle)) return null;
+  const buf = await window.crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+  return Array.from(new Uint8Array(buf), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// Lookups from the compatibility index: the bitmask of response types each
+// scenario accepts, and the type of each response. Returns null when there is
+// no index or it doesn't match the loaded deck: the index stores a digest of
+// each category's cards (see grammar_check/index.py), so edited cards are
+// caught even when the counts stay the same. Without WebCrypto (plain http
+// other than localhost) only the counts can be compared.
+async function buildCardIndex(cat, transformed){
+  const index = state.compatIndex;
+  const catData = state.categoryData[cat];
+  const codes = index && index.categories && index.categories[cat];
+  let current = false;
+  if(codes){
+    const digest = await sha256Hex(JSON.stringify([catData.scenarios, catData.responses]));
+    if(digest !== null){
+      current = digest === codes.digest;
+    }else{
+      debugLog(`No WebCrypto here, checking the compatibility index for ${cat} by card counts only`);
+      current = codes.scenarios.length === catData.scenarios.length && codes.responses.length === catData.responses.length;
+    }
+  }
+  if(!current){
+    if(index) debugLog(`Compatibility index is stale for ${cat}, dealing blind`);
+    return null;
+  }
+  const slotMask = new Map();
+  transformed.forEach((s, i) => { if(codes.scenarios[i] >= 0) slotMask.set(s, index.compat[codes.scenarios[i]]); });
+  const respType = new Map();
+  catData.responses.forEach((r, i) => respType.set(r, codes.responses[i]));
+  return {slotMask, respType, types: index.respTypes.length};
 }
 
 function shuffle(arr){
@@ -185,9 +277,14 @@ function showPlayerSetup(){
   $('playerSetup').classList.remove('hidden');
 }
 
-function initializeGame(names){
+async function initializeGame(names){
   const cat = $('categorySelect').value;
-  loadCategory(cat);
+  try{
+    await loadCategory(cat);
+  }catch(err){
+    debugLog('loadCategory error: ' + err.message);
+    return;
+  }
   
   if(names && names.length > 0){
     state.players = names.map((name, i) => ({
@@ -209,6 +306,7 @@ function initializeGame(names){
   
   shuffle(state.scenarios);
   shuffle(state.responses);
+  state.piles = state.cardIndex ? buildPiles(state.responses) : null;
   // deal 7 each
   for(let p of state.players){
     for(let i=0;i<7;i++) p.hand.push(drawResponse());
@@ -220,7 +318,66 @@ function initializeGame(names){
   nextRound();
 }
 
+// Split responses into one pile per response type (plus a last pile for cards
+// the index doesn't know), keeping their shuffled order.
+function buildPiles(cards){
+  const piles = Array.from({length: state.cardIndex.types + 1}, () => []);
+  cards.forEach(card => piles[pileOf(card)].push(card));
+  return piles;
+}
+
+function pileOf(card){
+  const t = state.cardIndex.respType.get(card);
+  return t === undefined ? state.cardIndex.types : t;
+}
+
+// Draw the top card of a pile picked in proportion to its size, which is the
+// same as drawing from one shuffled deck. With a mask only the response types
+// in it are eligible, and null is returned when none of them is left.
+function drawFromPiles(mask){
+  let total = 0;
+  state.piles.forEach((pile, t) => { if(mask >> t & 1) total += pile.length; });
+  if(total === 0 && state.discard.length){
+    const recycled = state.discard; state.discard = []; shuffle(recycled);
+    recycled.forEach(card => state.piles[pileOf(card)].push(card));
+    state.piles.forEach((pile, t) => { if(mask >> t & 1) total += pile.length; });
+  }
+  if(total === 0) return null;
+  let n = Math.floor(Math.random() * total);
+  for(let t = 0; t < state.piles.length; t++){
+    if(!(mask >> t & 1)) continue;
+    if(n < state.piles[t].length) return state.piles[t].pop();
+    n -= state.piles[t].length;
+  }
+  return null;
+}
+
+// Every hand should hold at least this many cards that fit the scenario.
+const MIN_COMPATIBLE = 2;
+
+// Swap cards that don't fit the current scenario for ones that do until the
+// hand holds MIN_COMPATIBLE of them (or no compatible card is left).
+function ensureCompatible(player){
+  if(!state.piles) return;
+  const mask = state.cardIndex.slotMask.get(state.currentScenario);
+  if(mask === undefined) return;
+  const fits = card => { const t = state.cardIndex.respType.get(card); return t !== undefined && (mask >> t & 1) === 1; };
+  let have = player.hand.filter(fits).length;
+  for(let i = player.hand.length - 1; i >= 0 && have < MIN_COMPATIBLE; i--){
+    if(fits(player.hand[i])) continue;
+    const card = drawFromPiles(mask);
+    if(card === null) break;
+    state.discard.push(player.hand[i]);
+    player.hand[i] = card;
+    have++;
+  }
+}
+
 function drawResponse(){
+  if(state.piles){
+    const card = drawFromPiles(-1);
+    return card === null ? 'No more responses available!' : card;
+  }
   if(state.responses.length===0){
     state.responses = state.discard.slice(); state.discard = []; shuffle(state.responses);
   }
@@ -273,6 +430,7 @@ function startPlayTurn(){
   // determine which player to show (skip judge)
   let idx = (state.judgeIndex + 1 + state.playIndex) % state.players.length;
   const player = state.players[idx];
+  ensureCompatible(player);
   const blanksNeeded = countBlanks(state.currentScenario);
   $('turnLabel').textContent = `${player.name}'s turn to play (select ${blanksNeeded} card${blanksNeeded>1?'s':''})`;
   const hand = $('hand'); 
@@ -420,6 +578,8 @@ function resetGame(){
   debugLog('Resetting game to setup');
   state.scenarios = [];
   state.responses = [];
+  state.cardIndex = null;
+  state.piles = null;
   state.players = [];
   state.discard = [];
   state.currentScenario = null;
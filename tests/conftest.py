@@ -0,0 +1,39 @@
+"""
+The deck the tests run against (data/cards.json), and helpers to compare
+the deep check's results however they were computed.
+"""
+import io
+import json
+import os
+
+import pytest
+
+from grammar_check.deck import load_deck
+from grammar_check.deep import DeepAnalyzer, run_deep
+from grammar_check.output import Report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DECK = os.path.join(ROOT, 'data', 'cards.json')
+
+
+def results(analyzer, deck):
+    """{cat_key: result} with tuples as lists, so results compare the same however they were made."""
+    return {cat_key: json.loads(json.dumps(result[:5]))
+            for cat_key, _, result in analyzer.category_results(deck.items())}
+
+
+def report_text(analyzer, deck_path):
+    out = io.StringIO()
+    run_deep(analyzer, Report(out=out), deck_path)
+    return out.getvalue()
+
+
+@pytest.fixture(scope='session')
+def deck():
+    return load_deck(DECK)
+
+
+@pytest.fixture(scope='session')
+def exhaustive(deck):
+    """The exhaustive run's results, which every other engine must give."""
+    return results(DeepAnalyzer(), deck)
@@ -0,0 +1,20 @@
+"""
+The aggregate engine, which counts combos from type histograms, against the
+exhaustive run over every scenario × response of data/cards.json.
+"""
+from conftest import DECK, report_text, results
+from grammar_check.deep import DeepAnalyzer
+
+
+def test_exhaustive_totals(exhaustive, deck):
+    assert list(exhaustive) == list(deck)
+    for total, bad, *_ in exhaustive.values():
+        assert 0 <= bad <= total
+
+
+def test_aggregate_matches_exhaustive(deck, exhaustive):
+    assert results(DeepAnalyzer(mode='aggregate'), deck) == exhaustive
+
+
+def test_aggregate_report_matches():
+    assert report_text(DeepAnalyzer(mode='aggregate'), DECK) == report_text(DeepAnalyzer(), DECK)
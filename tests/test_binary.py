@@ -0,0 +1,31 @@
+"""
+The compiled, memory-mapped deck format: every engine run on a compiled
+deck gives the results and report of the exhaustive run on the JSON deck.
+"""
+import pytest
+
+from conftest import DECK, report_text, results
+from grammar_check.binary import compile_deck
+from grammar_check.deck import load_deck
+from grammar_check.deep import DeepAnalyzer
+
+
+@pytest.fixture(scope='module')
+def compiled(tmp_path_factory, deck):
+    path = str(tmp_path_factory.mktemp('compiled') / 'cards.bin')
+    compile_deck(DeepAnalyzer(), deck.items(), path)
+    return path
+
+
+@pytest.mark.parametrize('mode', ['exhaustive', 'aggregate', 'numpy'])
+def test_compiled_deck_matches_exhaustive(mode, compiled, exhaustive):
+    if mode == 'numpy':
+        pytest.importorskip('numpy')
+    assert results(DeepAnalyzer(mode=mode), load_deck(compiled)) == exhaustive
+
+
+@pytest.mark.parametrize('mode', ['aggregate', 'numpy'])
+def test_compiled_report_matches(mode, compiled):
+    if mode == 'numpy':
+        pytest.importorskip('numpy')
+    assert report_text(DeepAnalyzer(mode=mode), compiled) == report_text(DeepAnalyzer(), DECK)
@@ -0,0 +1,19 @@
+"""
+data/categories (the per-category bundles and their manifest) against a
+fresh build, byte for byte.
+"""
+import os
+
+from conftest import DECK, ROOT
+from grammar_check.bundle import MANIFEST, bundles_are_current, write_bundles
+from grammar_check.deep import DeepAnalyzer
+
+
+def test_bundles_are_current(tmp_path):
+    manifest = write_bundles(DeepAnalyzer(), DECK, str(tmp_path))
+    committed = os.path.join(ROOT, 'data', 'categories')
+    names = [MANIFEST] + [f"{cat_key}.json{ext}" for cat_key in manifest['categories'] for ext in ('', '.gz')]
+    for name in names:
+        with open(tmp_path / name, 'rb') as fresh, open(os.path.join(committed, name), 'rb') as f:
+            assert fresh.read() == f.read(), name
+    assert bundles_are_current(DECK)
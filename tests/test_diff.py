@@ -0,0 +1,52 @@
+"""
+The deck diff: line_up accounts for every card, and the per-card deltas add
+up to the change in the exhaustive totals.
+"""
+import collections
+import copy
+
+from conftest import results
+from grammar_check.deep import DeepAnalyzer
+from grammar_check.diff import DeckDiff, line_up
+
+
+def edited(deck):
+    """A copy of deck with cards removed, added, edited, moved and repeated."""
+    new = copy.deepcopy(deck)
+    genz = new['genz']
+    genz['scenarios'].pop(0)
+    genz['scenarios'].append('Nobody warned me about _____.')
+    genz['responses'][3] = 'Chronically online'
+    genz['responses'].append(genz['responses'][0])
+    genz['responses'].append('at the gym')
+    basic = new['basic']
+    basic['responses'].reverse()
+    basic['scenarios'][2] = basic['scenarios'][2].replace('_____', '_____ _____')
+    del new['dark']
+    new['extra'] = {'name': 'Extra', 'description': '', 'scenarios': ['My secret: _____.'],
+                    'responses': ['crying in the shower', 'a dead meme']}
+    return new
+
+
+def test_line_up_accounts_for_every_card(deck):
+    new = edited(deck)
+    for cat_key in deck.keys() & new.keys():
+        for kind in ('scenarios', 'responses'):
+            old_cards, new_cards = deck[cat_key][kind], new[cat_key][kind]
+            removed, added, changed = line_up(old_cards, new_cards)
+            kept_old = collections.Counter(old_cards) - collections.Counter(removed + [a for a, _ in changed])
+            kept_new = collections.Counter(new_cards) - collections.Counter(added + [b for _, b in changed])
+            assert kept_old == kept_new
+            assert sum(kept_old.values()) + len(removed) + len(changed) == len(old_cards)
+
+
+def test_diff_deltas_add_up(deck, exhaustive):
+    new = edited(deck)
+    after = results(DeepAnalyzer(), new)
+    differ = DeckDiff(DeepAnalyzer())
+    for cat_key in list(new) + [k for k in deck if k not in new]:
+        cards = differ.category(deck.get(cat_key), new.get(cat_key))
+        old_total, old_bad = exhaustive[cat_key][:2] if cat_key in exhaustive else (0, 0)
+        new_total, new_bad = after[cat_key][:2] if cat_key in after else (0, 0)
+        assert sum(c['total'] for c in cards) == new_total - old_total, cat_key
+        assert sum(c['bad'] for c in cards) == new_bad - old_bad, cat_key
@@ -0,0 +1,31 @@
+"""
+data/cards.index.json against a fresh build, and the stale-category check
+behind index --check.
+"""
+import copy
+import json
+
+from conftest import DECK
+from grammar_check.deep import DeepAnalyzer
+from grammar_check.index import build_index, index_path_for, stale_categories
+
+
+def test_index_is_current(deck):
+    with open(index_path_for(DECK), encoding='utf-8') as f:
+        assert json.load(f) == build_index(DeepAnalyzer(), deck)
+    assert stale_categories(DECK) == []
+
+
+def test_index_notices_edits(tmp_path, deck):
+    new = copy.deepcopy(deck)
+    new['genz']['responses'][3] = 'Chronically online'
+    new['basic']['responses'].reverse()
+    del new['dark']
+    new['extra'] = {'name': 'Extra', 'description': '', 'scenarios': ['My secret: _____.'],
+                    'responses': ['crying in the shower', 'a dead meme']}
+    path = str(tmp_path / 'cards.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(new, f)
+    with open(index_path_for(path), 'w', encoding='utf-8') as f:
+        json.dump(build_index(DeepAnalyzer(), deck), f)
+    assert set(stale_categories(path)) == {'genz', 'basic', 'extra'}
@@ -0,0 +1,19 @@
+"""
+--jobs: categories split into shards across a process pool, for every
+engine, against the exhaustive run in one process.
+"""
+import pytest
+
+from conftest import DECK, report_text, results
+from grammar_check.deep import DeepAnalyzer
+
+
+@pytest.mark.parametrize('mode', ['exhaustive', 'aggregate', 'numpy'])
+def test_jobs_match_exhaustive(mode, deck, exhaustive):
+    if mode == 'numpy':
+        pytest.importorskip('numpy')
+    assert results(DeepAnalyzer(mode=mode, jobs=2, shard_size=4), deck) == exhaustive
+
+
+def test_jobs_report_matches():
+    assert report_text(DeepAnalyzer(jobs=2, shard_size=4), DECK) == report_text(DeepAnalyzer(), DECK)
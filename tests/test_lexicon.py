@@ -0,0 +1,79 @@
+"""
+The lexicon's word tags and the phrase rules built on them, on the kinds of
+responses the decks hold, Hinglish included.
+"""
+import pytest
+
+from grammar_check import lexicon
+from grammar_check.deep import classify_response_rule
+from grammar_check.lexicon import PhraseRules, tag
+
+
+@pytest.mark.parametrize('word, pos', [
+    ('lowkey', lexicon.ADV),
+    ('secretly', lexicon.ADV),
+    ('family', None),                   # only looks like an -ly adverb
+    ('crying', lexicon.GERUND),
+    ('morning', None),
+    ('thing', None),                    # no vowel left before -ing
+    ('cc-ing', lexicon.GERUND),
+    ('sleep-deprived', lexicon.ADJ),
+    ('rent-free', lexicon.ADJ),
+    ('replying-all', lexicon.GERUND),
+    ('bed', None),
+    ('hopeless', lexicon.ADJ),
+    ('unless', lexicon.CONJ),
+    ('their', lexicon.DET),
+    ('nothing', lexicon.PRON),
+    ('vibes', lexicon.NOUN),
+    ('nobody\'s', lexicon.PRON),
+    ('"lonely,"', lexicon.ADJ),
+    ('hoon.', lexicon.COPULA),
+    ('ka', lexicon.GENITIVE),
+    ('baad', lexicon.POSTPOSITION),
+    ('dhaniya', None),
+])
+def test_tag(word, pos):
+    assert tag(word) == pos
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('secretly sabotaging my happiness', ('GERUND', 'adverb_gerund')),
+    ('crying in the shower', ('GERUND', 'gerund')),
+    ('nothing really mattering anyway', ('NOUN_PHRASE', 'pronoun')),
+    ('things way too kinky', ('NOUN_PHRASE', 'noun_indicator')),
+    ('their worst nightmare', ('NOUN_PHRASE', 'determiner_word')),
+    ('from another dimension', ('PREP_PHRASE', 'preposition')),
+    ('absolute cosmic insignificance', ('NOUN_PHRASE', 'adjective_noun')),
+    ('sleep-deprived and dehydrated', ('ADJECTIVE', 'adjective')),
+    ('literally insane', ('ADJECTIVE', 'adjective')),
+    ('emotionally unavailable', ('ADJECTIVE', 'adjective')),
+    ('main character syndrome', ('NOUN_PHRASE', 'adjective_noun')),
+    ('giving chaos energy', ('GERUND', 'gerund')),
+    ('free dhaniya with vegetables', ('NOUN_PHRASE', 'adjective_noun')),
+    ('dhaniya', None),
+])
+def test_phrase_rules(text, expected):
+    assert PhraseRules().match(text) == expected
+
+
+@pytest.mark.parametrize('response, expected', [
+    # "main" is Hindi for "I"; a copula at the end makes it a clause
+    ('Main apni favorite hoon.', ('SENTENCE_FRAG', 'hinglish_clause')),
+    ('Mere paas maa hai.', ('SENTENCE_FRAG', 'hinglish_clause')),
+    ('Rishte mein toh hum tumhare baap lagte hain.', ('SENTENCE_FRAG', 'hinglish_clause')),
+    # "X ka Y" is "Y of X", a noun phrase headed by Y, whatever X is
+    ('Overacting ka 70mm certificate.', ('NOUN_PHRASE', 'hinglish_genitive')),
+    ('Sharma Ji ka beta.', ('NOUN_PHRASE', 'hinglish_genitive')),
+    ('Papa ki permission pending.', ('NOUN_PHRASE', 'hinglish_genitive')),
+    # a genitive before a postposition or a negation heads nothing
+    ('Interval ke baad twist.', ('SHORT_LABEL', 'short_label')),
+    ('Tension lene ka nahi, dene ka.', ('SHORT_LABEL', 'fallback')),
+    ('Yeh koi tareeka hai jeene ka?', ('SHORT_LABEL', 'fallback')),
+    # English words that only look like them
+    ('Kitne aadmi the?', ('SHORT_LABEL', 'short_label')),
+    ('oversharing on main', ('GERUND', 'gerund')),
+])
+def test_hinglish(response, expected):
+    assert classify_response_rule(response) == expected
+
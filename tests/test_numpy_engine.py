@@ -0,0 +1,17 @@
+"""
+The NumPy engine against the exhaustive run over data/cards.json.
+"""
+import pytest
+
+from conftest import DECK, report_text, results
+from grammar_check.deep import DeepAnalyzer
+
+pytest.importorskip('numpy')
+
+
+def test_numpy_matches_exhaustive(deck, exhaustive):
+    assert results(DeepAnalyzer(mode='numpy'), deck) == exhaustive
+
+
+def test_numpy_report_matches():
+    assert report_text(DeepAnalyzer(mode='numpy'), DECK) == report_text(DeepAnalyzer(), DECK)
@@ -0,0 +1,93 @@
+"""
+Watch mode's incremental parsing: reparse must give what parsing the new
+text from scratch gives, while parsing again only the categories an edit
+touched; and a save that isn't a valid deck leaves the last good one.
+"""
+import json
+
+import pytest
+
+from grammar_check.deep import DeepAnalyzer
+from grammar_check.watch import DeckWatcher, _expect, parse_members, reparse
+
+DECK = {cat_key: {'name': cat_key.upper(), 'description': '',
+                  'scenarios': [f'{cat_key} scenario _____.', f'Why is {cat_key} _____?'],
+                  'responses': [f'{cat_key} response', f'crying about {cat_key}', f'the {cat_key} thing']}
+        for cat_key in 'abcde'}
+TEXT = json.dumps(DECK, indent=2)
+
+
+def members_of(text):
+    members, stopped = parse_members(text, _expect(text, 0, '{'), opened=True)
+    assert not stopped
+    return members
+
+
+def test_parse_members():
+    members = members_of(TEXT)
+    assert [(key, value) for key, _, _, value in members] == list(DECK.items())
+    for key, start, end, value in members:
+        assert json.loads('{' + TEXT[start:end] + '}') == {key: value}
+
+
+@pytest.mark.parametrize('old_card, new_card, parsed', [
+    ('a response', 'a reply', {'a'}),                               # head
+    ('crying about c', 'sobbing about c', {'c'}),                   # middle
+    ('the e thing', 'the e thingy', {'e'}),                         # tail
+    ('c scenario _____.', 'c scenario _____ and _____.', {'c'}),
+])
+def test_reparse_edits(old_card, new_card, parsed):
+    text = TEXT.replace(old_card, new_card)
+    members, keys = reparse(TEXT, members_of(TEXT), text)
+    assert members == members_of(text)
+    assert keys == parsed
+
+
+def test_reparse_added_and_removed():
+    added = dict(list(DECK.items())[:2] + [('x', DECK['a'])] + list(DECK.items())[2:])
+    text = json.dumps(added, indent=2)
+    # Keys all open with a quote, which falls in the unchanged head, so the
+    # category after the edit is parsed again too.
+    members, keys = reparse(TEXT, members_of(TEXT), text)
+    assert members == members_of(text)
+    assert keys == {'x', 'c'}
+    removed = {cat_key: cat_data for cat_key, cat_data in DECK.items() if cat_key != 'c'}
+    text = json.dumps(removed, indent=2)
+    members, keys = reparse(TEXT, members_of(TEXT), text)
+    assert members == members_of(text)
+    assert keys == {'d'}
+
+
+def test_reparse_falls_back_to_a_full_parse():
+    # Escaping a quote turns the old last category's key into part of an
+    # edited key: the unchanged tail text no longer starts a category.
+    old = '{"a": "x", "b": 1, "c\\": \\"": "v"}'
+    new = '{"a": "x", "b\\"c\\": \\"": "v"}'
+    members, keys = reparse(old, members_of(old), new)
+    assert members == members_of(new)
+    assert keys == {'a', 'b"c": "'}
+
+
+def test_reparse_rejects_an_unclosed_quote():
+    with pytest.raises(ValueError):
+        reparse(TEXT, members_of(TEXT), TEXT.replace('"the c thing"', '"the c thing'))
+
+
+@pytest.mark.parametrize('bad', [
+    TEXT.replace('"crying about c"', '5'),
+    TEXT.replace('"crying about c"', '"crying about c'),
+    TEXT.replace('"responses": [\n      "c response"', '"responses": "c", "x": [\n      "c response"'),
+    '[]',
+], ids=['number', 'unclosed_quote', 'not_a_list', 'not_an_object'])
+def test_watcher_keeps_the_last_good_deck(tmp_path, bad):
+    path = tmp_path / 'cards.json'
+    path.write_text(TEXT, encoding='utf-8')
+    watcher = DeckWatcher(DeepAnalyzer(), str(path))
+    totals = dict(watcher.totals)
+    path.write_text(bad, encoding='utf-8')
+    with pytest.raises(ValueError):
+        watcher.update()
+    assert watcher.deck == DECK and watcher.totals == totals
+    path.write_text(TEXT.replace('crying about c', 'sobbing about c'), encoding='utf-8')
+    assert [cat_key for cat_key, *_ in watcher.update()] == ['c']
+    assert watcher.totals == DeckWatcher(DeepAnalyzer(), str(path)).totals